@@ -0,0 +1,161 @@
+"""
+Pure ASGI middleware for request IDs, security headers and compression.
+
+Unlike `@app.middleware("http")` (Starlette's BaseHTTPMiddleware), this
+doesn't wrap the request in a Request object, run the endpoint in a
+separate task or re-stream the response body. SecurityHeadersMiddleware
+only appends a header block, encoded once at startup, to the response
+start message; CompressionMiddleware only touches single-message bodies.
+"""
+import gzip
+import itertools
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "X-XSS-Protection": "1; mode=block",
+    "Content-Security-Policy": "default-src 'self'",
+}
+
+
+class RequestIdGenerator:
+    """
+    Unique request IDs without uuid4: a random per-process prefix plus a counter.
+
+    IDs look like "3f9a1c2e7b40-1a" and are unique across processes and
+    restarts as long as the 48-bit prefixes don't collide.
+    """
+
+    def __init__(self):
+        self.prefix = os.urandom(6).hex()
+        self._counter = itertools.count(1)
+
+    def __call__(self) -> str:
+        return f"{self.prefix}-{next(self._counter):x}"
+
+
+class SecurityHeadersMiddleware:
+    """
+    Give every HTTP request an ID and add security headers to its response.
+
+    The ID is stored in `request.state.request_id` and returned as
+    X-Request-ID.
+    """
+
+    def __init__(self, app: ASGIApp, headers: Dict[str, str] = SECURITY_HEADERS, request_ids=None):
+        self.app = app
+        self.header_block: List[Tuple[bytes, bytes]] = _encode_headers(headers.items())
+        self.request_ids = request_ids or RequestIdGenerator()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self.request_ids()
+        scope.setdefault("state", {})["request_id"] = request_id
+        extra = self.header_block + [(b"x-request-id", request_id.encode("latin-1"))]
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *extra]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def _accepted_encodings(scope: Scope) -> List[str]:
+    """Codings from Accept-Encoding, without the ones refused with q=0."""
+    for name, value in scope["headers"]:
+        if name == b"accept-encoding":
+            codings = []
+            for item in value.decode("latin-1").lower().split(","):
+                coding, _, params = item.partition(";")
+                quality = params.strip()
+                if quality.startswith("q=") and quality[2:].strip(" .0") == "":
+                    continue
+                codings.append(coding.strip())
+            return codings
+    return []
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies of at least `minimum_size` bytes with brotli or gzip.
+
+    Brotli is preferred when the client accepts it and the brotli package
+    is installed. Streamed responses (bodies sent in several messages) and
+    responses that already have a Content-Encoding pass through unchanged.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose(self, scope: Scope) -> Optional[str]:
+        codings = _accepted_encodings(scope)
+        if brotli is not None and "br" in codings:
+            return "br"
+        if "gzip" in codings:
+            return "gzip"
+        return None
+
+    def _compress(self, coding: str, body: bytes) -> bytes:
+        if coding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        coding = self._choose(scope) if scope["type"] == "http" else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held back until the body shows whether it's worth compressing
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            start_message, start = start, None
+            body = message.get("body", b"")
+            headers = list(start_message.get("headers", ()))
+            if (
+                message["type"] == "http.response.body"
+                and not message.get("more_body", False)
+                and len(body) >= self.minimum_size
+                and not any(name == b"content-encoding" for name, _ in headers)
+            ):
+                body = self._compress(coding, body)
+                headers = [(name, value) for name, value in headers if name != b"content-length"]
+                headers += [
+                    (b"content-encoding", coding.encode("latin-1")),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"vary", b"Accept-Encoding"),
+                ]
+                start_message["headers"] = headers
+                message = {**message, "body": body}
+            await send(start_message)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _encode_headers(headers: Iterable[Tuple[str, str]]) -> List[Tuple[bytes, bytes]]:
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
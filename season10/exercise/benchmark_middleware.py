@@ -0,0 +1,75 @@
+"""
+Requests per second through the old BaseHTTPMiddleware request-ID middleware
+and the pure ASGI SecurityHeadersMiddleware, under concurrent load.
+
+Usage: python benchmark_middleware.py [--requests 5000] [--concurrency 50]
+
+Requests go through httpx's in-process ASGI transport, so the numbers
+measure the framework and middleware, not the network.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI, Request
+
+from asgi_middleware import SecurityHeadersMiddleware
+
+
+def build_app(pure_asgi: bool) -> FastAPI:
+    app = FastAPI()
+
+    if pure_asgi:
+        app.add_middleware(SecurityHeadersMiddleware)
+    else:
+        # The middleware secure_api used before
+        @app.middleware("http")
+        async def add_request_id(request: Request, call_next):
+            request_id = str(uuid.uuid4())
+            request.state.request_id = request_id
+            response = await call_next(request)
+            response.headers["X-Content-Type-Options"] = "nosniff"
+            response.headers["X-Frame-Options"] = "DENY"
+            response.headers["X-XSS-Protection"] = "1; mode=block"
+            response.headers["Content-Security-Policy"] = "default-src 'self'"
+            response.headers["X-Request-ID"] = request_id
+            return response
+
+    @app.get("/")
+    async def root(request: Request):
+        return {"request_id": request.state.request_id}
+
+    return app
+
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.get("/")
+                assert response.headers["x-request-id"]
+
+        await client.get("/")  # Warm up
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    for label, pure_asgi in (("BaseHTTPMiddleware", False), ("pure ASGI", True)):
+        rate = asyncio.run(run(build_app(pure_asgi), args.requests, args.concurrency))
+        print(f"{label:<20} {rate:8.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
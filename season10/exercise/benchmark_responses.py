@@ -0,0 +1,91 @@
+"""
+Search responses per second and bytes per response: the old
+response_model=Dict[str, Any] path against the orjson bypass, with field
+selection and compression.
+
+Usage: python benchmark_responses.py [--requests 2000] [--products 100]
+
+Requests go through httpx's in-process ASGI transport, so the numbers
+measure rendering, not the network.
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import FastAPI
+
+from asgi_middleware import CompressionMiddleware
+from secure_api import FastJSONResponse, SearchResponse, parse_fields
+
+
+def make_products(count: int):
+    return [
+        {"id": i, "name": f"Product {i}", "description": f"Description of product number {i}, in stock",
+         "price": 10.0 + i, "categories": ["electronics", "sale"]}
+        for i in range(1, count + 1)
+    ]
+
+
+def envelope(results) -> Dict[str, Any]:
+    return {
+        "request_id": "bench", "query": "product", "filters": {"category": None, "max_price": None},
+        "total_count": len(results), "result_count": len(results), "results": results,
+        "page": {"limit": len(results), "after": None, "next_after": None},
+    }
+
+
+def build_app(products, fast: bool, compress: bool) -> FastAPI:
+    app = FastAPI()
+    if compress:
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    if fast:
+        @app.get("/search", response_model=SearchResponse, response_class=FastJSONResponse)
+        async def search(fields: Optional[str] = None):
+            selected = parse_fields(fields)
+            results = products if selected is None else [{name: p[name] for name in selected} for p in products]
+            return FastJSONResponse(envelope(results))
+    else:
+        # How secure_api rendered results before
+        @app.get("/search", response_model=Dict[str, Any])
+        async def search(fields: Optional[str] = None):
+            return envelope(products)
+
+    return app
+
+
+async def run(app: FastAPI, requests: int, params: dict, headers: dict):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get("/search", params=params, headers=headers)  # Warm up
+        size = int(response.headers["content-length"])  # On the wire, before httpx decodes it
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/search", params=params, headers=headers)
+        return requests / (time.perf_counter() - start), size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--products", type=int, default=100)
+    args = parser.parse_args()
+
+    products = make_products(args.products)
+    identity = {"accept-encoding": "identity"}
+    cases = [
+        ("Dict[str, Any]", False, False, {}, identity),
+        ("orjson bypass", True, False, {}, identity),
+        ("+ fields=name,price", True, False, {"fields": "name,price"}, identity),
+        ("+ gzip", True, True, {}, {"accept-encoding": "gzip"}),
+        ("+ fields + gzip", True, True, {"fields": "name,price"}, {"accept-encoding": "gzip"}),
+    ]
+    for label, fast, compress, params, headers in cases:
+        rate, size = asyncio.run(run(build_app(products, fast, compress), args.requests, params, headers))
+        print(f"{label:<22} {rate:8.0f} req/s {size:8d} bytes")
+
+
+if __name__ == "__main__":
+    main()
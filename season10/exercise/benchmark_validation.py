@@ -0,0 +1,78 @@
+"""
+CPU time per search request spent validating and normalizing the query,
+before and after the single-pass ProductSearchQuery.
+
+Usage: python benchmark_validation.py [--iterations 100000]
+
+The old path is what secure_api did per request: FastAPI's Query length
+check, then a pydantic model repeating it and running a v1 @validator
+that looks its regex up through re.match, then html.escape and the cache
+key's tokenization. The new path checks length and characters once, in
+the model, against a precompiled pattern.
+"""
+import argparse
+import html
+import re
+import time
+import warnings
+
+from pydantic import BaseModel, Field, ValidationError
+
+from product_search import normalize_tokens
+from secure_api import ProductSearchQuery
+
+QUERIES = ["laptop", "Noise-cancelling headphones", "phone 'latest' model, 2024", "<script>"]
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")  # @validator is deprecated in pydantic v2
+    from pydantic import validator
+
+    class OldProductSearchQuery(BaseModel):
+        query: str = Field(..., min_length=1, max_length=100)
+
+        @validator('query')
+        def sanitize_query(cls, v):
+            if not re.match(r'^[a-zA-Z0-9\s\.,\-_\'\"]+$', v):
+                raise ValueError("Search query contains invalid characters")
+            return v
+
+
+def old_path(query: str):
+    if not 1 <= len(query) <= 100:  # Query(min_length, max_length)
+        return None
+    try:
+        validated = OldProductSearchQuery(query=query)
+    except ValidationError:
+        return None
+    return html.escape(validated.query), normalize_tokens(validated.query)
+
+
+def new_path(query: str):
+    try:
+        validated = ProductSearchQuery(query=query)
+    except ValidationError:
+        return None
+    return validated.escaped, validated.tokens
+
+
+def per_call_us(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(QUERIES[i % len(QUERIES)])
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    old = per_call_us(old_path, args.iterations)
+    new = per_call_us(new_path, args.iterations)
+    print(f"{'validate twice':<20} {old:6.2f} us/request")
+    print(f"{'single pass':<20} {new:6.2f} us/request")
+    print(f"{'saved':<20} {old - new:6.2f} us/request ({(old - new) / old:.0%})")
+
+
+if __name__ == "__main__":
+    main()
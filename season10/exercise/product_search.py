@@ -0,0 +1,275 @@
+"""
+In-memory search index for the product catalog.
+
+Product text is casefolded and tokenized once, when a product is added,
+into an inverted index (term -> product ids) whose terms are the words
+and all their suffixes. A query token matches every term it is a prefix
+of, found by bisecting the sorted vocabulary; in other words it matches
+products with a word containing it, so "lap" finds "Laptop" and "phone"
+still finds "Smartphone". All query tokens must match.
+
+Secondary indexes narrow the text matches further: categories map to sets
+of product ids, and prices are kept in a sorted list, so `max_price` is a
+bisect. Combined filters are set intersections, and a query touches only
+the postings, categories and prices it matches, never the whole catalog.
+"""
+import bisect
+import re
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+TOKEN = re.compile(r"[^\W_]+")
+# Rough query costs in units of one posting merged into a set
+TERM_COST = 50  # Visiting one vocabulary term
+CANDIDATE_COST = 4  # Checking one candidate product's text directly
+
+Product = Dict[str, Any]
+
+
+def tokenize(text: str) -> List[str]:
+    """Casefold `text` and split it into alphanumeric tokens."""
+    return TOKEN.findall(text.casefold())
+
+
+def normalize_tokens(query: str) -> Tuple[str, ...]:
+    """Distinct query tokens in sorted order; equivalent queries normalize alike."""
+    return tuple(sorted(set(tokenize(query))))
+
+
+def _product_terms(product: "Product") -> Set[str]:
+    return index_terms(product["name"]) | index_terms(product["description"])
+
+
+def _product_categories(product: "Product") -> Set[str]:
+    return {category.casefold() for category in product.get("categories", ())}
+
+
+def index_terms(text: str) -> Set[str]:
+    """All suffixes of the words in `text`, which turn infix queries into prefix lookups."""
+    return {word[start:] for word in tokenize(text) for start in range(len(word))}
+
+
+class _Indexed(NamedTuple):
+    """What a product was indexed under; removal uses this, since the product dict may have changed since."""
+
+    terms: FrozenSet[str]
+    price: float
+    categories: FrozenSet[str]
+
+
+class ProductIndex:
+    """Products plus the inverted and price indexes over them, kept in sync on every change."""
+
+    def __init__(self, products: Iterable[Product] = ()):
+        self.products: Dict[int, Product] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._vocabulary: List[str] = []  # Sorted keys of _postings
+        self._text: Dict[int, str] = {}  # Casefolded words, for checking single candidates
+        self._indexed: Dict[int, _Indexed] = {}
+        self._prices: List[Tuple[float, int]] = []  # Sorted (price, id)
+        self._categories: Dict[str, Set[int]] = {}
+        # Bumped on every change, so caches of search results know when they are stale
+        self.version = 0
+        # Bulk load: sort once at the end instead of inserting in order
+        for product in products:
+            self._insert(product, keep_sorted=False)
+        self._vocabulary = sorted(self._postings)
+        self._prices.sort()
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def add(self, product: Product) -> None:
+        """Add a product, replacing any product with the same id."""
+        self._insert(product, keep_sorted=True)
+
+    def _insert(self, product: Product, keep_sorted: bool) -> None:
+        self.version += 1
+        product_id = product["id"]
+        if product_id in self.products:
+            self.remove(product_id)
+        self.products[product_id] = product
+
+        self._text[product_id] = " ".join(tokenize(product["name"]) + tokenize(product["description"]))
+        indexed = self._indexed[product_id] = _Indexed(
+            frozenset(_product_terms(product)), product["price"], frozenset(_product_categories(product))
+        )
+        for term in indexed.terms:
+            ids = self._postings.get(term)
+            if ids is None:
+                ids = self._postings[term] = set()
+                if keep_sorted:
+                    bisect.insort(self._vocabulary, term)
+            ids.add(product_id)
+        if keep_sorted:
+            bisect.insort(self._prices, (indexed.price, product_id))
+        else:
+            self._prices.append((indexed.price, product_id))
+        for category in indexed.categories:
+            self._categories.setdefault(category, set()).add(product_id)
+
+    def remove(self, product_id: int) -> None:
+        self.version += 1
+        del self.products[product_id]
+        del self._text[product_id]
+        indexed = self._indexed.pop(product_id)
+        for term in indexed.terms:
+            ids = self._postings[term]
+            ids.discard(product_id)
+            if not ids:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+        del self._prices[bisect.bisect_left(self._prices, (indexed.price, product_id))]
+        for category in indexed.categories:
+            ids = self._categories[category]
+            ids.discard(product_id)
+            if not ids:
+                del self._categories[category]
+
+    def categories(self) -> Dict[str, int]:
+        """Category names with their product counts."""
+        return {category: len(ids) for category, ids in sorted(self._categories.items())}
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Slice of the vocabulary holding the terms that start with `prefix`."""
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        # Every term with this prefix sorts before prefix + the highest code point
+        return start, bisect.bisect_left(self._vocabulary, prefix + "\U0010ffff", start)
+
+    def _range_ids(self, start: int, end: int) -> Set[int]:
+        if end - start == 1:
+            return set(self._postings[self._vocabulary[start]])
+        ids: Set[int] = set()
+        for term in self._vocabulary[start:end]:
+            ids |= self._postings[term]
+        return ids
+
+    def _range_cost(self, start: int, end: int, limit: int) -> int:
+        """Estimated cost of `_range_ids`, counted up to `limit`."""
+        if (end - start) * TERM_COST >= limit:
+            return limit
+        total = 0
+        for term in self._vocabulary[start:end]:
+            total += len(self._postings[term]) + TERM_COST
+            if total >= limit:
+                break
+        return total
+
+    def _text_ids(self, tokens: Iterable[str]) -> Set[int]:
+        spans = []
+        for token in tokens:
+            start, end = self._prefix_range(token)
+            if start == end:
+                return set()
+            spans.append((end - start, start, end, token))
+        if not spans:
+            return set()
+        # Costs beyond CANDIDATE_COST per product of the cheapest match are never
+        # paid (those tokens are checked per candidate), so stop counting there
+        ranges = []
+        limit = (len(self.products) + 1) * CANDIDATE_COST
+        for _, start, end, token in sorted(spans):
+            cost = self._range_cost(start, end, limit)
+            limit = min(limit, cost * CANDIDATE_COST)
+            ranges.append((cost, start, end, token))
+        # Cheapest match first; it bounds the candidates for the others
+        ranges.sort()
+        ids = self._range_ids(ranges[0][1], ranges[0][2])
+        for cost, start, end, token in ranges[1:]:
+            if cost > len(ids) * CANDIDATE_COST:
+                # Few candidates: check their text directly (a token never spans the spaces)
+                text = self._text
+                ids = {product_id for product_id in ids if token in text[product_id]}
+            else:
+                ids &= self._range_ids(start, end)
+            if not ids:
+                break
+        return ids
+
+    def _price_filter(self, ids: Set[int], max_price: float) -> Set[int]:
+        cut = bisect.bisect_right(self._prices, (max_price, float("inf")))
+        if cut <= len(ids):
+            # Fewer products under the price than text matches: intersect with them
+            return ids.intersection(product_id for _, product_id in self._prices[:cut])
+        indexed = self._indexed
+        return {product_id for product_id in ids if indexed[product_id].price <= max_price}
+
+    def search(self, query: str, max_price: Optional[float] = None, category: Optional[str] = None) -> List[int]:
+        """
+        Ids of products containing every token of `query` within a word, in id order.
+
+        Args:
+            query: Free text; tokens are matched against name and description
+            max_price: Only products priced at or below this
+            category: Only products in this category (case-insensitive)
+        """
+        return self.search_tokens(normalize_tokens(query), max_price, category)
+
+    def search_tokens(
+        self, tokens: Tuple[str, ...], max_price: Optional[float] = None, category: Optional[str] = None
+    ) -> List[int]:
+        """Like `search`, for a query already run through `normalize_tokens`."""
+        ids = self._text_ids(tokens)
+        if ids and category is not None:
+            # Set intersection iterates over the smaller side
+            ids &= self._categories.get(category.casefold(), set())
+        if ids and max_price is not None:
+            ids = self._price_filter(ids, max_price)
+        return sorted(ids)
+
+
+class SearchCache:
+    """
+    LRU cache of search results in front of a ProductIndex.
+
+    Keys are normalized (distinct query tokens in sorted order, casefolded
+    category, price), so equivalent queries share an entry. The whole
+    cache is dropped when the index version changes.
+    """
+
+    def __init__(self, index: ProductIndex, max_entries: int = 1024):
+        self.index = index
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Any, ...], List[int]]" = OrderedDict()
+        self._version = index.version
+        self.hits = 0
+        self.misses = 0
+
+    def search(self, query: str, max_price: Optional[float] = None, category: Optional[str] = None) -> List[int]:
+        """Like ProductIndex.search; the returned list is shared and must not be modified."""
+        return self.search_tokens(normalize_tokens(query), max_price, category)
+
+    def search_tokens(
+        self, tokens: Tuple[str, ...], max_price: Optional[float] = None, category: Optional[str] = None
+    ) -> List[int]:
+        """Like ProductIndex.search_tokens, served from the cache when possible."""
+        if self._version != self.index.version:
+            self._entries.clear()
+            self._version = self.index.version
+        key = (tokens, category.casefold() if category else None, max_price)
+        ids = self._entries.get(key)
+        if ids is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return ids
+        self.misses += 1
+        ids = self._entries[key] = self.index.search_tokens(tokens, max_price, category)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return ids
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def paginate(ids: List[int], limit: int, after: Optional[int] = None) -> Tuple[List[int], Optional[int]]:
+    """
+    Keyset page of sorted ids: up to `limit` ids greater than `after`.
+
+    Returns:
+        The page and the cursor for the next page (None on the last page)
+    """
+    start = bisect.bisect_right(ids, after) if after is not None else 0
+    page = ids[start:start + limit]
+    has_more = start + limit < len(ids)
+    return page, (page[-1] if has_more else None)
@@ -0,0 +1,171 @@
+"""
+Per-client rate limiting for the API.
+
+Each client gets a token bucket (short bursts up to `burst`, refilled at
+`rate` per second) and, optionally, a sliding-window cap on requests per
+`window` seconds. The window is approximated from the counts of the
+current and previous fixed windows, so a client costs a constant amount
+of state however many requests it sends. Clients idle for `idle_timeout`
+seconds are evicted, oldest first.
+
+Backends are pluggable: RateLimitMiddleware only needs `acquire(key)`,
+so a shared store (e.g. Redis) can replace the in-memory backend when
+several processes serve the API.
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def acquire(self, key: str) -> float:
+        """
+        Count one request for `key`.
+
+        Returns:
+            0 if the request is allowed, otherwise seconds until it would be
+        """
+
+
+class _ClientState:
+    __slots__ = ("tokens", "updated", "window_start", "current", "previous")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        self.window_start = now
+        self.current = 0
+        self.previous = 0
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Token bucket plus sliding-window counter per key, in this process's memory."""
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        window: Optional[float] = 60.0,
+        window_limit: int = 300,
+        idle_timeout: float = 300.0,
+        max_clients: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            rate: Tokens added per second
+            burst: Bucket size, i.e. requests allowed at once
+            window: Sliding window length in seconds (None disables the window cap)
+            window_limit: Requests allowed per sliding window
+            idle_timeout: Seconds without requests after which a client is forgotten
+            max_clients: Clients tracked at most; the least recently seen go first
+        """
+        self.rate = rate
+        self.burst = burst
+        self.window = window
+        self.window_limit = window_limit
+        self.idle_timeout = idle_timeout
+        self.max_clients = max_clients
+        self.clock = clock
+        # Least recently seen first, so idle clients are evicted from the front
+        self._clients: "OrderedDict[str, _ClientState]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def _evict(self, now: float) -> None:
+        clients = self._clients
+        while clients:
+            key, state = next(iter(clients.items()))
+            if now - state.updated < self.idle_timeout and len(clients) < self.max_clients:
+                break
+            del clients[key]
+
+    def _window_wait(self, state: _ClientState, now: float) -> float:
+        """Seconds until the sliding-window estimate has room for one more request."""
+        window = self.window
+        if now - state.window_start >= window:
+            # Roll over; after two windows nothing of the old counts remains
+            state.previous = state.current if now - state.window_start < 2 * window else 0
+            state.current = 0
+            state.window_start += window * math.floor((now - state.window_start) / window)
+        elapsed = now - state.window_start
+        if state.current >= self.window_limit:
+            return window - elapsed
+        estimate = state.previous * (1 - elapsed / window) + state.current
+        if estimate < self.window_limit:
+            return 0.0
+        # previous * (1 - (elapsed + t) / window) + current < limit, solved for t
+        return window * (1 - (self.window_limit - state.current) / state.previous) - elapsed
+
+    async def acquire(self, key: str) -> float:
+        now = self.clock()
+        state = self._clients.get(key)
+        if state is None:
+            self._evict(now)
+            state = self._clients[key] = _ClientState(float(self.burst), now)
+        else:
+            self._clients.move_to_end(key)
+            state.tokens = min(self.burst, state.tokens + (now - state.updated) * self.rate)
+        state.updated = now
+
+        wait = self._window_wait(state, now) if self.window else 0.0
+        if state.tokens < 1:
+            wait = max(wait, (1 - state.tokens) / self.rate)
+        if wait > 0:
+            return wait
+        state.tokens -= 1
+        state.current += 1
+        return 0.0
+
+
+def client_ip(scope: Scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """
+    Reject requests over the client's limit with 429 and Retry-After.
+
+    Rejections happen before routing, validation or logging, so a client
+    over its limit costs one backend lookup per request.
+    """
+
+    BODY = b'{"detail":"Too many requests. Please retry later."}'
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: RateLimitBackend,
+        key: Callable[[Scope], str] = client_ip,
+        exempt_paths: Iterable[str] = (),
+    ):
+        self.app = app
+        self.backend = backend
+        self.key = key
+        self.exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        wait = await self.backend.acquire(self.key(scope))
+        if not wait:
+            await self.app(scope, receive, send)
+            return
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(self.BODY)).encode()),
+                (b"retry-after", str(math.ceil(wait)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": self.BODY})
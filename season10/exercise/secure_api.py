@@ -1,12 +1,22 @@
 from fastapi import FastAPI, Query, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 import re
 import html
 import logging
-import uuid
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:  # Optional: the stdlib json encoder is used without it
+    orjson = None
+    FastJSONResponse = JSONResponse
+
+from asgi_middleware import CompressionMiddleware, SecurityHeadersMiddleware
+from product_search import ProductIndex, SearchCache, normalize_tokens, paginate
+from rate_limit import InMemoryRateLimitBackend, RateLimitMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +32,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Compress responses of 1 KiB or more (brotli when available, else gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 # Add security middleware
 app.add_middleware(
     CORSMiddleware,
@@ -33,13 +46,36 @@ app.add_middleware(
 
 # Sample database of products (in a real app, this would be a proper database)
 PRODUCTS = {
-    1: {"id": 1, "name": "Laptop", "description": "High-performance laptop", "price": 999.99},
-    2: {"id": 2, "name": "Smartphone", "description": "Latest smartphone model", "price": 699.99},
-    3: {"id": 3, "name": "Headphones", "description": "Noise-cancelling headphones", "price": 199.99},
+    1: {"id": 1, "name": "Laptop", "description": "High-performance laptop", "price": 999.99,
+        "categories": ["electronics", "computers"]},
+    2: {"id": 2, "name": "Smartphone", "description": "Latest smartphone model", "price": 699.99,
+        "categories": ["electronics", "phones"]},
+    3: {"id": 3, "name": "Headphones", "description": "Noise-cancelling headphones", "price": 199.99,
+        "categories": ["electronics", "audio"]},
 }
 
+# Search index over PRODUCTS; change the catalog through save_product/delete_product to keep it in sync
+product_index = ProductIndex(PRODUCTS.values())
+# Matching ids per normalized search; emptied automatically when the index changes
+search_cache = SearchCache(product_index, max_entries=1024)
+
+def save_product(product: Dict[str, Any]) -> None:
+    """Add or replace a product in the catalog and the search index."""
+    PRODUCTS[product["id"]] = product
+    product_index.add(product)
+
+def delete_product(product_id: int) -> None:
+    """Remove a product from the catalog and the search index."""
+    del PRODUCTS[product_id]
+    product_index.remove(product_id)
+
+# Characters allowed in search queries: alphanumerics, whitespace and some punctuation
+SEARCH_QUERY_CHARS = re.compile(r'[a-zA-Z0-9\s.,\-_\'"]+')
+
 # Define validation models with Pydantic
 class ProductSearchQuery(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     query: str = Field(
         ..., 
         min_length=1, 
@@ -48,29 +84,72 @@ class ProductSearchQuery(BaseModel):
     )
     
     # Validate search query to prevent injection attacks
-    @validator('query')
-    def sanitize_query(cls, v):
-        # Remove any potentially dangerous characters
-        # Only allow alphanumeric characters, spaces and some punctuation
-        if not re.match(r'^[a-zA-Z0-9\s\.,\-_\'\"]+$', v):
+    @field_validator('query')
+    @classmethod
+    def sanitize_query(cls, v: str) -> str:
+        # Reject anything outside the allowed characters instead of trying to clean it
+        if SEARCH_QUERY_CHARS.fullmatch(v) is None:
             raise ValueError("Search query contains invalid characters")
         return v
-
-# Request ID middleware to help with request tracing
-@app.middleware("http")
-async def add_request_id(request: Request, call_next):
-    request_id = str(uuid.uuid4())
-    # Add request_id to request state
-    request.state.request_id = request_id
     
-    # Add security headers
-    response = await call_next(request)
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Content-Security-Policy"] = "default-src 'self'"
-    response.headers["X-Request-ID"] = request_id
-    return response
+    # Normalized forms; the endpoint reads each once, so they aren't cached
+    # (cached_property on a frozen model costs more than the work itself)
+    @property
+    def escaped(self) -> str:
+        """HTML-escaped query, safe to log and echo back."""
+        return html.escape(self.query)
+    
+    @property
+    def tokens(self) -> Tuple[str, ...]:
+        """Distinct casefolded search tokens, sorted; what the index and cache work on."""
+        return normalize_tokens(self.query)
+
+# Response models; these document the search response, which the endpoint
+# returns already serialized instead of having FastAPI validate it again
+class ProductOut(BaseModel):
+    id: int
+    name: str
+    description: str
+    price: float
+    categories: List[str] = []
+
+class SearchFilters(BaseModel):
+    category: Optional[str]
+    max_price: Optional[float]
+
+class PageInfo(BaseModel):
+    limit: int
+    after: Optional[int]
+    next_after: Optional[int]
+
+class SearchResponse(BaseModel):
+    request_id: str
+    query: str
+    filters: SearchFilters
+    total_count: int
+    result_count: int
+    results: List[ProductOut] = Field(description="Products, with only the requested fields when `fields` is given")
+    page: PageInfo
+
+PRODUCT_FIELDS = frozenset(ProductOut.model_fields)
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Product fields named in a comma-separated `fields` parameter; None for all fields."""
+    if fields is None:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",")))
+    unknown = set(names) - PRODUCT_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return names
+
+# Per-client rate limiting; requests over the limit get 429 before any validation or logging
+rate_limiter = InMemoryRateLimitBackend(rate=10, burst=20, window=60, window_limit=300)
+app.add_middleware(RateLimitMiddleware, backend=rate_limiter, exempt_paths={"/docs", "/openapi.json"})
+
+# Request ID and security headers middleware to help with request tracing;
+# pure ASGI, so it only appends a pre-encoded header block to each response
+app.add_middleware(SecurityHeadersMiddleware)
 
 # Dependency for request logging
 async def log_request(request: Request):
@@ -80,20 +159,21 @@ async def log_request(request: Request):
     return request_id
 
 # Define the endpoint
-@app.get("/api/products/search", response_model=Dict[str, Any])
+@app.get("/api/products/search", response_model=SearchResponse, response_class=FastJSONResponse)
 async def search_products(
     request_id: str = Depends(log_request),
+    # Length and character checks run once, in ProductSearchQuery, and fail with 400;
+    # the limits are only declared here, so the OpenAPI schema still shows them
     query: str = Query(
         ..., 
-        min_length=1, 
-        max_length=100,
-        description="Search term for product"
+        description="Search term for product (1-100 letters, digits, spaces and .,-_'\"); anything else gets a 400",
+        json_schema_extra={"minLength": 1, "maxLength": 100},
     ),
     category: Optional[str] = Query(
         None,
         min_length=1,
         max_length=50,
-        regex="^[a-zA-Z0-9\-_]+$",  # Strict validation for category
+        pattern="^[a-zA-Z0-9\-_]+$",  # Strict validation for category
         description="Product category filter"
     ),
     max_price: Optional[float] = Query(
@@ -101,6 +181,23 @@ async def search_products(
         gt=0,
         lt=100000,
         description="Maximum price filter"
+    ),
+    limit: int = Query(
+        20,
+        ge=1,
+        le=100,
+        description="Maximum number of results in this page"
+    ),
+    after: Optional[int] = Query(
+        None,
+        ge=0,
+        description="Cursor from the previous page's next_after; results are ordered by product id"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        max_length=100,
+        pattern="^[a-z_]+( *, *[a-z_]+)*$",
+        description="Comma-separated product fields to return, e.g. name,price"
     )
 ):
     """
@@ -110,43 +207,49 @@ async def search_products(
     try:
         # Validate query using Pydantic model
         validated_query = ProductSearchQuery(query=query)
+        selected_fields = parse_fields(fields)
         
         # Sanitize inputs to prevent XSS
-        safe_query = html.escape(validated_query.query)
+        safe_query = validated_query.escaped
         
         # Log the sanitized search
         logger.info(f"Request {request_id}: Searching for products with query: '{safe_query}'")
         
-        # Perform the search (simplified for example)
-        results = []
-        for product in PRODUCTS.values():
-            # Case-insensitive search in name or description
-            if (safe_query.lower() in product["name"].lower() or 
-                safe_query.lower() in product["description"].lower()):
-                
-                # Apply category filter if specified
-                if category and category != "all":
-                    # In a real app, you'd check the product category
-                    continue
-                
-                # Apply price filter if specified
-                if max_price is not None and product["price"] > max_price:
-                    continue
-                    
-                # Add matching product to results
-                results.append(product)
+        # Look up matches in the index: every query word must occur within a word of the name or description,
+        # and the category and price filters are intersected with those matches
+        product_ids = search_cache.search_tokens(
+            validated_query.tokens,
+            max_price=max_price,
+            category=None if category in (None, "all") else category,
+        )
+        page_ids, next_after = paginate(product_ids, limit, after)
+        if selected_fields is None:
+            results = [PRODUCTS[product_id] for product_id in page_ids]
+        else:
+            results = [
+                {name: PRODUCTS[product_id][name] for name in selected_fields if name in PRODUCTS[product_id]}
+                for product_id in page_ids
+            ]
         
-        # Return safe, structured response
-        return {
+        # Return safe, structured response. The data is built from validated
+        # inputs and the catalog, so it's serialized directly (with orjson when
+        # installed) rather than re-validated against SearchResponse
+        return FastJSONResponse({
             "request_id": request_id,
             "query": safe_query,
             "filters": {
                 "category": category,
                 "max_price": max_price
             },
+            "total_count": len(product_ids),
             "result_count": len(results),
-            "results": results
-        }
+            "results": results,
+            "page": {
+                "limit": limit,
+                "after": after,
+                "next_after": next_after
+            }
+        })
         
     except ValueError as e:
         # Log the validation error
@@ -178,6 +281,8 @@ async def root():
             "XSS protection",
             "Security headers",
             "Request tracing",
+            "Per-client rate limiting",
+            "Response compression",
             "Proper error handling",
             "CORS protection"
         ]
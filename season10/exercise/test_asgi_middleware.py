@@ -0,0 +1,67 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from asgi_middleware import CompressionMiddleware, RequestIdGenerator, SecurityHeadersMiddleware
+
+
+def make_client():
+    app = FastAPI()
+    app.add_middleware(SecurityHeadersMiddleware, headers={"X-Frame-Options": "DENY"})
+
+    @app.get("/")
+    async def root(request: Request):
+        return {"request_id": request.state.request_id}
+
+    return TestClient(app)
+
+
+def test_request_ids_are_unique_and_prefixed():
+    first, second = RequestIdGenerator(), RequestIdGenerator()
+    ids = {first() for _ in range(1000)}
+    assert len(ids) == 1000
+    assert all(request_id.startswith(first.prefix + "-") for request_id in ids)
+    assert first.prefix != second.prefix
+
+
+def test_headers_and_request_id_reach_the_response():
+    client = make_client()
+    responses = [client.get("/") for _ in range(2)]
+    for response in responses:
+        assert response.headers["x-frame-options"] == "DENY"
+        # The endpoint sees the same ID the client gets back
+        assert response.headers["x-request-id"] == response.json()["request_id"]
+    assert responses[0].headers["x-request-id"] != responses[1].headers["x-request-id"]
+
+
+def test_error_responses_get_headers_too():
+    response = make_client().get("/missing")
+    assert response.status_code == 404
+    assert response.headers["x-frame-options"] == "DENY"
+
+
+def make_compressed_client(minimum_size=100):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+
+    @app.get("/items")
+    async def items(count: int):
+        return {"items": ["item"] * count}
+
+    return TestClient(app)
+
+
+def test_large_responses_are_gzipped_when_accepted():
+    client = make_compressed_client()
+    response = client.get("/items", params={"count": 100}, headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < 100
+    assert response.json() == {"items": ["item"] * 100}
+
+
+def test_small_or_unaccepted_responses_pass_through():
+    client = make_compressed_client()
+    small = client.get("/items", params={"count": 1}, headers={"accept-encoding": "gzip"})
+    refused = client.get("/items", params={"count": 100}, headers={"accept-encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in refused.headers
+    assert refused.json() == {"items": ["item"] * 100}
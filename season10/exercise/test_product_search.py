@@ -0,0 +1,147 @@
+from product_search import ProductIndex, SearchCache, index_terms, normalize_tokens, paginate, tokenize
+
+PRODUCTS = [
+    {"id": 1, "name": "Laptop", "description": "High-performance laptop", "price": 999.99,
+     "categories": ["electronics", "computers"]},
+    {"id": 2, "name": "Smartphone", "description": "Latest smartphone model", "price": 699.99,
+     "categories": ["electronics", "phones"]},
+    {"id": 3, "name": "Headphones", "description": "Noise-cancelling headphones", "price": 199.99,
+     "categories": ["electronics", "audio"]},
+]
+
+
+def test_tokenize_casefolds_and_splits():
+    assert tokenize("Noise-cancelling HEADPHONES") == ["noise", "cancelling", "headphones"]
+    assert index_terms("Top") == {"top", "op", "p"}
+    assert normalize_tokens("Phone head PHONE") == ("head", "phone")
+
+
+def test_search_matches_within_words():
+    index = ProductIndex(PRODUCTS)
+    assert index.search("lap") == [1]
+    assert index.search("PHONE") == [2, 3]
+    assert index.search("noise head") == [3]
+    assert index.search("phone laptop") == []
+    assert index.search("...") == []
+
+
+def test_max_price_filter():
+    index = ProductIndex(PRODUCTS)
+    assert index.search("phone", max_price=699.99) == [2, 3]
+    assert index.search("phone", max_price=500) == [3]
+    assert index.search("phone", max_price=10) == []
+
+
+def test_category_filter_intersects_with_text_and_price():
+    index = ProductIndex(PRODUCTS)
+    assert index.search("phone", category="audio") == [3]
+    assert index.search("phone", category="Electronics") == [2, 3]
+    assert index.search("phone", category="electronics", max_price=500) == [3]
+    assert index.search("phone", category="computers") == []
+    assert index.search("phone", category="unknown") == []
+    assert index.categories() == {"audio": 1, "computers": 1, "electronics": 3, "phones": 1}
+
+
+def test_index_follows_catalog_changes():
+    index = ProductIndex(PRODUCTS)
+    index.add({"id": 4, "name": "Phone case", "description": "Rugged case", "price": 19.99})
+    assert index.search("phone", max_price=100) == [4]
+    # Replacing a product drops its old terms and price
+    index.add({"id": 4, "name": "Tablet", "description": "Ten inch tablet", "price": 299.0})
+    assert index.search("case") == []
+    assert index.search("tab", max_price=300) == [4]
+    index.add({"id": 5, "name": "Tablet stand", "description": "Desk stand", "price": 25.0, "categories": ["accessories"]})
+    assert index.search("tablet", category="accessories") == [5]
+    index.remove(5)
+    assert "accessories" not in index.categories()
+    index.remove(4)
+    assert index.search("tablet") == []
+    assert len(index) == 3
+
+
+def test_product_edited_in_place_is_reindexed_on_save():
+    index = ProductIndex(PRODUCTS)
+    product = {"id": 4, "name": "Tablet", "description": "Ten inch tablet", "price": 299.0, "categories": ["tablets"]}
+    index.add(product)
+    product.update(name="Phone case", description="Rugged case", price=19.99, categories=["accessories"])
+    # Still indexed as it was until saved
+    assert index.search("tablet", max_price=300) == [4]
+    index.add(product)
+    assert index.search("tablet") == []
+    assert index.search("case", max_price=20) == [4]
+    assert index.search("case", max_price=100) == [4]
+    assert index.search("case", category="accessories") == [4]
+    assert "tablets" not in index.categories()
+    index.remove(4)
+    assert index.search("case") == []
+    assert "accessories" not in index.categories()
+
+
+def test_agrees_with_a_full_scan():
+    names = ["Gaming Mouse", "Wireless Keyboard", "Gaming Headset", "USB Cable", "Mouse Pad"]
+    products = [
+        {"id": i, "name": f"{names[i % 5]} {i}", "description": f"model sku{i}", "price": float(i % 97)}
+        for i in range(500)
+    ]
+    index = ProductIndex(products)
+
+    def scan(query, max_price):
+        tokens = tokenize(query)
+        return [
+            p["id"] for p in products
+            if all(any(t in w for w in tokenize(p["name"] + " " + p["description"])) for t in tokens)
+            and p["price"] <= max_price
+        ]
+
+    for query in ["gaming", "mouse 1", "sku4", "ouse ing", "key 99", "pad", "zzz"]:
+        assert index.search(query, max_price=50) == scan(query, 50)
+
+
+def test_paginate_by_keyset():
+    ids = [2, 3, 5, 8, 13]
+    assert paginate(ids, 2) == ([2, 3], 3)
+    assert paginate(ids, 2, after=3) == ([5, 8], 8)
+    assert paginate(ids, 2, after=8) == ([13], None)
+    # A cursor whose product disappeared still continues after it
+    assert paginate(ids, 2, after=4) == ([5, 8], 8)
+    assert paginate(ids, 5) == (ids, None)
+
+
+def test_cache_normalizes_queries_and_invalidates_on_change():
+    index = ProductIndex(PRODUCTS)
+    cache = SearchCache(index, max_entries=2)
+    assert cache.search("Phone HEAD") == [3]
+    assert cache.search("head phone") == [3]
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+    index.add({"id": 4, "name": "Headphone stand", "description": "Stand", "price": 15.0})
+    assert cache.search("head phone") == [3, 4]
+    assert cache.stats()["misses"] == 2
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SearchCache(ProductIndex(PRODUCTS), max_entries=2)
+    cache.search("lap")
+    cache.search("phone")
+    cache.search("lap")
+    cache.search("noise")  # Evicts "phone"
+    cache.search("lap")
+    cache.search("phone")
+    assert cache.stats() == {"entries": 2, "hits": 2, "misses": 4}
+
+
+def test_cache_agrees_with_the_index_across_an_in_place_edit():
+    index = ProductIndex(PRODUCTS)
+    cache = SearchCache(index)
+    product = {"id": 4, "name": "Phone stand", "description": "Stand", "price": 15.0, "categories": ["accessories"]}
+    index.add(product)
+    assert cache.search("stand", max_price=20, category="accessories") == [4]
+
+    product.update(price=45.0, categories=["furniture"])
+    # Unsaved edits change neither side, so a cache hit and a fresh search agree
+    assert cache.search("stand", max_price=20, category="accessories") == index.search(
+        "stand", max_price=20, category="accessories") == [4]
+
+    index.add(product)
+    assert cache.search("stand", max_price=20, category="accessories") == []
+    assert cache.search("stand", max_price=50, category="furniture") == [4]
@@ -0,0 +1,79 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from rate_limit import InMemoryRateLimitBackend, RateLimitMiddleware
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def acquire_all(backend, key, count):
+    async def run():
+        return [await backend.acquire(key) for _ in range(count)]
+
+    return asyncio.run(run())
+
+
+def test_token_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(rate=2, burst=3, window=None, clock=clock)
+    waits = acquire_all(backend, "a", 4)
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3] == 0.5
+    # Other clients have their own bucket
+    assert acquire_all(backend, "b", 1) == [0]
+
+    clock.now += 0.5
+    assert acquire_all(backend, "a", 2) == [0, 0.5]
+
+
+def test_sliding_window_caps_sustained_rate():
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(rate=1000, burst=1000, window=10, window_limit=5, clock=clock)
+    assert acquire_all(backend, "a", 6)[-1] == 10
+    # Halfway through the next window half of the previous one still counts
+    clock.now += 15
+    waits = acquire_all(backend, "a", 4)
+    assert waits[:3] == [0, 0, 0]
+    # Estimate is 5 * 0.5 + 3; it drops below 5 once 60% of the previous window has passed
+    assert abs(waits[3] - 1.0) < 1e-9
+
+
+def test_idle_clients_are_evicted():
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(idle_timeout=60, max_clients=3, clock=clock)
+    for key in "abc":
+        acquire_all(backend, key, 1)
+    acquire_all(backend, "d", 1)  # Over max_clients: "a" goes
+    assert len(backend) == 3
+    clock.now += 61
+    acquire_all(backend, "e", 1)  # Everyone else is idle now
+    assert len(backend) == 1
+
+
+def test_middleware_returns_429_with_retry_after():
+    app = FastAPI()
+    backend = InMemoryRateLimitBackend(rate=0.1, burst=2, window=None)
+    app.add_middleware(RateLimitMiddleware, backend=backend, exempt_paths={"/health"})
+
+    @app.get("/")
+    async def root():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert [client.get("/").status_code for _ in range(2)] == [200, 200]
+    response = client.get("/")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "10"
+    assert client.get("/health").status_code == 200
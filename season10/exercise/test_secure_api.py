@@ -0,0 +1,38 @@
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from secure_api import ProductSearchQuery, app
+
+
+def test_search_query_validates_once_and_normalizes():
+    validated = ProductSearchQuery(query="Phone 'head' phone")
+    assert validated.escaped == "Phone &#x27;head&#x27; phone"
+    assert validated.tokens == ("head", "phone")
+    for query in ("", "x" * 101, "<script>", "a;b"):
+        with pytest.raises(ValidationError):
+            ProductSearchQuery(query=query)
+
+
+def test_search_rejects_invalid_queries_with_400():
+    client = TestClient(app)
+    assert client.get("/api/products/search", params={"query": "phone"}).json()["total_count"] == 2
+    assert client.get("/api/products/search", params={"query": "<b>"}).status_code == 400
+    assert client.get("/api/products/search", params={"query": ""}).status_code == 400
+    assert client.get("/api/products/search", params={"query": "x" * 101}).status_code == 400
+
+
+def test_openapi_declares_query_length_limits():
+    parameters = TestClient(app).get("/openapi.json").json()["paths"]["/api/products/search"]["get"]["parameters"]
+    query = next(parameter for parameter in parameters if parameter["name"] == "query")
+    assert (query["schema"]["minLength"], query["schema"]["maxLength"]) == (1, 100)
+
+
+def test_search_returns_only_requested_fields():
+    client = TestClient(app)
+    response = client.get("/api/products/search", params={"query": "phone", "fields": "name, price"})
+    assert response.json()["results"] == [
+        {"name": "Smartphone", "price": 699.99},
+        {"name": "Headphones", "price": 199.99},
+    ]
+    assert client.get("/api/products/search", params={"query": "phone", "fields": "name,secret"}).status_code == 400
@@ -0,0 +1,72 @@
+"""
+Time to execute a repeated GraphQL query with and without the document cache.
+
+Usage: python benchmark_graphql.py [--iterations 2000]
+
+Both schemas run the same resolvers and validation rules; only the
+cached one skips parsing and validation after the first request. The
+persisted run also sends just the hash, as an APQ client would.
+"""
+import argparse
+import asyncio
+import time
+
+import strawberry
+from strawberry.extensions import AddValidationRules
+
+from persisted_queries import DocumentCache, PersistedQueries, query_hash
+from user_api import Mutation, Query, QueryLimits, user_store
+from user_store import make_loaders
+
+QUERY = """
+query Dashboard($first: Int!) {
+  me: user(id: 1) { id name email }
+  team: usersByIds(ids: [2, 3]) { id name }
+  users(first: $first) {
+    edges { cursor node { id name ...Contact } }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+fragment Contact on User { email }
+"""
+
+
+def build_schema(cache=None) -> strawberry.Schema:
+    extensions = [lambda: AddValidationRules([QueryLimits])]
+    if cache is not None:
+        extensions.insert(0, lambda: PersistedQueries(cache))
+    return strawberry.Schema(query=Query, mutation=Mutation, extensions=extensions)
+
+
+async def run(schema: strawberry.Schema, iterations: int, persisted: bool) -> float:
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash(QUERY)}}
+    variables = {"first": 3}
+    # Warm up, registering the query when persisted
+    await schema.execute(QUERY, variables, make_loaders(user_store), operation_extensions=extensions if persisted else None)
+    query = None if persisted else QUERY
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = await schema.execute(
+            query, variables, make_loaders(user_store), operation_extensions=extensions if persisted else None
+        )
+        assert result.errors is None, result.errors
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    cases = [
+        ("parse + validate", build_schema(), False),
+        ("document cache", build_schema(DocumentCache()), False),
+        ("persisted (hash only)", build_schema(DocumentCache()), True),
+    ]
+    for label, schema, persisted in cases:
+        per_request = asyncio.run(run(schema, args.iterations, persisted))
+        print(f"{label:<22} {per_request:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Automatic persisted queries and a cache of parsed, validated documents.
+
+Clients following the Apollo APQ protocol send only
+`extensions: {"persistedQuery": {"version": 1, "sha256Hash": ...}}` plus
+variables. If the server doesn't know the hash it answers
+PersistedQueryNotFound, and the client retries once with the full query,
+which registers it.
+
+Every document, persisted or not, is cached by the SHA-256 of its text
+together with its validation result. A repeated query skips both parsing
+and validation. Validation depends only on the schema and its rules,
+which are fixed for the cache's lifetime, so the cached result stays
+correct.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from graphql import DocumentNode, GraphQLError
+from strawberry.extensions import SchemaExtension
+
+
+class CachedDocument(NamedTuple):
+    query: str
+    document: DocumentNode
+    errors: List[GraphQLError]
+
+
+class DocumentCache:
+    """LRU of parsed and validated documents keyed by the SHA-256 of their text."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedDocument]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query_hash: str) -> Optional[CachedDocument]:
+        entry = self._entries.get(query_hash)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(query_hash)
+        self.hits += 1
+        return entry
+
+    def put(self, query_hash: str, entry: CachedDocument) -> None:
+        self._entries[query_hash] = entry
+        self._entries.move_to_end(query_hash)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+class PersistedQueries(SchemaExtension):
+    """
+    Resolve persisted-query hashes and serve documents from a DocumentCache.
+
+    Pass it as a factory sharing one cache, so the cache outlives requests:
+    `extensions=[lambda: PersistedQueries(cache)]`.
+    """
+
+    def __init__(self, cache: DocumentCache):
+        super().__init__()
+        self.cache = cache
+        self._hash: Optional[str] = None  # Set when the document must be cached after validation
+
+    def on_operation(self) -> Iterator[None]:
+        context = self.execution_context
+        extensions = context.operation_extensions or {}
+        persisted = extensions.get("persistedQuery") if isinstance(extensions, dict) else None
+        if persisted is not None:
+            # Client-supplied JSON; anything malformed gets a coded error, not a Python one
+            if not isinstance(persisted, dict) or not isinstance(persisted.get("sha256Hash"), str):
+                raise GraphQLError(
+                    "persistedQuery must be an object with a string sha256Hash",
+                    extensions={"code": "PERSISTED_QUERY_INVALID"},
+                )
+            if persisted.get("version") != 1:
+                raise GraphQLError("Unsupported persisted query version", extensions={"code": "PERSISTED_QUERY_VERSION"})
+
+        if context.query:
+            digest = query_hash(context.query)
+            if persisted is not None and persisted.get("sha256Hash") != digest:
+                raise GraphQLError("Provided sha256Hash does not match query", extensions={"code": "PERSISTED_QUERY_HASH_MISMATCH"})
+        elif persisted is not None:
+            digest = persisted.get("sha256Hash")
+        else:
+            yield  # No query at all; Strawberry reports it
+            return
+
+        entry = self.cache.get(digest)
+        if entry is not None:
+            # Both set, so Strawberry skips parsing and validation
+            context.query = entry.query
+            context.graphql_document = entry.document
+            context.pre_execution_errors = list(entry.errors)
+        elif not context.query:
+            raise GraphQLError("PersistedQueryNotFound", extensions={"code": "PERSISTED_QUERY_NOT_FOUND"})
+        else:
+            self._hash = digest
+        yield
+
+    def on_validate(self) -> Iterator[None]:
+        yield
+        context = self.execution_context
+        if self._hash is not None and context.graphql_document is not None:
+            self.cache.put(
+                self._hash,
+                CachedDocument(context.query, context.graphql_document, list(context.pre_execution_errors or ())),
+            )
@@ -0,0 +1,134 @@
+"""
+Static cost and depth limits for GraphQL queries.
+
+The analysis runs as a validation rule, so a query over the limits is
+rejected before any resolver runs. Every field costs 1, multiplied by the
+size of each list it is nested in. List sizes come from the arguments:
+`first: 50` means 50 items, `ids: [1, 2, 3]` means 3. An argument given as
+a variable counts as the largest page a client can ask for, since variable
+values aren't known statically; a list field with no size argument counts
+as its default page size. Sizes are clamped to that largest page, which the
+resolvers enforce, so `first: -5` can't lower a cost and `first: 10**9`
+reports what would actually run.
+
+Each fragment is measured once per document and reused at every spread,
+so fragments spreading other fragments several times cost linear time to
+analyze, not exponential.
+"""
+from typing import Dict, Optional, Tuple, Type
+
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    IntValueNode,
+    ListValueNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    ValidationRule,
+)
+
+# Arguments that say how many items a list field returns
+SIZE_ARGUMENTS = ("first", "ids")
+
+
+class _Analyzer:
+    def __init__(self, document: DocumentNode, list_fields: Dict[str, int], max_list_size: int):
+        self.list_fields = list_fields
+        self.max_list_size = max_list_size
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        self._fragment_measures: Dict[str, Tuple[int, int]] = {}
+
+    def list_size(self, field: FieldNode) -> int:
+        for argument in field.arguments or ():
+            if argument.name.value not in SIZE_ARGUMENTS:
+                continue
+            value = argument.value
+            if isinstance(value, IntValueNode):
+                return max(0, min(int(value.value), self.max_list_size))
+            if isinstance(value, ListValueNode):
+                return min(len(value.values), self.max_list_size)
+            return self.max_list_size  # A variable
+        if field.name.value in self.list_fields:
+            return self.list_fields[field.name.value]
+        return 1
+
+    def measure(self, selection_set: Optional[SelectionSetNode], seen=frozenset()):
+        """(cost, depth) of a selection set."""
+        if selection_set is None:
+            return 0, 0
+        cost = depth = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                child_cost, child_depth = self.measure(selection.selection_set, seen)
+                cost += 1 + self.list_size(selection) * child_cost
+                depth = max(depth, 1 + child_depth)
+                continue
+            if isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in seen:
+                    continue  # Reported by the standard validation rules
+                measured = self._fragment_measures.get(name)
+                if measured is None:
+                    measured = self._fragment_measures[name] = self.measure(fragment.selection_set, seen | {name})
+                child_cost, child_depth = measured
+            elif isinstance(selection, InlineFragmentNode):
+                child_cost, child_depth = self.measure(selection.selection_set, seen)
+            else:
+                continue
+            cost += child_cost
+            depth = max(depth, child_depth)
+        return cost, depth
+
+
+def analyze(
+    document: DocumentNode,
+    list_fields: Optional[Dict[str, int]] = None,
+    max_list_size: int = 100,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Cost and depth of each operation in `document`.
+
+    Args:
+        list_fields: Default sizes of list fields queried without a size argument
+        max_list_size: Largest list any field returns; assumed for size arguments passed as variables
+
+    Returns:
+        {operation name (or "" if anonymous): {"cost": ..., "depth": ...}}
+    """
+    analyzer = _Analyzer(document, list_fields or {}, max_list_size)
+    results = {}
+    for definition in document.definitions:
+        if isinstance(definition, OperationDefinitionNode):
+            cost, depth = analyzer.measure(definition.selection_set)
+            name = definition.name.value if definition.name else ""
+            results[name] = {"cost": cost, "depth": depth}
+    return results
+
+
+def query_limits_rule(
+    max_cost: int,
+    max_depth: int,
+    list_fields: Optional[Dict[str, int]] = None,
+    max_list_size: int = 100,
+) -> Type[ValidationRule]:
+    """A validation rule rejecting operations over `max_cost` or `max_depth`."""
+
+    class QueryLimitsRule(ValidationRule):
+        def enter_document(self, node: DocumentNode, *_args):
+            for name, measured in analyze(node, list_fields, max_list_size).items():
+                label = f"Operation '{name}'" if name else "Query"
+                if measured["depth"] > max_depth:
+                    self.report_error(GraphQLError(f"{label} is {measured['depth']} levels deep; the limit is {max_depth}"))
+                if measured["cost"] > max_cost:
+                    self.report_error(GraphQLError(f"{label} costs {measured['cost']}; the limit is {max_cost}"))
+
+    return QueryLimitsRule
@@ -0,0 +1,220 @@
+import asyncio
+import threading
+
+import pytest
+from graphql import parse
+
+from persisted_queries import query_hash
+from query_limits import analyze
+from user_api import USERS, document_cache, schema
+from user_store import InMemoryUserStore, SQLiteUserStore, UserUpdate, VersionConflict, make_loaders
+
+
+class CountingStore(InMemoryUserStore):
+    def __init__(self, users):
+        super().__init__(users)
+        self.calls = []
+
+    async def get_many(self, ids):
+        self.calls.append(list(ids))
+        return await super().get_many(ids)
+
+    async def list_page(self, after, limit, fields):
+        self.calls.append((after, limit, list(fields)))
+        return await super().list_page(after, limit, fields)
+
+
+def execute(query, store):
+    return asyncio.run(schema.execute(query, context_value=make_loaders(store)))
+
+
+def test_user_lookups_are_batched_and_deduped():
+    store = CountingStore(USERS)
+    result = execute(
+        "{ a: user(id: 1) { name } b: user(id: 2) { name } c: user(id: 1) { email } "
+        "many: usersByIds(ids: [3, 2, 99]) { name } }",
+        store,
+    )
+    assert result.errors is None
+    assert result.data["a"] == {"name": "Sebastian Nascimento"}
+    assert result.data["c"] == {"email": "sebastian@example.com"}
+    assert result.data["many"] == [{"name": "Bob Smith"}, {"name": "Alice Johnson"}, None]
+    assert store.calls == [[1, 2, 3, 99]]
+
+
+def test_mutation_clears_the_cached_user(monkeypatch):
+    import user_api
+
+    store = CountingStore(USERS)
+    monkeypatch.setattr(user_api, "user_store", store)
+    context = make_loaders(store)
+
+    async def run():
+        await schema.execute("{ user(id: 2) { name } }", context_value=context)
+        await schema.execute('mutation { updateUserName(input: {id: 2, name: "Alice J"}) { name } }', context_value=context)
+        return await schema.execute("{ user(id: 2) { name version } }", context_value=context)
+
+    assert asyncio.run(run()).data == {"user": {"name": "Alice J", "version": 2}}
+    # The updated record was primed into the loader, so no second fetch
+    assert store.calls == [[2]]
+
+
+def test_batch_mutation_updates_users_not_loaded_before(monkeypatch):
+    import user_api
+
+    monkeypatch.setattr(user_api, "user_store", CountingStore(USERS))
+    result = execute(
+        'mutation { updateUserNames(inputs: [{id: 1, name: "Seb", expectedVersion: 1}, {id: 2, name: "Al"}, {id: 9, name: "X"}]) '
+        "{ id name version } }",
+        user_api.user_store,
+    )
+    assert result.data == {"updateUserNames": [{"id": 1, "name": "Seb", "version": 2}, {"id": 2, "name": "Al", "version": 2}, None]}
+    result = execute('mutation { updateUserName(input: {id: 1, name: "S", expectedVersion: 1}) { name } }', user_api.user_store)
+    assert result.errors[0].extensions == {"code": "VERSION_CONFLICT"}
+
+    store = user_api.user_store
+    result = asyncio.run(schema.execute(
+        "mutation Rename($inputs: [UpdateNameInput!]!) { updateUserNames(inputs: $inputs) { id } }",
+        variable_values={"inputs": [{"id": 1, "name": "X"}] * 101},
+        context_value=make_loaders(store),
+    ))
+    assert result.errors[0].message == "inputs may name at most 100 users"
+    assert asyncio.run(store.get_many([1]))[0]["name"] == "Seb"
+
+
+def test_users_are_paged_and_projected(monkeypatch):
+    import user_api
+
+    store = CountingStore({i: {"id": i, "name": f"User {i}", "email": f"{i}@example.com"} for i in range(1, 6)})
+    monkeypatch.setattr(user_api, "user_store", store)
+    query = "query($after: String) { users(first: 2, after: $after) { edges { node { name } } pageInfo { hasNextPage endCursor } } }"
+    names, after = [], None
+    while True:
+        result = asyncio.run(schema.execute(query, variable_values={"after": after}, context_value=make_loaders(store)))
+        connection = result.data["users"]
+        names += [edge["node"]["name"] for edge in connection["edges"]]
+        if not connection["pageInfo"]["hasNextPage"]:
+            break
+        after = connection["pageInfo"]["endCursor"]
+    assert names == [f"User {i}" for i in range(1, 6)]
+    # Only the selected field is loaded, one extra row at a time
+    assert store.calls == [(None, 3, ["name"]), (2, 3, ["name"]), (4, 3, ["name"])]
+
+
+def test_expensive_queries_are_rejected_before_execution():
+    store = CountingStore(USERS)
+    fields = "edges { node { id name email } }"
+    assert analyze(parse(f"{{ users(first: 100) {{ {fields} }} }}")) == {"": {"cost": 1 + 100 * 5, "depth": 4}}
+    result = execute(f"{{ a: users(first: 100) {{ {fields} }} b: users(first: 100) {{ {fields} }} }}", store)
+    assert result.errors[0].message == "Query costs 1002; the limit is 1000"
+    assert store.calls == []
+
+
+def test_list_sizes_are_clamped_to_the_largest_page():
+    fields = "edges { node { id } }"
+    assert analyze(parse(f"{{ users(first: -5) {{ {fields} }} }}"))[""]["cost"] == 1
+    assert analyze(parse(f"{{ users(first: 1000000) {{ {fields} }} }}"))[""]["cost"] == 1 + 100 * 3
+    ids = ", ".join(map(str, range(101)))
+    assert analyze(parse(f"{{ usersByIds(ids: [{ids}]) {{ id }} }}"))[""]["cost"] == 1 + 100
+
+    result = asyncio.run(schema.execute(
+        "query Many($ids: [Int!]!) { usersByIds(ids: $ids) { id } }",
+        variable_values={"ids": list(range(200_000))},
+        context_value=make_loaders(InMemoryUserStore(USERS)),
+    ))
+    assert result.errors[0].message == "ids may name at most 100 users"
+
+
+def test_fragments_are_measured_once_per_document():
+    # Each fragment spreads the next one twice: 2**40 paths, but 40 fragments to measure
+    fragments = " ".join(f"fragment F{i} on User {{ ...F{i + 1} ...F{i + 1} }}" for i in range(40))
+    document = parse(f"{{ user(id: 1) {{ ...F0 }} }} {fragments} fragment F40 on User {{ id }}")
+    assert analyze(document) == {"": {"cost": 1 + 2 ** 40, "depth": 2}}
+
+
+def test_persisted_queries_register_once_then_run_by_hash():
+    store = CountingStore(USERS)
+    query = "{ user(id: 3) { email } }"
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash(query)}}
+
+    def run(text):
+        return asyncio.run(schema.execute(text, context_value=make_loaders(store), operation_extensions=extensions))
+
+    assert run(None).errors[0].message == "PersistedQueryNotFound"
+    assert run(query).data == {"user": {"email": "bob@example.com"}}
+    hits = document_cache.hits
+    assert run(None).data == {"user": {"email": "bob@example.com"}}
+    assert document_cache.hits == hits + 1
+    assert run("{ user(id: 2) { email } }").errors[0].message == "Provided sha256Hash does not match query"
+
+
+@pytest.mark.parametrize("persisted", ["x", {"version": 1}, {"version": 1, "sha256Hash": ["a"]}])
+def test_malformed_persisted_queries_get_a_coded_error(persisted):
+    result = asyncio.run(schema.execute(
+        None,
+        context_value=make_loaders(InMemoryUserStore(USERS)),
+        operation_extensions={"persistedQuery": persisted},
+    ))
+    assert result.errors[0].extensions == {"code": "PERSISTED_QUERY_INVALID"}
+
+
+def test_cached_documents_keep_their_validation_errors():
+    store = CountingStore(USERS)
+    for _ in range(2):
+        result = execute("{ user(id: 1) { password } }", store)
+        assert result.errors[0].message == "Cannot query field 'password' on type 'User'."
+    assert store.calls == []
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryUserStore(USERS)
+        return
+    store = SQLiteUserStore(str(tmp_path / "users.db"))
+    for record in USERS.values():
+        store.put(record)
+    yield store
+    store.close()
+
+
+def test_batch_updates_are_atomic_and_versioned(store):
+    updated = asyncio.run(store.update_many([UserUpdate(1, {"name": "Seb"}, 1), UserUpdate(99, {"name": "Nobody"})]))
+    assert [record and (record["name"], record["version"]) for record in updated] == [("Seb", 2), None]
+    # The stale expected version on user 1 fails the batch, so user 2 keeps its name too
+    with pytest.raises(VersionConflict):
+        asyncio.run(store.update_many([UserUpdate(2, {"name": "Al"}, 1), UserUpdate(1, {"name": "S"}, 1)]))
+    assert [(r["name"], r["version"]) for r in asyncio.run(store.get_many([1, 2]))] == [("Seb", 2), ("Alice Johnson", 1)]
+    with pytest.raises(ValueError):
+        asyncio.run(store.update_many([UserUpdate(1, {"version": 7})]))
+
+
+def test_concurrent_writers_never_lose_updates(store):
+    returned = []
+
+    def writer(suffix):
+        # Read-modify-write with retries on conflict, as a client would
+        for _ in range(20):
+            while True:
+                (record,) = asyncio.run(store.get_many([3]))
+                try:
+                    (updated,) = asyncio.run(
+                        store.update_many([UserUpdate(3, {"name": record["name"] + suffix}, record["version"])])
+                    )
+                    returned.append((updated["version"], updated["name"]))
+                    break
+                except VersionConflict:
+                    continue
+
+    threads = [threading.Thread(target=writer, args=(suffix,)) for suffix in "abcd"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    (record,) = asyncio.run(store.get_many([3]))
+    assert record["version"] == 81
+    assert sorted(record["name"][len("Bob Smith"):]) == sorted("abcd" * 20)
+    # Each writer got back its own write, never a later writer's
+    returned.sort()
+    assert [version for version, _ in returned] == list(range(2, 82))
+    assert all(len(name) == len("Bob Smith") + version - 1 for version, name in returned)
@@ -1,70 +1,207 @@
+import base64
+import os
 import strawberry
 from fastapi import FastAPI
+from graphql import GraphQLError
+from strawberry.extensions import AddValidationRules
 from strawberry.fastapi import GraphQLRouter
-from typing import List, Optional, Dict
+from strawberry.types.nodes import FragmentSpread, InlineFragment, Selection
+from typing import Any, Iterable, List, Optional, Dict
+
+from persisted_queries import DocumentCache, PersistedQueries
+from query_limits import query_limits_rule
+from user_store import USER_COLUMNS, InMemoryUserStore, SQLiteUserStore, UserUpdate, VersionConflict, make_loaders
 
 # ----- Sample Data -----
-# In-memory user database
+# Initial users, loaded into the user store at startup
 USERS = {
     1: {"id": 1, "name": "Sebastian Nascimento", "email": "sebastian@example.com"},
     2: {"id": 2, "name": "Alice Johnson", "email": "alice@example.com"},
     3: {"id": 3, "name": "Bob Smith", "email": "bob@example.com"}
 }
 
+# Store behind the resolvers: in this process's memory by default, or a
+# SQLite file shared by several processes when USER_DB names one
+def create_user_store():
+    path = os.environ.get("USER_DB")
+    if not path:
+        return InMemoryUserStore(USERS)
+    store = SQLiteUserStore(path)
+    if not len(store):
+        for record in USERS.values():
+            store.put(record)
+    return store
+
+user_store = create_user_store()
+
 # ----- GraphQL Types -----
 @strawberry.type
 class User:
     id: int
     name: str
     email: str
+    # Incremented on every change; pass it back as expectedVersion to update safely
+    version: int
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "User":
+        """User from a projected record; fields left out were not requested and are never resolved."""
+        return cls(id=record["id"], name=record.get("name"), email=record.get("email"), version=record.get("version"))
+
+# Relay-style connection for paging through users
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    end_cursor: Optional[str]
+
+@strawberry.type
+class UserEdge:
+    cursor: str
+    node: User
+
+@strawberry.type
+class UserConnection:
+    edges: List[UserEdge]
+    page_info: PageInfo
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+# Record fields that can be loaded selectively; id is always loaded
+USER_FIELDS = USER_COLUMNS + ("version",)
+
+def encode_cursor(user_id: int) -> str:
+    return base64.urlsafe_b64encode(f"user:{user_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        kind, _, user_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition(":")
+        if kind == "user":
+            return int(user_id)
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid cursor: {cursor!r}")
+
+def _selected_names(selections: Iterable[Selection], path: Iterable[str]) -> set:
+    """Names of the fields selected at `path` below `selections`, looking through fragments."""
+    path = list(path)
+    names = set()
+    for selection in selections:
+        if isinstance(selection, (FragmentSpread, InlineFragment)):
+            names |= _selected_names(selection.selections, path)
+        elif not path:
+            names.add(selection.name)
+        elif selection.name == path[0]:
+            names |= _selected_names(selection.selections, path[1:])
+    return names
 
 # ----- Input Types -----
 @strawberry.input
 class UpdateNameInput:
     id: int
     name: str
+    # Fail instead of overwriting if someone else changed the user since this version
+    expected_version: Optional[int] = None
 
 # ----- Query Type -----
 @strawberry.type
 class Query:
     @strawberry.field
-    def user(self, id: int) -> Optional[User]:
+    async def user(self, info: strawberry.Info, id: int) -> Optional[User]:
         """Get a user by ID"""
-        user_data = USERS.get(id)
+        # Batched with every other user lookup in this request
+        user_data = await info.context["user_loader"].load(id)
         if user_data:
             return User(**user_data)
         return None
     
     @strawberry.field
-    def users(self) -> List[User]:
-        """Get all users"""
-        return [User(**user) for user in USERS.values()]
+    async def users_by_ids(self, info: strawberry.Info, ids: List[int]) -> List[Optional[User]]:
+        """Get several users by ID, in the order given (null for unknown IDs)"""
+        # Bounded like a page; the query cost analysis relies on it for ids passed as variables
+        if len(ids) > MAX_PAGE_SIZE:
+            raise ValueError(f"ids may name at most {MAX_PAGE_SIZE} users")
+        users = await info.context["user_loader"].load_many(ids)
+        return [User(**user_data) if user_data else None for user_data in users]
+    
+    @strawberry.field
+    async def users(
+        self, info: strawberry.Info, first: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None
+    ) -> UserConnection:
+        """Page through users in ID order; pass the previous page's endCursor as `after`"""
+        if not 0 < first <= MAX_PAGE_SIZE:
+            raise ValueError(f"first must be between 1 and {MAX_PAGE_SIZE}")
+        # Load only the user fields the query asks for
+        selected = set()
+        for field in info.selected_fields:
+            selected |= _selected_names(field.selections, ["edges", "node"])
+        fields = [field for field in USER_FIELDS if field in selected]
+        # One extra row tells whether there is a next page
+        records = await user_store.list_page(decode_cursor(after) if after else None, first + 1, fields)
+        edges = [UserEdge(cursor=encode_cursor(record["id"]), node=User.from_record(record)) for record in records[:first]]
+        return UserConnection(
+            edges=edges,
+            page_info=PageInfo(
+                has_next_page=len(records) > first,
+                end_cursor=edges[-1].cursor if edges else None,
+            ),
+        )
 
 # ----- Mutation Type -----
 @strawberry.type
 class Mutation:
     @strawberry.mutation
-    def update_user_name(self, input: UpdateNameInput) -> Optional[User]:
+    async def update_user_name(self, info: strawberry.Info, input: UpdateNameInput) -> Optional[User]:
         """Update a user's name"""
-        user_id = input.id
-        new_name = input.name
-        
-        # Check if the user exists
-        if user_id not in USERS:
-            return None
-        
-        # Update the user's name
-        USERS[user_id]["name"] = new_name
-        
-        # Return the updated user
-        return User(**USERS[user_id])
+        users = await _update_names(info, [input])
+        return users[0]
+    
+    @strawberry.mutation
+    async def update_user_names(self, info: strawberry.Info, inputs: List[UpdateNameInput]) -> List[Optional[User]]:
+        """Update several users' names at once; if any update conflicts, none is applied"""
+        # Bounded like usersByIds, so one request can't lock and rewrite the whole store
+        if len(inputs) > MAX_PAGE_SIZE:
+            raise ValueError(f"inputs may name at most {MAX_PAGE_SIZE} users")
+        return await _update_names(info, inputs)
+
+async def _update_names(info: strawberry.Info, inputs: List[UpdateNameInput]) -> List[Optional[User]]:
+    updates = [UserUpdate(item.id, {"name": item.name}, item.expected_version) for item in inputs]
+    try:
+        records = await user_store.update_many(updates)
+    except VersionConflict as e:
+        raise GraphQLError(str(e), extensions={"code": "VERSION_CONFLICT"}) from e
+    # Later lookups in this request must see the new records, not cached old ones
+    info.context["user_loader"].prime_many({record["id"]: record for record in records if record}, force=True)
+    return [User.from_record(record) if record else None for record in records]
 
 # ----- FastAPI Integration -----
+# Reject expensive queries during validation, before any resolver runs
+QueryLimits = query_limits_rule(
+    max_cost=1000,
+    max_depth=6,
+    list_fields={"users": DEFAULT_PAGE_SIZE},
+    max_list_size=MAX_PAGE_SIZE,
+)
+
+# Parsed and validated documents by hash, shared by all requests; also the
+# registry for automatic persisted queries
+document_cache = DocumentCache(max_entries=1000)
+
 # Create schema
-schema = strawberry.Schema(query=Query, mutation=Mutation)
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    extensions=[
+        lambda: PersistedQueries(document_cache),
+        lambda: AddValidationRules([QueryLimits]),
+    ],
+)
+
+# New DataLoaders for every request, so batches and caches never mix requests
+async def get_context() -> Dict:
+    return make_loaders(user_store)
 
 # Create a GraphQL router
-graphql_router = GraphQLRouter(schema)
+graphql_router = GraphQLRouter(schema, context_getter=get_context)
 
 # Create the FastAPI app
 app = FastAPI(title="User GraphQL API")
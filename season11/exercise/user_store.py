@@ -0,0 +1,272 @@
+"""
+Storage backends for the user GraphQL API.
+
+Resolvers never read a store directly. They go through the per-request
+DataLoader from `make_loaders`, which collects every `load(id)` issued
+during one event-loop tick, dedupes the ids and hands them to the store's
+`get_many` in a single call. A query naming many users (by alias or by
+list) therefore costs one store round trip, not one per user.
+
+Listing is paged by id (keyset pagination) and projected: `list_page`
+returns only the requested fields of at most `limit` users, so the size
+of the table never matters to a single request.
+
+Writes are versioned. Every record carries a `version` that each update
+increments, and an update may name the version it was based on; if the
+record has moved on since, the whole batch fails with VersionConflict
+instead of silently overwriting the other writer. `update_many` applies a
+batch atomically: all of its updates or none.
+"""
+import asyncio
+import bisect
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from strawberry.dataloader import DataLoader
+
+UserRecord = Dict[str, Any]
+
+# Fields a client may change or select; "id" and "version" are managed by the store
+USER_COLUMNS = ("name", "email")
+
+
+class UserUpdate(NamedTuple):
+    id: int
+    changes: Dict[str, Any]
+    # Version the change was based on; None to apply it whatever the current version
+    expected_version: Optional[int] = None
+
+
+class VersionConflict(Exception):
+    def __init__(self, user_id: int, expected: int, actual: int):
+        super().__init__(f"User {user_id} is at version {actual}, not {expected}; reload it and retry")
+        self.user_id = user_id
+        self.expected = expected
+        self.actual = actual
+
+
+def _check_changes(updates: Iterable[UserUpdate]) -> None:
+    for update in updates:
+        unknown = set(update.changes) - set(USER_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot update fields: {', '.join(sorted(unknown))}")
+
+
+class UserStore(ABC):
+    @abstractmethod
+    async def get_many(self, ids: Sequence[int]) -> List[Optional[UserRecord]]:
+        """
+        Fetch several users in one round trip.
+
+        Returns:
+            One entry per id, in the same order; None for unknown ids
+        """
+
+    @abstractmethod
+    async def list_page(self, after: Optional[int], limit: int, fields: Sequence[str]) -> List[UserRecord]:
+        """
+        Users with ids greater than `after`, in id order, at most `limit` of them.
+
+        Records hold "id" plus the given fields only.
+        """
+
+    @abstractmethod
+    async def update_many(self, updates: Sequence[UserUpdate]) -> List[Optional[UserRecord]]:
+        """
+        Apply a batch of updates atomically.
+
+        Returns:
+            The updated records, one per update; None for unknown ids
+
+        Raises:
+            VersionConflict: An expected version didn't match; nothing was changed
+        """
+
+
+class InMemoryUserStore(UserStore):
+    """
+    Users held in a dict in this process, keyed by id.
+
+    Records are never modified in place: an update swaps in a new dict, so
+    readers need no lock and never see half an update. Writers lock only
+    the users they touch, through a fixed set of striped locks taken in
+    a fixed order, so writers to different users proceed independently.
+    """
+
+    def __init__(self, users: Dict[int, UserRecord], lock_stripes: int = 64):
+        self.users = {user_id: {"version": 1, **record} for user_id, record in users.items()}
+        self._ids = sorted(self.users)  # For paging; users are added through put()
+        self._ids_lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(lock_stripes)]
+
+    def put(self, record: UserRecord) -> None:
+        """Add or replace a user."""
+        record = {"version": 1, **record}
+        with self._ids_lock, self._locked([record["id"]]):
+            if record["id"] not in self.users:
+                bisect.insort(self._ids, record["id"])
+            self.users[record["id"]] = record
+
+    @contextmanager
+    def _locked(self, ids: Iterable[int]) -> Iterator[None]:
+        # Sorted, so two batches never wait on each other's stripes in a cycle
+        stripes = sorted({user_id % len(self._stripes) for user_id in ids})
+        for index in stripes:
+            self._stripes[index].acquire()
+        try:
+            yield
+        finally:
+            for index in reversed(stripes):
+                self._stripes[index].release()
+
+    async def get_many(self, ids: Sequence[int]) -> List[Optional[UserRecord]]:
+        users = self.users
+        return [users.get(user_id) for user_id in ids]
+
+    async def list_page(self, after: Optional[int], limit: int, fields: Sequence[str]) -> List[UserRecord]:
+        start = bisect.bisect_right(self._ids, after) if after is not None else 0
+        page = []
+        for user_id in self._ids[start:start + limit]:
+            record = self.users[user_id]
+            page.append({"id": user_id, **{field: record[field] for field in fields}})
+        return page
+
+    def _update_many(self, updates: Sequence[UserUpdate]) -> List[Optional[UserRecord]]:
+        _check_changes(updates)
+        users = self.users
+        with self._locked(update.id for update in updates):
+            # Check every version before changing anything
+            pending: Dict[int, UserRecord] = {}
+            for update in updates:
+                current = pending.get(update.id) or users.get(update.id)
+                if current is None:
+                    continue
+                if update.expected_version is not None and update.expected_version != current["version"]:
+                    raise VersionConflict(update.id, update.expected_version, current["version"])
+                pending[update.id] = {**current, **update.changes, "version": current["version"] + 1}
+            users.update(pending)
+        # The records built under the lock; a later writer may already have replaced them in `users`
+        return [pending.get(update.id) for update in updates]
+
+    async def update_many(self, updates: Sequence[UserUpdate]) -> List[Optional[UserRecord]]:
+        return self._update_many(updates)
+
+
+class SQLiteUserStore(UserStore):
+    """
+    Users in a SQLite database, shared by every process that opens the file.
+
+    The database runs in WAL mode, so readers don't block the writer or each
+    other. Connections come from a fixed pool and queries run in worker
+    threads, keeping the event loop free. Versions are checked in the
+    UPDATE's WHERE clause inside one transaction per batch.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4, busy_timeout: float = 5.0):
+        self.path = path
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            # Autocommit mode; transactions are started explicitly
+            connection = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._pool.put(connection)
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL, version INTEGER NOT NULL DEFAULT 1)"
+            )
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get().close()
+
+    def put(self, record: UserRecord) -> None:
+        """Add or replace a user."""
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO users (id, name, email, version) VALUES (?, ?, ?, ?)",
+                (record["id"], record["name"], record["email"], record.get("version", 1)),
+            )
+
+    def __len__(self) -> int:
+        with self._connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def _get_many(self, ids: Sequence[int]) -> List[Optional[UserRecord]]:
+        unique = list(dict.fromkeys(ids))
+        with self._connection() as connection:
+            rows = connection.execute(
+                f"SELECT id, name, email, version FROM users WHERE id IN ({', '.join('?' * len(unique))})", unique
+            ).fetchall()
+        found = {row["id"]: dict(row) for row in rows}
+        return [found.get(user_id) for user_id in ids]
+
+    async def get_many(self, ids: Sequence[int]) -> List[Optional[UserRecord]]:
+        if not ids:
+            return []
+        return await asyncio.to_thread(self._get_many, ids)
+
+    def _list_page(self, after: Optional[int], limit: int, fields: Sequence[str]) -> List[UserRecord]:
+        # Column names come from the fixed list, never from the request
+        columns = ", ".join(["id", *(field for field in USER_COLUMNS + ("version",) if field in fields)])
+        with self._connection() as connection:
+            rows = connection.execute(
+                f"SELECT {columns} FROM users WHERE id > ? ORDER BY id LIMIT ?",
+                (after if after is not None else -1, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    async def list_page(self, after: Optional[int], limit: int, fields: Sequence[str]) -> List[UserRecord]:
+        return await asyncio.to_thread(self._list_page, after, limit, fields)
+
+    def _update_many(self, updates: Sequence[UserUpdate]) -> List[Optional[UserRecord]]:
+        _check_changes(updates)
+        updated = set()
+        with self._connection() as connection:
+            # IMMEDIATE takes the write lock up front, so the batch can't fail halfway on a busy database
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                for update in updates:
+                    assignments = "".join(f"{column} = ?, " for column in update.changes)
+                    cursor = connection.execute(
+                        f"UPDATE users SET {assignments}version = version + 1 WHERE id = ? AND (? IS NULL OR version = ?)",
+                        (*update.changes.values(), update.id, update.expected_version, update.expected_version),
+                    )
+                    if cursor.rowcount:
+                        updated.add(update.id)
+                        continue
+                    row = connection.execute("SELECT version FROM users WHERE id = ?", (update.id,)).fetchone()
+                    if row is not None:
+                        raise VersionConflict(update.id, update.expected_version, row["version"])
+                ids = list(updated)
+                rows = connection.execute(
+                    f"SELECT id, name, email, version FROM users WHERE id IN ({', '.join('?' * len(ids))})", ids
+                ).fetchall() if ids else []
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        found = {row["id"]: dict(row) for row in rows}
+        return [found.get(update.id) for update in updates]
+
+    async def update_many(self, updates: Sequence[UserUpdate]) -> List[Optional[UserRecord]]:
+        return await asyncio.to_thread(self._update_many, updates)
+
+
+def make_loaders(store: UserStore) -> Dict[str, DataLoader]:
+    """Fresh DataLoaders for one request; their caches must not outlive it."""
+    return {"user_loader": DataLoader(load_fn=store.get_many)}
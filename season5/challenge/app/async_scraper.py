@@ -1,11 +1,67 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 import asyncio
 import aiohttp
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional
+
+from app.cache import AsyncTTLCache
+from app.extract import extract_page
+
+# Pages smaller than this are parsed on the event loop; shipping them to a
+# worker process costs more than parsing them
+INLINE_EXTRACT_MAX_BYTES = 16 * 1024
+EXTRACT_WORKERS = None  # Defaults to os.cpu_count()
+
+_extract_pool: Optional[ProcessPoolExecutor] = None
+_http_session: Optional[aiohttp.ClientSession] = None
+
+def get_extract_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool used for HTML extraction."""
+    global _extract_pool
+    if _extract_pool is None:
+        _extract_pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+    return _extract_pool
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared HTTP session; fetches coalesced across requests must not depend on any one request."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession()
+    return _http_session
+
+async def close_http_session() -> None:
+    global _http_session
+    if _http_session is not None:
+        await _http_session.close()
+        _http_session = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_http_session()
+    global _extract_pool
+    if _extract_pool is not None:
+        _extract_pool.shutdown(cancel_futures=True)
+        _extract_pool = None
 
 app = FastAPI(
     title="Async Web Scraper API",
-    description="API that fetches HTML content from multiple URLs concurrently"
+    description="API that fetches HTML content from multiple URLs concurrently",
+    lifespan=lifespan
+)
+
+# Successful responses are cached for a short time, and concurrent scrapes of
+# the same URL share a single in-flight fetch
+CACHE_TTL_SECONDS = 60.0
+CACHE_MAX_ENTRIES = 512
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+response_cache = AsyncTTLCache(
+    max_entries=CACHE_MAX_ENTRIES,
+    max_size=CACHE_MAX_BYTES,
+    ttl=CACHE_TTL_SECONDS,
+    sizeof=lambda result: result.get("content_length", 0),
 )
 
 async def fetch_url(session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
@@ -13,13 +69,24 @@ async def fetch_url(session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
     try:
         # Use a timeout to prevent hanging on slow websites
         async with session.get(url, timeout=10) as response:
-            content = await response.text()
+            # Keep the raw bytes; decoding the whole page is left to the extraction worker
+            body = await response.read()
+            encoding = response.charset or "utf-8"
+            try:
+                # Only decode enough for the preview (4 bytes per character at most)
+                text = body[:2000].decode(encoding, errors="replace")
+            except LookupError:
+                encoding = "utf-8"
+                text = body[:2000].decode(encoding, errors="replace")
+            truncated = len(body) > 2000 or len(text) > 500
             return {
                 "url": url,
                 "status": response.status,
-                "content_length": len(content),
-                "content": content[:500] + "..." if len(content) > 500 else content,  # Truncate for display
-                "headers": dict(response.headers)
+                "content_length": len(body),
+                "content": text[:500] + "..." if truncated else text,  # Truncate for display
+                "headers": dict(response.headers),
+                "encoding": encoding,
+                "body": body
             }
     except asyncio.TimeoutError:
         return {"url": url, "error": "Request timed out"}
@@ -28,15 +95,47 @@ async def fetch_url(session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
     except Exception as e:
         return {"url": url, "error": f"Unexpected error: {str(e)}"}
 
+async def fetch_url_cached(url: str) -> Dict[str, Any]:
+    """Fetch a URL through the response cache, coalescing concurrent fetches."""
+    return await response_cache.get_or_load(
+        url,
+        # The shared session outlives whichever request started the fetch, so
+        # cancelling that request doesn't fail the fetch for the others waiting on it
+        lambda: fetch_url(get_http_session(), url),
+        # Errors (ours or the origin's 4xx/5xx) are returned as results; don't cache them
+        should_cache=lambda result: 200 <= result.get("status", 0) < 300,
+    )
+
+async def extract_fields(body: bytes, url: str, encoding: str) -> Dict[str, Any]:
+    """Run HTML extraction, offloading large pages to the process pool."""
+    if len(body) <= INLINE_EXTRACT_MAX_BYTES:
+        return extract_page(body, url, encoding)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_extract_pool(), extract_page, body, url, encoding)
+
+async def scrape_url(url: str, extract: bool) -> Dict[str, Any]:
+    """Fetch a URL and optionally extract structured fields from it."""
+    cached = await fetch_url_cached(url)
+    # The cached dict is shared between requests, so build a new one for the response
+    result = {key: value for key, value in cached.items() if key not in ("body", "encoding")}
+    if extract and "body" in cached:
+        try:
+            result["extracted"] = await extract_fields(cached["body"], url, cached["encoding"])
+        except Exception as e:
+            result["extraction_error"] = f"Extraction failed: {str(e)}"
+    return result
+
 @app.post("/scrape/", response_model=List[Dict[str, Any]])
-async def scrape_urls(urls: List[str]):
+async def scrape_urls(urls: List[str], extract: bool = Query(False, description="Extract structured fields from each page")):
     """
     Fetch HTML content from multiple URLs concurrently.
     
     - **urls**: List of URLs to scrape
+    - **extract**: Also parse each page and return its title, description, headings and links
     
     Returns a list of dictionaries containing URL, status code, content length, 
     headers, and a preview of the content (or error message if request failed).
+    Parsing runs in a process pool so large pages don't stall other fetches.
     """
     if not urls:
         raise HTTPException(status_code=400, detail="No URLs provided")
@@ -45,12 +144,10 @@ async def scrape_urls(urls: List[str]):
     if len(urls) > 10:
         raise HTTPException(status_code=400, detail="Maximum 10 URLs allowed per request")
         
-    # Create a single session for all requests
-    async with aiohttp.ClientSession() as session:
-        # Use asyncio.gather to fetch all URLs concurrently
-        results = await asyncio.gather(
-            *[fetch_url(session, url) for url in urls]
-        )
+    # Use asyncio.gather to fetch all URLs concurrently
+    results = await asyncio.gather(
+        *[scrape_url(url, extract) for url in urls]
+    )
         
     return results
 
@@ -58,7 +155,11 @@ async def scrape_urls(urls: List[str]):
 @app.get("/", tags=["Health"])
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "Async Web Scraper API"}
+    return {
+        "status": "healthy",
+        "service": "Async Web Scraper API",
+        "cache": response_cache.stats()
+    }
 
 if __name__ == "__main__":
     import uvicorn
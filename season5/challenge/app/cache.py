@@ -0,0 +1,134 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class AsyncTTLCache:
+    """
+    In-process LRU cache with per-entry TTL, a size bound and single-flight loading.
+
+    Concurrent calls to `get_or_load` for the same key share one in-flight
+    load instead of each running the loader. Entries are evicted when they
+    expire, when there are more than `max_entries` of them, or when their
+    combined size exceeds `max_size`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_size: int = 16 * 1024 * 1024,
+        ttl: float = 60.0,
+        sizeof: Callable[[Any], int] = lambda value: 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.ttl = ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        # key -> (expires_at, size, value), ordered from least to most recently used
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a fresh cached value, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value and evict entries until the cache is within bounds."""
+        size = self._sizeof(value)
+        if size > self.max_size:
+            # Would evict everything else and still not fit
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (self._clock() + self.ttl, size, value)
+        self._size += size
+        while len(self._entries) > self.max_entries or self._size > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] = lambda value: True,
+    ) -> Any:
+        """
+        Return the cached value for `key`, loading it at most once if missing.
+
+        Args:
+            key: Cache key
+            loader: Coroutine factory producing the value on a miss
+            should_cache: Predicate deciding whether a loaded value is stored
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            # Shield so one waiter being cancelled doesn't cancel the shared load
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        task = asyncio.ensure_future(loader())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish_load(key, done, should_cache))
+        return await asyncio.shield(task)
+
+    def _finish_load(self, key: str, task: asyncio.Future, should_cache: Callable[[Any], bool]) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        value = task.result()
+        if should_cache(value):
+            self.set(key, value)
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current occupancy."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "max_entries": self.max_entries,
+            "max_size_bytes": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "inflight": len(self._inflight),
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,114 @@
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+# Cap list fields so one huge page can't blow up the response
+MAX_LINKS = 100
+MAX_HEADINGS = 20
+
+
+class _PageParser(HTMLParser):
+    """Single-pass parser collecting the fields returned by `extract_page`."""
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.title_parts: List[str] = []
+        self.description: Optional[str] = None
+        self.language: Optional[str] = None
+        self.canonical_url: Optional[str] = None
+        self.headings: Dict[str, List[str]] = {"h1": [], "h2": []}
+        self.links: List[str] = []
+        self.link_count = 0
+        self.image_count = 0
+        self._seen_links = set()
+        self._resolved_links = set()
+        self._in_title = False
+        self._heading: Optional[str] = None
+        self._heading_parts: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs):
+        attributes = dict(attrs)
+        if tag == "title":
+            self._in_title = True
+        elif tag == "html" and attributes.get("lang"):
+            self.language = attributes["lang"]
+        elif tag == "meta" and (attributes.get("name") or "").lower() == "description":
+            self.description = (attributes.get("content") or "").strip() or None
+        elif tag == "link" and "canonical" in (attributes.get("rel") or "").lower().split():
+            if attributes.get("href"):
+                self.canonical_url = urljoin(self.base_url, attributes["href"])
+        elif tag == "a" and attributes.get("href"):
+            self._add_link(attributes["href"])
+        elif tag == "img":
+            self.image_count += 1
+        elif tag in self.headings:
+            self._heading = tag
+            self._heading_parts = []
+
+    def handle_endtag(self, tag: str):
+        if tag == "title":
+            self._in_title = False
+        elif tag == self._heading:
+            text = " ".join("".join(self._heading_parts).split())
+            if text and len(self.headings[tag]) < MAX_HEADINGS:
+                self.headings[tag].append(text)
+            self._heading = None
+
+    def handle_data(self, data: str):
+        if self._in_title:
+            self.title_parts.append(data)
+        if self._heading:
+            self._heading_parts.append(data)
+
+    def _add_link(self, href: str):
+        if href.startswith(("javascript:", "mailto:", "tel:", "#")):
+            return
+        href = href.split("#", 1)[0]
+        if href in self._seen_links:
+            return
+        self._seen_links.add(href)
+        self.link_count += 1
+        # urljoin is the slowest part of the parse, so only resolve links we return
+        if len(self.links) < MAX_LINKS:
+            link = urljoin(self.base_url, href)
+            if link not in self._resolved_links:
+                self._resolved_links.add(link)
+                self.links.append(link)
+
+
+def extract_page(body: bytes, url: str, encoding: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse an HTML page and return its structured fields.
+
+    Runs in a worker process, so it takes the raw body as bytes and decodes
+    it here rather than on the event loop.
+
+    Args:
+        body: Raw response body
+        url: URL the page was fetched from, used to resolve relative links
+        encoding: Charset reported by the server, if any
+
+    Returns:
+        Dict with title, description, language, canonical URL, headings and links
+    """
+    try:
+        text = body.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        # Unknown charset name in the Content-Type header
+        text = body.decode("utf-8", errors="replace")
+    parser = _PageParser(url)
+    parser.feed(text)
+    parser.close()
+
+    title = " ".join("".join(parser.title_parts).split())
+    return {
+        "title": title or None,
+        "description": parser.description,
+        "language": parser.language,
+        "canonical_url": parser.canonical_url,
+        "headings": parser.headings,
+        "links": parser.links,
+        "link_count": parser.link_count,
+        "image_count": parser.image_count,
+    }
@@ -0,0 +1,301 @@
+"""
+Load-testing harness for the async scraper.
+
+Starts a local aiohttp origin server with configurable latency, body size and
+error rate, runs the scraper API in a uvicorn subprocess (or targets one that
+is already running), and drives `/scrape/` at a fixed concurrency. Everything
+runs on localhost, so results are reproducible and don't depend on public sites.
+
+Socket and memory figures are sampled from the scraper's process. When
+targeting a running scraper they come from --scraper-pid if given, and
+otherwise from this harness process, which the report says.
+
+Usage (from season5/challenge):
+    python -m app.load_test --concurrency 50 --duration 15 --latency 0.05
+    python -m app.load_test --scraper-url http://localhost:8000 --scraper-pid 1234 --extract
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+
+
+# ----- Fake origin -----
+
+def create_origin_app(latency: float, jitter: float, body_size: int, error_rate: float, seed: int) -> web.Application:
+    """
+    Build an origin app serving `/page/{n}`.
+
+    Args:
+        latency: Base delay before each response, in seconds
+        jitter: Extra uniformly distributed delay, in seconds
+        body_size: Approximate size of each HTML body, in bytes
+        error_rate: Fraction of requests answered with a 500
+        seed: Seed for the latency and error RNG
+    """
+    rng = random.Random(seed)
+    link = '<a href="/page/{}">link</a>\n'
+    links = "".join(link.format(i) for i in range(max(body_size // len(link.format(0)), 1)))
+    template = "<html><head><title>Page {n}</title></head><body><h1>Page {n}</h1>\n" + links + "</body></html>"
+    stats = {"requests": 0, "errors": 0}
+
+    async def page(request: web.Request) -> web.Response:
+        stats["requests"] += 1
+        await asyncio.sleep(latency + rng.uniform(0, jitter))
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            return web.Response(status=500, text="origin error")
+        return web.Response(text=template.format(n=request.match_info["n"]), content_type="text/html")
+
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_get("/page/{n}", page)
+    return app
+
+
+async def start_origin(app: web.Application, port: int) -> web.AppRunner:
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def start_scraper(port: int) -> asyncio.subprocess.Process:
+    """
+    Run the scraper API with uvicorn in a subprocess and wait until it accepts connections.
+
+    A separate process keeps the scraper off the load driver's event loop, so
+    neither skews the other's timings.
+    """
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "uvicorn", "app.async_scraper:app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        cwd=package_root,
+    )
+    deadline = time.perf_counter() + 30
+    while True:
+        if process.returncode is not None:
+            raise RuntimeError(f"Scraper exited with code {process.returncode}")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            if time.perf_counter() > deadline:
+                process.terminate()
+                raise RuntimeError("Scraper did not start within 30s")
+            await asyncio.sleep(0.1)
+            continue
+        writer.close()
+        await writer.wait_closed()
+        return process
+
+
+async def stop_scraper(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is None:
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), 10)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+
+# ----- Process metrics -----
+
+def open_sockets(pid: Optional[int] = None) -> Optional[int]:
+    """Count sockets open in process `pid` (default: this one); Linux only."""
+    fd_dir = f"/proc/{pid or 'self'}/fd"
+    count = 0
+    try:
+        fds = os.listdir(fd_dir)
+    except OSError:
+        return None
+    for fd in fds:
+        try:
+            if os.readlink(os.path.join(fd_dir, fd)).startswith("socket:"):
+                count += 1
+        except OSError:
+            continue
+    return count
+
+
+def rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Current resident memory of process `pid` (default: this one) in MB, falling back to our peak RSS off Linux."""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        if pid is not None:
+            return None
+        # ru_maxrss is KB on Linux and bytes on macOS; this path is only hit on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 / 1024
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+# ----- Load driver -----
+
+async def run_load(
+    scraper_url: str,
+    origin_url: str,
+    concurrency: int,
+    duration: float,
+    urls_per_request: int,
+    unique_urls: int,
+    extract: bool,
+    seed: int,
+    metrics_pid: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Drive `/scrape/` with `concurrency` workers for `duration` seconds.
+
+    Args:
+        metrics_pid: Process to sample sockets and memory from; None for this harness
+
+    Returns:
+        Dict with throughput, latency percentiles, error counts and process metrics
+    """
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    failures = {"http": 0, "scrape": 0, "exception": 0}
+    peak = {"sockets": open_sockets(metrics_pid) or 0, "rss_mb": rss_mb(metrics_pid) or 0.0}
+    endpoint = f"{scraper_url}/scrape/" + ("?extract=true" if extract else "")
+    deadline = time.perf_counter() + duration
+
+    async def worker(session: aiohttp.ClientSession):
+        while time.perf_counter() < deadline:
+            urls = [f"{origin_url}/page/{rng.randrange(unique_urls)}" for _ in range(urls_per_request)]
+            start = time.perf_counter()
+            try:
+                async with session.post(endpoint, json=urls) as response:
+                    body = await response.json()
+                    if response.status != 200:
+                        failures["http"] += 1
+                        continue
+                    failures["scrape"] += sum(1 for result in body if "error" in result or result.get("status", 200) >= 500)
+            except Exception:
+                failures["exception"] += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    async def sample():
+        while True:
+            peak["sockets"] = max(peak["sockets"], open_sockets(metrics_pid) or 0)
+            peak["rss_mb"] = max(peak["rss_mb"], rss_mb(metrics_pid) or 0.0)
+            await asyncio.sleep(0.25)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        sampler = asyncio.create_task(sample())
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*[worker(session) for _ in range(concurrency)])
+        finally:
+            sampler.cancel()
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "duration_seconds": round(elapsed, 2),
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+        "failures": failures,
+        "peak_open_sockets": peak["sockets"],
+        "peak_rss_mb": round(peak["rss_mb"], 1),
+        "metrics_process": "harness" if metrics_pid is None else f"scraper (pid {metrics_pid})",
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    latency = report["latency_ms"]
+    print(f"Requests:       {report['requests']} in {report['duration_seconds']}s at concurrency {report['concurrency']}")
+    print(f"Throughput:     {report['requests_per_second']} req/s")
+    print(f"Latency (ms):   p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']}")
+    print(f"Failures:       {report['failures']}")
+    print(f"Open sockets:   {report['peak_open_sockets']} (peak, {report['metrics_process']})")
+    print(f"Memory:         {report['peak_rss_mb']} MB RSS (peak, {report['metrics_process']})")
+    if "origin" in report:
+        print(f"Origin:         {report['origin']['requests']} requests, {report['origin']['errors']} errors")
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    origin = create_origin_app(args.latency, args.jitter, args.body_size, args.error_rate, args.seed)
+    origin_runner = await start_origin(origin, args.origin_port)
+    scraper = None
+    scraper_url = args.scraper_url
+    metrics_pid = args.scraper_pid
+    try:
+        if scraper_url is None:
+            scraper = await start_scraper(args.scraper_port)
+            scraper_url = f"http://127.0.0.1:{args.scraper_port}"
+            metrics_pid = scraper.pid
+        report = await run_load(
+            scraper_url=scraper_url.rstrip("/"),
+            origin_url=f"http://127.0.0.1:{args.origin_port}",
+            concurrency=args.concurrency,
+            duration=args.duration,
+            urls_per_request=args.urls_per_request,
+            unique_urls=args.unique_urls,
+            extract=args.extract,
+            seed=args.seed,
+            metrics_pid=metrics_pid,
+        )
+        report["origin"] = dict(origin["stats"])
+        return report
+    finally:
+        if scraper is not None:
+            await stop_scraper(scraper)
+        await origin_runner.cleanup()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the async scraper against a local fake origin")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent /scrape/ callers")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test duration in seconds")
+    parser.add_argument("--urls-per-request", type=int, default=5, help="URLs sent in each /scrape/ call (max 10)")
+    parser.add_argument("--unique-urls", type=int, default=1000, help="Distinct origin pages; lower values raise cache hit rate")
+    parser.add_argument("--latency", type=float, default=0.05, help="Origin base latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Origin latency jitter in seconds")
+    parser.add_argument("--body-size", type=int, default=20_000, help="Origin body size in bytes")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of origin responses that are 500s")
+    parser.add_argument("--extract", action="store_true", help="Request structured extraction")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for URL choice, latency and errors")
+    parser.add_argument("--origin-port", type=int, default=8901)
+    parser.add_argument("--scraper-port", type=int, default=8900)
+    parser.add_argument("--scraper-url", default=None, help="Target an already running scraper instead of starting one")
+    parser.add_argument("--scraper-pid", type=int, default=None,
+                        help="PID of the scraper at --scraper-url, for socket and memory figures (default: harness only)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    result = asyncio.run(main(arguments))
+    if arguments.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
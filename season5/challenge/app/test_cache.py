@@ -0,0 +1,111 @@
+import asyncio
+
+from app.cache import AsyncTTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrent_loads_are_coalesced():
+    cache = AsyncTTLCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"content_length": 3}
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_load("a", loader) for _ in range(5)])
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = AsyncTTLCache(ttl=10, clock=clock)
+    cache.set("a", "value")
+    assert cache.get("a") == "value"
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction_by_count_and_size():
+    cache = AsyncTTLCache(max_entries=2, max_size=10, sizeof=len)
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+
+    cache.set("d", "dddddddd")  # 8 + 4 > 10, evicts down to fit
+    assert cache.stats()["size_bytes"] <= 10
+    assert cache.get("d") == "dddddddd"
+
+
+def test_rejected_values_are_not_cached():
+    cache = AsyncTTLCache()
+
+    async def loader():
+        return {"error": "Request timed out"}
+
+    asyncio.run(cache.get_or_load("a", loader, should_cache=lambda value: "error" not in value))
+    assert cache.get("a") is None
+
+
+def test_scraper_caches_only_successful_responses(monkeypatch):
+    from app import async_scraper
+
+    calls = []
+
+    async def fake_fetch(session, url):
+        calls.append(url)
+        return {"url": url, "status": 200 if url.endswith("/ok") else 404, "body": b""}
+
+    monkeypatch.setattr(async_scraper, "fetch_url", fake_fetch)
+    monkeypatch.setattr(async_scraper, "response_cache", AsyncTTLCache())
+
+    async def run():
+        for url in ("http://x/ok", "http://x/ok", "http://x/missing", "http://x/missing"):
+            await async_scraper.fetch_url_cached(url)
+        await async_scraper.close_http_session()
+
+    asyncio.run(run())
+    assert calls == ["http://x/ok", "http://x/missing", "http://x/missing"]
+
+
+def test_cancelled_request_does_not_fail_the_shared_fetch(monkeypatch):
+    from app import async_scraper
+
+    async def fake_fetch(session, url):
+        await asyncio.sleep(0.05)
+        if session.closed:
+            return {"url": url, "error": "Client error: Session is closed"}
+        return {"url": url, "status": 200, "content_length": 0, "body": b"", "encoding": "utf-8"}
+
+    monkeypatch.setattr(async_scraper, "fetch_url", fake_fetch)
+    monkeypatch.setattr(async_scraper, "response_cache", AsyncTTLCache())
+
+    async def run():
+        first = asyncio.create_task(async_scraper.scrape_urls(["http://x/ok"], extract=False))
+        await asyncio.sleep(0.01)  # The first request starts the fetch
+        second = asyncio.create_task(async_scraper.scrape_urls(["http://x/ok"], extract=False))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        try:
+            return await second
+        finally:
+            await async_scraper.close_http_session()
+
+    assert asyncio.run(run()) == [{"url": "http://x/ok", "status": 200, "content_length": 0}]
@@ -0,0 +1,32 @@
+from app.extract import MAX_LINKS, extract_page
+
+
+def test_extract_page_fields():
+    body = (
+        "<html lang='pt'><head><title> Olá\n mundo </title>"
+        "<meta name='description' content='Uma página'>"
+        "<link rel='canonical' href='/home'></head>"
+        "<body><h1>Título</h1><h2>Sub <b>título</b></h2>"
+        "<a href='/a#top'>a</a><a href='/a'>again</a><a href='mailto:x@y.z'>mail</a>"
+        "<img src='x.png'></body></html>"
+    ).encode("utf-8")
+
+    fields = extract_page(body, "https://example.com/page", "utf-8")
+
+    assert fields["title"] == "Olá mundo"
+    assert fields["description"] == "Uma página"
+    assert fields["language"] == "pt"
+    assert fields["canonical_url"] == "https://example.com/home"
+    assert fields["headings"] == {"h1": ["Título"], "h2": ["Sub título"]}
+    assert fields["links"] == ["https://example.com/a"]
+    assert fields["image_count"] == 1
+
+
+def test_extract_page_caps_links_and_handles_unknown_charset():
+    body = "".join(f"<a href='/p{i}'>p</a>" for i in range(MAX_LINKS + 10)).encode()
+
+    fields = extract_page(body, "https://example.com/", "not-a-charset")
+
+    assert fields["link_count"] == MAX_LINKS + 10
+    assert len(fields["links"]) == MAX_LINKS
+    assert fields["title"] is None
@@ -0,0 +1,140 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class CachedSource:
+    """
+    A data source with TTL caching and stale-while-revalidate refresh.
+
+    Within `ttl` seconds of the last fetch the cached value is served as is.
+    For a further `stale_ttl` seconds the stale value is still served, while a
+    single background task refreshes it. After that, callers wait for a fetch.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._value: Any = None
+        self._fetched_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.last_error: Optional[str] = None
+
+    def age(self) -> Optional[float]:
+        """Seconds since the cached value was fetched, or None if never fetched."""
+        if self._fetched_at is None:
+            return None
+        return self._clock() - self._fetched_at
+
+    def state(self) -> str:
+        age = self.age()
+        if age is None:
+            return "missing"
+        if age < self.ttl:
+            return "fresh"
+        if age < self.ttl + self.stale_ttl:
+            return "stale"
+        return "expired"
+
+    def refresh(self) -> asyncio.Task:
+        """Start a background refresh, or return the one already running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+            # Background refreshes may have no awaiter; errors are kept in last_error
+            self._refresh_task.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
+        return self._refresh_task
+
+    async def _refresh(self) -> Any:
+        try:
+            value = await self.fetch()
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+        self._value = value
+        self._fetched_at = self._clock()
+        self.last_error = None
+        return value
+
+    async def get(self) -> Any:
+        """
+        Return the best available value without waiting when possible.
+
+        Returns:
+            The cached value if fresh or stale (refreshing in the background
+            when stale), otherwise the result of a new fetch
+        """
+        state = self.state()
+        if state == "fresh":
+            return self._value
+        if state == "stale":
+            self.refresh()
+            return self._value
+        # Shield the shared refresh so a caller's deadline doesn't cancel it
+        return await asyncio.shield(self.refresh())
+
+    def freshness(self) -> Dict[str, Any]:
+        age = self.age()
+        return {
+            "state": self.state(),
+            "age_seconds": round(age, 3) if age is not None else None,
+            "refreshing": self._refresh_task is not None and not self._refresh_task.done(),
+            "error": self.last_error,
+        }
+
+
+class DashboardAggregator:
+    """Collects every source concurrently within a global deadline."""
+
+    def __init__(self, sources: Dict[str, CachedSource], deadline: float):
+        self.sources = sources
+        self.deadline = deadline
+
+    def warm(self) -> List[asyncio.Task]:
+        """Start a background fetch for every source, e.g. at startup."""
+        return [source.refresh() for source in self.sources.values()]
+
+    async def collect(self) -> Dict[str, Any]:
+        """
+        Gather data from all sources, giving up on slow ones at the deadline.
+
+        Returns:
+            Dict with the data per source (None if unavailable), a freshness
+            report per source and whether the result is partial
+        """
+        tasks = {
+            key: asyncio.create_task(source.get())
+            for key, source in self.sources.items()
+        }
+        await asyncio.wait(tasks.values(), timeout=self.deadline)
+
+        data: Dict[str, Any] = {}
+        freshness: Dict[str, Any] = {}
+        for key, task in tasks.items():
+            source = self.sources[key]
+            if task.done() and not task.cancelled() and task.exception() is None:
+                data[key] = task.result()
+                freshness[key] = source.freshness()
+                continue
+            if not task.done():
+                # The source's own refresh keeps running in the background
+                task.cancel()
+            data[key] = None
+            freshness[key] = {**source.freshness(), "state": "unavailable"}
+
+        return {
+            "data": data,
+            "sources": freshness,
+            "partial": any(value is None for value in data.values()),
+        }
@@ -1,9 +1,10 @@
 from fastapi import FastAPI
 import asyncio
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 
-app = FastAPI()
+from season5_exercise.dashboard import CachedSource, DashboardAggregator
 
 async def fetch_user_data():
     """Simulate fetching user data from database"""
@@ -27,8 +28,26 @@ async def fetch_metrics_data():
         "avg_session_time": 187  
     }
 
-@app.get("/dashboard")
-async def get_dashboard_data():
+# Each source is served from cache for `ttl` seconds, then stale for up to
+# `stale_ttl` more while it refreshes in the background
+dashboard = DashboardAggregator(
+    sources={
+        "user_statistics": CachedSource("user_statistics", fetch_user_data, ttl=30, stale_ttl=300),
+        "site_metrics": CachedSource("site_metrics", fetch_metrics_data, ttl=10, stale_ttl=120),
+    },
+    deadline=0.5,
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the caches so the first requests don't wait on the slow sources
+    dashboard.warm()
+    yield
+
+app = FastAPI(lifespan=lifespan)
+
+@app.get("/dashboard/live")
+async def get_live_dashboard_data():
     """Dashboard endpoint that concurrently fetches data from two sources"""
     start_time = time.time()
     
@@ -48,6 +67,28 @@ async def get_dashboard_data():
         }
     }
 
+@app.get("/dashboard")
+async def get_dashboard_data():
+    """
+    Dashboard endpoint served from per-source caches within a global deadline.
+
+    Sources that can't answer before the deadline are returned as null and
+    the response is marked partial; each source reports its freshness.
+    """
+    start_time = time.time()
+
+    result = await dashboard.collect()
+
+    execution_time = time.time() - start_time
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "execution_time_seconds": round(execution_time, 3),
+        "partial": result["partial"],
+        "sources": result["sources"],
+        "data": result["data"]
+    }
+
 @app.get("/")
 async def root():
-    return {"message": "API is running! Go to /dashboard for concurrent data"}
\ No newline at end of file
+    return {"message": "API is running! Go to /dashboard for cached data or /dashboard/live for concurrent data"}
\ No newline at end of file
@@ -0,0 +1,85 @@
+import asyncio
+
+from season5_exercise.dashboard import CachedSource, DashboardAggregator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_source(name, delay=0.0, clock=None):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return {"value": len(calls)}
+
+    source = CachedSource(name, fetch, ttl=10, stale_ttl=60, clock=clock or FakeClock())
+    return source, calls
+
+
+def test_fresh_value_is_served_from_cache():
+    source, calls = make_source("users")
+
+    async def run():
+        first = await source.get()
+        second = await source.get()
+        return first, second
+
+    assert asyncio.run(run()) == ({"value": 1}, {"value": 1})
+    assert len(calls) == 1
+    assert source.freshness()["state"] == "fresh"
+
+
+def test_stale_value_is_served_while_refreshing():
+    clock = FakeClock()
+    source, calls = make_source("users", clock=clock)
+
+    async def run():
+        await source.get()
+        clock.now = 15  # past ttl, within stale_ttl
+        stale = await source.get()
+        assert source.freshness()["refreshing"]
+        await source.refresh()
+        return stale, await source.get()
+
+    stale, refreshed = asyncio.run(run())
+    assert stale == {"value": 1}
+    assert refreshed == {"value": 2}
+    assert len(calls) == 2
+
+
+def test_slow_source_returns_partial_result_at_deadline():
+    fast, _ = make_source("fast")
+    slow, _ = make_source("slow", delay=1.0)
+    aggregator = DashboardAggregator({"fast": fast, "slow": slow}, deadline=0.05)
+
+    async def run():
+        result = await aggregator.collect()
+        # The slow fetch keeps running and fills the cache for later requests
+        await slow.refresh()
+        return result, await aggregator.collect()
+
+    partial, complete = asyncio.run(run())
+    assert partial["partial"]
+    assert partial["data"] == {"fast": {"value": 1}, "slow": None}
+    assert partial["sources"]["slow"]["state"] == "unavailable"
+    assert not complete["partial"]
+    assert complete["data"]["slow"] == {"value": 1}
+
+
+def test_failing_source_is_reported_unavailable():
+    async def fetch():
+        raise RuntimeError("metrics service down")
+
+    source = CachedSource("metrics", fetch, ttl=10, stale_ttl=60)
+    aggregator = DashboardAggregator({"metrics": source}, deadline=0.5)
+
+    result = asyncio.run(aggregator.collect())
+    assert result["data"] == {"metrics": None}
+    assert result["sources"]["metrics"]["error"] == "metrics service down"
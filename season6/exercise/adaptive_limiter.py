@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LimitExceeded(Exception):
+    """Raised when the limiter sheds a request instead of queueing it."""
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter in the style of Netflix's concurrency-limits.
+
+    The limit grows by one for every successful call made while the limiter
+    is actually being used, and is multiplied by `backoff` when a call is
+    dropped (timed out) or its latency exceeds `tolerance` times the baseline
+    latency. The baseline follows the fastest call immediately and drifts up
+    towards slower ones, so a lasting shift in latency (a slower backend, a
+    heavier workload) stops counting as congestion and the limit recovers.
+    Requests over the limit queue up to `max_queue`
+    deep for at most `max_wait` seconds; beyond that they are rejected with
+    `LimitExceeded`, so overload turns into fast rejections rather than a
+    pile of timeouts.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        backoff: float = 0.7,
+        tolerance: Optional[float] = 2.0,
+        drift: float = 0.05,
+        max_queue: int = 50,
+        max_wait: Optional[float] = 1.0,
+    ):
+        """
+        Args:
+            initial_limit: Concurrent calls allowed before any feedback
+            min_limit: The limit never drops below this
+            max_limit: The limit never grows above this
+            backoff: Multiplier applied to the limit on congestion
+            tolerance: Latency / baseline latency ratio treated as congestion (None disables it)
+            drift: Fraction of the gap the baseline moves towards each slower call
+            max_queue: Callers allowed to wait for a slot
+            max_wait: Seconds a caller may wait for a slot
+        """
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.drift = drift
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.best_latency: Optional[float] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Calls started before the last decrease don't trigger another one
+        self._last_decrease = float("-inf")
+        self.stats_counts = {"accepted": 0, "rejected": 0, "succeeded": 0, "dropped": 0, "decreases": 0}
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot under the current limit.
+
+        Returns:
+            The monotonic time the call was admitted, to pass to `release`
+
+        Raises:
+            LimitExceeded: If the queue is full or the wait exceeds `max_wait`
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            return self._admit()
+        if len(self._waiters) >= self.max_queue:
+            self.stats_counts["rejected"] += 1
+            raise LimitExceeded(f"Queue full ({self.max_queue} waiting, limit {int(self.limit)})")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted just as we gave up; hand the slot on
+                self.in_flight -= 1
+                self._wake()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.stats_counts["rejected"] += 1
+            raise LimitExceeded(f"No slot within {self.max_wait}s (limit {int(self.limit)})") from None
+        return waiter.result()
+
+    def _admit(self) -> float:
+        self.in_flight += 1
+        self.stats_counts["accepted"] += 1
+        return time.monotonic()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(self._admit())
+
+    def release(self, started_at: float, dropped: bool = False) -> None:
+        """
+        Record the outcome of a call and adjust the limit.
+
+        Args:
+            started_at: Value returned by `acquire`
+            dropped: True if the call timed out or otherwise signalled overload
+        """
+        latency = time.monotonic() - started_at
+        utilized = self.in_flight >= int(self.limit) / 2
+        self.in_flight -= 1
+
+        congested = dropped
+        if not dropped:
+            self.stats_counts["succeeded"] += 1
+            if self.best_latency is None or latency < self.best_latency:
+                self.best_latency = latency
+            else:
+                if self.tolerance is not None and latency > self.best_latency * self.tolerance:
+                    congested = True
+                # Relax upwards so an old minimum doesn't pin the baseline forever
+                self.best_latency += (latency - self.best_latency) * self.drift
+        else:
+            self.stats_counts["dropped"] += 1
+
+        if congested:
+            if started_at >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = time.monotonic()
+                self.stats_counts["decreases"] += 1
+                logger.info(f"Concurrency limit decreased to {self.limit:.2f}")
+        elif utilized:
+            # Only grow when the current limit is actually being used
+            self.limit = min(self.max_limit, self.limit + 1)
+
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block; timeouts count as drops."""
+        started_at = await self.acquire()
+        try:
+            yield
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self.release(started_at, dropped=True)
+            raise
+        except BaseException:
+            self.release(started_at)
+            raise
+        else:
+            self.release(started_at)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "best_latency": round(self.best_latency, 4) if self.best_latency is not None else None,
+            **self.stats_counts,
+        }
@@ -1,7 +1,10 @@
 import asyncio
 import random
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from adaptive_limiter import AdaptiveLimiter, LimitExceeded
+from resource_pool import ResourcePool
 
 # Configure logging
 logging.basicConfig(
@@ -23,24 +26,37 @@ class ResourceManager:
         await asyncio.sleep(0.2)  # Simulate cleanup time
         logger.info(f"Resource '{self.name}' cleaned up successfully")
 
-async def task_with_resource(task_id: int, duration: float) -> Dict[str, Any]:
+async def task_with_resource(task_id: int, duration: float, pool: Optional[ResourcePool] = None) -> Dict[str, Any]:
     """
     Task that simulates work and manages resources that need cleanup
     
     Args:
         task_id: Identifier for this task
         duration: How long the task should take to complete
+        pool: Pool to borrow the resource from; without one the task
+            creates its own resource and waits for its cleanup
         
     Returns:
         Dict containing task results
     """
+    if pool is not None:
+        # Borrowed resources go back to the pool; cleanup happens there, off this task's path
+        async with pool.resource():
+            return await task_with_resource_work(task_id, duration)
+
     resource = ResourceManager(f"Task-{task_id}-Resource")
-    
+    try:
+        return await task_with_resource_work(task_id, duration)
+    finally:
+        await resource.cleanup()
+
+async def task_with_resource_work(task_id: int, duration: float) -> Dict[str, Any]:
+    """Simulated work done while holding a resource"""
+    start_time = asyncio.get_event_loop().time()
     try:
         logger.info(f"Task {task_id} started, will take {duration:.2f}s")
         
         # Simulate work being done
-        start_time = asyncio.get_event_loop().time()
         await asyncio.sleep(duration)
         elapsed = asyncio.get_event_loop().time() - start_time
         
@@ -59,11 +75,8 @@ async def task_with_resource(task_id: int, duration: float) -> Dict[str, Any]:
         logger.warning(f"Task {task_id} was cancelled after {elapsed:.2f}s")
         # Re-raise to properly propagate cancellation
         raise
-    
-    finally:
-        await resource.cleanup()
 
-async def execute_task_with_timeout(task_id: int, duration: float, timeout: float) -> Dict[str, Any]:
+async def execute_task_with_timeout(task_id: int, duration: float, timeout: float, pool: Optional[ResourcePool] = None) -> Dict[str, Any]:
     """
     Execute a task with a timeout
     
@@ -71,6 +84,7 @@ async def execute_task_with_timeout(task_id: int, duration: float, timeout: floa
         task_id: Identifier for this task
         duration: How long the task should take
         timeout: Maximum time allowed for the task
+        pool: Optional resource pool shared between tasks
         
     Returns:
         Dict with task results or timeout information
@@ -78,7 +92,7 @@ async def execute_task_with_timeout(task_id: int, duration: float, timeout: floa
     try:
         # Wait for the task with a timeout
         return await asyncio.wait_for(
-            task_with_resource(task_id, duration), 
+            task_with_resource(task_id, duration, pool), 
             timeout=timeout
         )
     
@@ -98,6 +112,40 @@ async def execute_task_with_timeout(task_id: int, duration: float, timeout: floa
             "error": str(e)
         }
 
+async def execute_task_with_limit(limiter: AdaptiveLimiter, task_id: int, duration: float, timeout: float, pool: Optional[ResourcePool] = None) -> Dict[str, Any]:
+    """
+    Execute a task with a timeout once the adaptive limiter admits it
+    
+    Args:
+        limiter: Limiter deciding how many tasks may run at once
+        task_id: Identifier for this task
+        duration: How long the task should take
+        timeout: Maximum time allowed for the task once it is running
+        pool: Optional resource pool shared between tasks
+        
+    Returns:
+        Dict with task results, timeout information or the rejection reason
+    """
+    try:
+        started_at = await limiter.acquire()
+    except LimitExceeded as e:
+        logger.warning(f"Task {task_id} rejected: {str(e)}")
+        return {
+            "task_id": task_id,
+            "status": "rejected",
+            "reason": str(e)
+        }
+    
+    # The slot is released however the task ends, so cancellations can't leak it
+    dropped = True
+    try:
+        result = await execute_task_with_timeout(task_id, duration, timeout, pool)
+        # Timeouts tell the limiter it is admitting more work than it can finish
+        dropped = result["status"] == "timeout"
+        return result
+    finally:
+        limiter.release(started_at, dropped=dropped)
+
 async def main():
     """
     Main function that launches multiple tasks with different timeouts
@@ -115,24 +163,41 @@ async def main():
     
     logger.info("Starting task execution with timeouts")
     
-    # Launch all tasks concurrently
-    tasks = [
-        execute_task_with_timeout(task_id, duration, timeout)
-        for task_id, duration, timeout in task_configs
-    ]
-    
-    # Wait for all tasks to complete and collect results
-    results = await asyncio.gather(*tasks)
+    # Tasks share pooled resources instead of creating and cleaning up one each
+    async with ResourcePool(
+        lambda n: ResourceManager(f"Pooled-Resource-{n}"),
+        min_size=2,
+        max_size=len(task_configs),
+        idle_timeout=30.0
+    ) as pool:
+        # The limiter decides how many tasks actually run at once, shrinking
+        # after timeouts and growing while tasks complete in time
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=len(task_configs), max_queue=3, max_wait=5.0)
+        
+        # Launch all tasks concurrently
+        tasks = [
+            execute_task_with_limit(limiter, task_id, duration, timeout, pool)
+            for task_id, duration, timeout in task_configs
+        ]
+        
+        # Wait for all tasks to complete and collect results
+        results = await asyncio.gather(*tasks)
+        pool_stats = pool.stats()
     
     # Process and display results
     completed = [r for r in results if r["status"] == "completed"]
     timeouts = [r for r in results if r["status"] == "timeout"]
     errors = [r for r in results if r["status"] == "error"]
+    rejected = [r for r in results if r["status"] == "rejected"]
     
     logger.info(f"Task execution summary:")
     logger.info(f"  - Completed: {len(completed)}/{len(results)}")
     logger.info(f"  - Timeouts: {len(timeouts)}/{len(results)}")
     logger.info(f"  - Errors: {len(errors)}/{len(results)}")
+    logger.info(f"  - Rejected: {len(rejected)}/{len(results)}")
+    logger.info(f"  - Final concurrency limit: {limiter.stats()['limit']}")
+    logger.info(f"  - Resources created: {pool_stats['created']} for {len(results)} tasks")
+    logger.info(f"  - Mean acquire wait: {pool_stats['acquire_wait_seconds']['mean'] * 1000:.2f}ms")
     
     logger.info("Detailed results:")
     for result in results:
@@ -140,6 +205,8 @@ async def main():
             logger.info(f"  ✅ Task {result['task_id']} completed in {result['duration']:.2f}s with value {result['result_value']}")
         elif result["status"] == "timeout":
             logger.info(f"  ⏱️ Task {result['task_id']} timed out after {result['timeout']}s")
+        elif result["status"] == "rejected":
+            logger.info(f"  🚫 Task {result['task_id']} was rejected: {result['reason']}")
         else:
             logger.info(f"  ❌ Task {result['task_id']} failed with error: {result['error']}")
     
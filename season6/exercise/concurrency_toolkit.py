@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+TaskFactory = Callable[[], Awaitable[Any]]
+
+
+class LatencyTracker:
+    """Keeps a sliding window of latencies to derive percentile-based delays."""
+
+    def __init__(self, window: int = 200, default: float = 0.1):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.default = default
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> float:
+        """Return the `pct` percentile of the window, or `default` when empty."""
+        if not self._samples:
+            return self.default
+        ordered = sorted(self._samples)
+        index = min(int(pct / 100 * len(ordered)), len(ordered) - 1)
+        return ordered[index]
+
+
+async def retry(
+    factory: TaskFactory,
+    attempts: int = 3,
+    base_delay: float = 0.1,
+    max_delay: float = 2.0,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+) -> Any:
+    """
+    Run `factory()` until it succeeds, backing off with full jitter between tries.
+
+    Args:
+        factory: Creates the coroutine to run on each attempt
+        attempts: Maximum number of attempts
+        base_delay: Backoff before the second attempt, doubled for each retry
+        max_delay: Upper bound for a single backoff
+        retry_on: Exception types that trigger a retry
+
+    Returns:
+        The result of the first successful attempt
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return await factory()
+        except retry_on as e:
+            if attempt == attempts:
+                raise
+            # Full jitter keeps retrying clients from synchronising
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+            logger.warning(f"Attempt {attempt}/{attempts} failed ({e!r}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+
+async def hedged(
+    factory: TaskFactory,
+    hedge_delay: Optional[float] = None,
+    tracker: Optional[LatencyTracker] = None,
+) -> Any:
+    """
+    Run `factory()` and fire a backup copy if it hasn't finished after `hedge_delay`.
+
+    The first copy to succeed wins and the other one is cancelled; a copy
+    that fails doesn't end the call while the other may still succeed. When
+    no delay is given, the tracker's p95 latency is used, so only the
+    slowest ~5% of calls are duplicated.
+
+    Args:
+        factory: Creates the coroutine; called once or twice
+        hedge_delay: Seconds to wait before sending the backup
+        tracker: Records latencies and supplies the default delay
+
+    Returns:
+        The result of whichever copy succeeded first
+
+    Raises:
+        The first copy's exception, once every copy that was sent has failed
+    """
+    if hedge_delay is None:
+        hedge_delay = tracker.percentile(95) if tracker else 0.1
+    start = time.perf_counter()
+    primary = asyncio.ensure_future(factory())
+    pending = {primary}
+    errors: List[BaseException] = []
+    try:
+        done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+        if not done:
+            logger.info(f"No response after {hedge_delay:.3f}s, sending hedged request")
+            pending.add(asyncio.ensure_future(factory()))
+        while True:
+            for task in done:
+                pending.discard(task)
+                error = task.exception()
+                if error is None:
+                    if tracker:
+                        tracker.record(time.perf_counter() - start)
+                    return task.result()
+                errors.append(error)
+            if not pending:
+                raise errors[0]
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def run_bounded(
+    factories: Sequence[TaskFactory],
+    limit: int,
+    task_timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fan out `factories` in a TaskGroup with at most `limit` running at once.
+
+    Each task gets its own `task_timeout`, and the whole batch is bounded by
+    `deadline`. Failures and timeouts are reported per task instead of
+    cancelling the rest of the group.
+
+    Args:
+        factories: One coroutine factory per task, identified by its index
+        limit: Maximum number of tasks running concurrently
+        task_timeout: Seconds allowed per task
+        deadline: Seconds allowed for the whole batch
+
+    Returns:
+        One result dict per task, in input order, with a `status` of
+        "completed", "timeout", "error" or "cancelled"
+    """
+    semaphore = asyncio.Semaphore(limit)
+    results: List[Dict[str, Any]] = [
+        {"task_id": task_id, "status": "cancelled"} for task_id in range(len(factories))
+    ]
+
+    async def run_one(task_id: int, factory: TaskFactory):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async with asyncio.timeout(task_timeout):
+                    value = await factory()
+                results[task_id] = {
+                    "task_id": task_id,
+                    "status": "completed",
+                    "duration": time.perf_counter() - start,
+                    "result": value,
+                }
+            except TimeoutError:
+                results[task_id] = {"task_id": task_id, "status": "timeout", "timeout": task_timeout}
+            except Exception as e:
+                results[task_id] = {"task_id": task_id, "status": "error", "error": str(e)}
+            # CancelledError propagates; the slot keeps its "cancelled" status
+
+    try:
+        async with asyncio.timeout(deadline):
+            async with asyncio.TaskGroup() as group:
+                for task_id, factory in enumerate(factories):
+                    group.create_task(run_one(task_id, factory))
+    except TimeoutError:
+        logger.warning(f"Global deadline of {deadline}s reached, remaining tasks were cancelled")
+
+    return results
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Log a per-status summary of `run_bounded` results and return the counts."""
+    counts = {status: 0 for status in ("completed", "timeout", "error", "cancelled")}
+    for result in results:
+        counts[result["status"]] += 1
+
+    logger.info("Task execution summary:")
+    for status, count in counts.items():
+        logger.info(f"  - {status.capitalize()}: {count}/{len(results)}")
+    return counts
+
+
+async def demo():
+    """Run the advance_async_patterns workload through the toolkit."""
+    from advance_async_patterns import ResourceManager
+    from resource_pool import ResourcePool
+
+    durations = [1.5, 3.0, 0.5, 2.5, 1.8, 0.3, 0.7, 1.1]
+    tracker = LatencyTracker(default=1.0)
+
+    async with ResourcePool(lambda n: ResourceManager(f"Pooled-Resource-{n}"), max_size=3) as pool:
+        def make_task(duration: float) -> TaskFactory:
+            async def work():
+                async with pool.resource():
+                    await asyncio.sleep(duration * random.uniform(0.8, 1.2))
+                    return random.randint(1, 100)
+            return lambda: hedged(lambda: retry(work), tracker=tracker)
+
+        results = await run_bounded(
+            [make_task(duration) for duration in durations],
+            limit=3,
+            task_timeout=2.0,
+            deadline=4.0,
+        )
+
+    summarize(results)
+    return results
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(demo())
@@ -0,0 +1,276 @@
+import asyncio
+import bisect
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """Fixed-bucket histogram; `buckets` are inclusive upper bounds."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound:g}" for bound in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+UTILIZATION_BUCKETS = (0.1, 0.25, 0.5, 0.75, 0.9, 1.0)
+
+
+class ResourcePool:
+    """
+    Async pool that reuses resources instead of creating one per task.
+
+    Resources are created lazily by `factory` up to `max_size`, and `start()`
+    pre-creates `min_size` of them. Waiters are served strictly first come,
+    first served: a released resource is handed straight to the oldest
+    waiter. Resources idle for longer than `idle_timeout` are evicted down to
+    `min_size`, and resources failing `health_check` are replaced. Cleanup
+    runs in the background so it never sits on a task's critical path.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[int], Any],
+        max_size: int,
+        min_size: int = 0,
+        cleanup: Optional[Callable[[Any], Awaitable[None]]] = None,
+        health_check: Optional[Callable[[Any], Awaitable[bool]]] = None,
+        idle_timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            factory: Called with a sequence number to build a new resource
+            max_size: Maximum number of resources alive at once
+            min_size: Resources kept alive even when idle
+            cleanup: Coroutine function that releases a resource (defaults to `resource.cleanup()`)
+            health_check: Coroutine function returning False for a broken resource
+            idle_timeout: Seconds a resource may stay idle before it is evicted
+        """
+        if not 0 <= min_size <= max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+        self.factory = factory
+        self.max_size = max_size
+        self.min_size = min_size
+        self.idle_timeout = idle_timeout
+        self._cleanup = cleanup or (lambda resource: resource.cleanup())
+        self._health_check = health_check
+        self._idle: Deque[Tuple[Any, float]] = deque()  # (resource, released_at), oldest first
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._sequence = 0
+        self._alive = 0
+        self._in_use = 0
+        self._closed = False
+        self._background: Set[asyncio.Task] = set()
+        self._reaper: Optional[asyncio.Task] = None
+        self.acquire_wait = Histogram(WAIT_BUCKETS)
+        self.utilization = Histogram(UTILIZATION_BUCKETS)
+        self.created = 0
+        self.destroyed = 0
+
+    @property
+    def size(self) -> int:
+        return self._alive
+
+    async def start(self) -> "ResourcePool":
+        """Pre-create `min_size` resources and start the idle reaper."""
+        now = time.monotonic()
+        while self._alive < self.min_size:
+            self._idle.append((self._create(), now))
+        if self.idle_timeout is not None and self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_idle())
+        return self
+
+    def _create(self) -> Any:
+        self._sequence += 1
+        self._alive += 1
+        try:
+            resource = self.factory(self._sequence)
+        except BaseException:
+            # The slot was never filled; free it and let the next waiter try
+            self._alive -= 1
+            self._hand_off(None)
+            raise
+        self.created += 1
+        return resource
+
+    def _discard(self, resource: Any) -> None:
+        """Drop a resource from the pool and clean it up in the background."""
+        self._alive -= 1
+        self.destroyed += 1
+        task = asyncio.create_task(self._run_cleanup(resource))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _run_cleanup(self, resource: Any) -> None:
+        try:
+            await self._cleanup(resource)
+        except Exception as e:
+            logger.error(f"Cleanup of pooled resource failed: {str(e)}")
+
+    async def _is_healthy(self, resource: Any) -> bool:
+        if self._health_check is None:
+            return True
+        try:
+            return await self._health_check(resource)
+        except Exception:
+            return False
+
+    async def acquire(self) -> Any:
+        """
+        Take an idle healthy resource, create one if below `max_size`, or wait.
+
+        Returns:
+            A resource that must be given back with `release`
+        """
+        start = time.perf_counter()
+        resource = await self._acquire()
+        self._in_use += 1
+        self.acquire_wait.observe(time.perf_counter() - start)
+        self.utilization.observe(self._in_use / self.max_size)
+        return resource
+
+    async def _acquire(self) -> Any:
+        if self._closed:
+            raise RuntimeError("Resource pool is closed")
+        if self._idle and not self._waiters:
+            # Most recently used first, so the oldest ones age out
+            resource, _ = self._idle.pop()
+        elif self._alive < self.max_size and not self._waiters:
+            return self._create()
+        else:
+            resource = await self._wait_for_turn()
+            if resource is None:
+                # A slot was freed rather than a resource returned
+                return self._create()
+
+        try:
+            healthy = await self._is_healthy(resource)
+        except asyncio.CancelledError:
+            self._hand_off(resource)
+            raise
+        if healthy:
+            return resource
+        # Replace the broken resource in the slot it frees
+        self._discard(resource)
+        return self._create()
+
+    async def _wait_for_turn(self) -> Optional[Any]:
+        """Queue behind earlier waiters until handed a resource or a free slot."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Handed something just as we were cancelled; pass it on
+                self._hand_off(waiter.result())
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def _hand_off(self, resource: Optional[Any]) -> None:
+        """Give a resource (or a free slot, if None) to the oldest waiter, else park it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(resource)
+                return
+        if resource is not None:
+            self._idle.append((resource, time.monotonic()))
+
+    def release(self, resource: Any, broken: bool = False) -> None:
+        """
+        Return a resource to the pool without waiting on any cleanup.
+
+        Args:
+            resource: Resource obtained from `acquire`
+            broken: Discard the resource instead of reusing it
+        """
+        self._in_use -= 1
+        if self._closed or broken:
+            self._discard(resource)
+            if not self._closed:
+                # Let the next waiter build a replacement in the freed slot
+                self._hand_off(None)
+            return
+        self._hand_off(resource)
+
+    @asynccontextmanager
+    async def resource(self) -> AsyncIterator[Any]:
+        """Async context manager that acquires and always releases a resource."""
+        resource = await self.acquire()
+        try:
+            yield resource
+        finally:
+            self.release(resource)
+
+    async def _reap_idle(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.idle_timeout / 2)
+            cutoff = time.monotonic() - self.idle_timeout
+            # The left end of the deque holds the longest-idle resources
+            while self._idle and self._alive > self.min_size and self._idle[0][1] < cutoff:
+                resource, _ = self._idle.popleft()
+                self._discard(resource)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy, lifetime counters and acquire-wait/utilization histograms."""
+        return {
+            "size": self._alive,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "waiting": len(self._waiters),
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "created": self.created,
+            "destroyed": self.destroyed,
+            "pending_cleanups": len(self._background),
+            "acquire_wait_seconds": self.acquire_wait.snapshot(),
+            "utilization": self.utilization.snapshot(),
+        }
+
+    async def close(self) -> None:
+        """Clean up all idle resources, wait for pending cleanups and refuse further acquires."""
+        self._closed = True
+        if self._reaper is not None:
+            self._reaper.cancel()
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_exception(RuntimeError("Resource pool is closed"))
+        self._waiters.clear()
+        idle = len(self._idle)
+        while self._idle:
+            resource, _ = self._idle.popleft()
+            self._discard(resource)
+        if self._background:
+            await asyncio.gather(*self._background)
+        logger.info(f"Resource pool closed, cleaned up {idle} idle resources")
+
+    async def __aenter__(self) -> "ResourcePool":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
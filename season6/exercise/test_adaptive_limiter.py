@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from adaptive_limiter import AdaptiveLimiter, LimitExceeded
+
+
+def test_limit_grows_on_success_and_shrinks_on_drop():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=4, backoff=0.5, tolerance=None)
+        started = [await limiter.acquire() for _ in range(4)]
+        for started_at in started:
+            limiter.release(started_at)
+        grown = limiter.limit
+
+        started = [await limiter.acquire() for _ in range(3)]
+        # Drops from calls started before the first decrease only count once
+        for started_at in started:
+            limiter.release(started_at, dropped=True)
+        return grown, limiter.limit
+
+    grown, shrunk = asyncio.run(run())
+    assert grown > 4
+    assert shrunk == pytest.approx(grown * 0.5)
+
+
+def test_overload_is_shed_instead_of_queued():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=1, max_queue=1, max_wait=0.05)
+        await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(LimitExceeded):
+            await limiter.acquire()  # queue full
+        with pytest.raises(LimitExceeded):
+            await queued  # waited longer than max_wait
+        return limiter.stats()
+
+    stats = asyncio.run(run())
+    assert stats["rejected"] == 2
+    assert stats["in_flight"] == 1
+
+
+def test_slow_calls_count_as_congestion():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=10, backoff=0.5, tolerance=2.0)
+        async with limiter.slot():
+            await asyncio.sleep(0.01)
+        before = limiter.limit
+        async with limiter.slot():
+            await asyncio.sleep(0.1)
+        return before, limiter.limit
+
+    before, after = asyncio.run(run())
+    assert after == pytest.approx(before * 0.5)
+
+
+def test_limit_recovers_after_latency_shifts():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=2, backoff=0.5, tolerance=2.0, drift=0.1)
+
+        async def call(latency):
+            started_at = await limiter.acquire()
+            limiter.release(started_at - latency)
+
+        for _ in range(3):
+            await call(0.01)
+        before = limiter.limit
+        await call(0.1)  # Ten times the baseline: congestion
+        shrunk = limiter.limit
+        # The backend stays at the new latency; the baseline catches up
+        for _ in range(30):
+            await call(0.1)
+        return before, shrunk, limiter.limit, limiter.best_latency
+
+    before, shrunk, recovered, baseline = asyncio.run(run())
+    assert shrunk == pytest.approx(before * 0.5)
+    assert recovered > shrunk
+    assert 0.05 < baseline < 0.11
+
+
+def test_cancelled_task_releases_its_slot():
+    from advance_async_patterns import execute_task_with_limit
+
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=1)
+        task = asyncio.ensure_future(execute_task_with_limit(limiter, 1, duration=5.0, timeout=10.0))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return limiter.in_flight
+
+    assert asyncio.run(run()) == 0
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from concurrency_toolkit import LatencyTracker, hedged, retry, run_bounded
+
+
+def sleeper(duration, value=None):
+    async def work():
+        await asyncio.sleep(duration)
+        return value
+    return work
+
+
+def test_run_bounded_reports_each_status():
+    async def fail():
+        raise ValueError("boom")
+
+    factories = [sleeper(0.01, "a"), sleeper(1.0), fail, sleeper(0.01, "b")]
+    results = asyncio.run(run_bounded(factories, limit=2, task_timeout=0.05))
+
+    assert [r["status"] for r in results] == ["completed", "timeout", "error", "completed"]
+    assert results[0]["result"] == "a"
+    assert results[2]["error"] == "boom"
+
+
+def test_run_bounded_respects_limit_and_deadline():
+    running = []
+    peak = []
+
+    def tracked():
+        async def work():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.2)
+            running.pop()
+        return work
+
+    # Waves finish at 0.2s and 0.4s; the deadline falls 0.1s from either
+    results = asyncio.run(run_bounded([tracked() for _ in range(10)], limit=3, deadline=0.5))
+
+    assert max(peak) == 3
+    statuses = [r["status"] for r in results]
+    assert statuses.count("completed") == 6
+    assert statuses.count("cancelled") == 4
+
+
+def test_retry_succeeds_after_failures():
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("try again")
+        return "ok"
+
+    assert asyncio.run(retry(flaky, attempts=3, base_delay=0.001)) == "ok"
+    assert len(attempts) == 3
+
+
+def test_retry_gives_up():
+    async def broken():
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(retry(broken, attempts=2, base_delay=0.001))
+
+
+def test_hedged_request_wins_when_primary_is_slow():
+    durations = iter([1.0, 0.01])
+
+    async def call():
+        await asyncio.sleep(next(durations))
+        return "done"
+
+    async def run():
+        start = asyncio.get_running_loop().time()
+        result = await hedged(call, tracker=LatencyTracker(default=0.02))
+        return result, asyncio.get_running_loop().time() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result == "done"
+    assert elapsed < 0.5
+
+
+def test_hedged_waits_for_backup_when_primary_fails():
+    async def primary():
+        await asyncio.sleep(0.05)
+        raise ConnectionError("primary down")
+
+    async def backup():
+        await asyncio.sleep(0.1)
+        return "backup"
+
+    copies = iter([primary, backup])
+    assert asyncio.run(hedged(lambda: next(copies)(), hedge_delay=0.01)) == "backup"
+
+    async def failing():
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(hedged(failing, hedge_delay=0.01))
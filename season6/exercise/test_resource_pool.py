@@ -0,0 +1,143 @@
+import asyncio
+
+from resource_pool import ResourcePool
+
+
+class Resource:
+    def __init__(self, n):
+        self.n = n
+        self.healthy = True
+        self.cleaned = False
+
+    async def cleanup(self):
+        await asyncio.sleep(0.05)
+        self.cleaned = True
+
+
+def test_pool_reuses_resources():
+    created = []
+
+    def factory(n):
+        created.append(n)
+        return Resource(n)
+
+    async def run():
+        async with ResourcePool(factory, max_size=2) as pool:
+            async def use():
+                async with pool.resource():
+                    await asyncio.sleep(0.01)
+            await asyncio.gather(*[use() for _ in range(10)])
+            return pool.stats()
+
+    stats = asyncio.run(run())
+    assert created == [1, 2]
+    assert stats["acquire_wait_seconds"]["count"] == 10
+    assert stats["utilization"]["count"] == 10
+
+
+def test_waiters_are_served_in_fifo_order():
+    order = []
+
+    async def run():
+        async with ResourcePool(Resource, max_size=1) as pool:
+            holder = await pool.acquire()
+
+            async def waiter(i):
+                async with pool.resource():
+                    order.append(i)
+
+            tasks = [asyncio.create_task(waiter(i)) for i in range(5)]
+            await asyncio.sleep(0.01)
+            pool.release(holder)
+            await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_failed_creation_frees_its_slot():
+    failures = iter([True, True, False, False, True, False])
+
+    def factory(n):
+        if next(failures):
+            raise ConnectionError("cannot connect")
+        return Resource(n)
+
+    async def run():
+        async with ResourcePool(factory, max_size=2) as pool:
+            for _ in range(2):
+                try:
+                    await pool.acquire()
+                except ConnectionError:
+                    pass
+            assert pool.size == 0
+            holder = await asyncio.wait_for(pool.acquire(), 1)
+
+            # A waiter given a freed slot whose creation fails passes the slot on
+            async def wait():
+                try:
+                    async with pool.resource() as resource:
+                        return resource.n
+                except ConnectionError:
+                    return None
+
+            await pool.acquire()  # Fills the second slot
+            waiters = [asyncio.create_task(wait()) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            pool.release(holder, broken=True)
+            return await asyncio.wait_for(asyncio.gather(*waiters), 1), pool.size
+
+    results, size = asyncio.run(run())
+    assert results[0] is None and results[1] is not None
+    assert size == 2
+
+
+def test_release_does_not_wait_for_cleanup():
+    async def run():
+        pool = ResourcePool(Resource, max_size=1)
+        resource = await pool.acquire()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        pool.release(resource, broken=True)
+        replacement = await pool.acquire()
+        elapsed = loop.time() - start
+        assert not resource.cleaned
+        pool.release(replacement)
+        await pool.close()
+        return resource, replacement, elapsed
+
+    resource, replacement, elapsed = asyncio.run(run())
+    assert elapsed < 0.05
+    assert replacement is not resource
+    assert resource.cleaned and replacement.cleaned
+
+
+def test_unhealthy_resources_are_replaced():
+    async def health_check(resource):
+        return resource.healthy
+
+    async def run():
+        async with ResourcePool(Resource, max_size=1, health_check=health_check) as pool:
+            first = await pool.acquire()
+            first.healthy = False
+            pool.release(first)
+            second = await pool.acquire()
+            pool.release(second)
+            return first, second, pool.stats()
+
+    first, second, stats = asyncio.run(run())
+    assert second is not first
+    assert stats["destroyed"] == 1
+
+
+def test_idle_resources_are_evicted_down_to_min_size():
+    async def run():
+        async with ResourcePool(Resource, min_size=1, max_size=3, idle_timeout=0.05) as pool:
+            resources = [await pool.acquire() for _ in range(3)]
+            for resource in resources:
+                pool.release(resource)
+            assert pool.size == 3
+            await asyncio.sleep(0.2)
+            return pool.size
+
+    assert asyncio.run(run()) == 1
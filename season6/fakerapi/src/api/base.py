@@ -0,0 +1,237 @@
+import asyncio
+import json
+import logging
+import re
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from pymongo.errors import PyMongoError
+
+import db
+from api.logging import setup_logging
+from api.settings import settings
+from fakerapi.encoders import MEDIA_TYPES
+from fakerapi.compression import GZIP_HEADER, GzipAssembler, inflate_segment
+from fakerapi.engine import get_executor, shutdown_executor, stream_documents, stream_encoded, stream_segments
+from fakerapi.schema import Schema, SchemaError
+from fakerapi.snapshot import SnapshotStore, snapshot_key
+
+logger = logging.getLogger(__name__)
+
+snapshots = SnapshotStore(settings.snapshot_dir, max_bytes=settings.snapshot_max_bytes)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging(settings.log_level)
+    # MongoDB is only needed to save and read datasets; its indexes are created on the first save
+    get_executor(settings.generator_workers)
+    yield
+    shutdown_executor()
+    db.close_client()
+
+
+app = FastAPI(title="Faker API", description="Generates fake datasets for declared schemas", lifespan=lifespan)
+
+
+@app.get("/health", tags=["Health"])
+async def health():
+    """Health check that also pings MongoDB."""
+    await db.get_client().admin.command("ping")
+    return {"status": "healthy", "service": "Faker API"}
+
+
+class GenerateRequest(BaseModel):
+    name: str = Field("dataset", max_length=100)
+    fields: List[Dict[str, Any]] = Field(..., min_length=1, description="Field declarations: name, type and type options")
+    count: int = Field(1000, gt=0, le=settings.generate_max_rows)
+    seed: int = Field(0, ge=0, description="Same schema and seed always produce the same rows")
+    format: Literal["ndjson", "csv"] = "ndjson"
+    snapshot: bool = Field(True, description="Serve from, and save to, a seed-addressed snapshot")
+
+
+class SaveDatasetRequest(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100, description="Saving an existing name replaces that dataset")
+    fields: List[Dict[str, Any]] = Field(..., min_length=1, description="Field declarations: name, type and type options")
+    count: int = Field(1000, gt=0, le=settings.generate_max_rows)
+    seed: int = Field(0, ge=0)
+
+
+def _parse_schema(name: str, fields: List[Dict[str, Any]]) -> Schema:
+    try:
+        return Schema.from_dict({"name": name, "fields": fields})
+    except SchemaError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _safe_filename(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name) or "dataset"
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honouring q-values such as `gzip;q=0`."""
+    wildcard = None
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        coding = coding.lower()
+        if coding in ("gzip", "x-gzip"):
+            return quality > 0
+        if coding == "*":
+            wildcard = quality > 0
+    return bool(wildcard)
+
+
+async def _generate_and_snapshot(schema: Schema, request: GenerateRequest, key: str, send_gzip: bool):
+    """Stream a freshly generated dataset while writing it to a snapshot."""
+    # Snapshot file I/O runs in worker threads, keeping the event loop free
+    writer = await asyncio.to_thread(snapshots.begin, key, {
+        "schema": schema.to_dict(),
+        "seed": request.seed,
+        "count": request.count,
+        "chunk_size": settings.generate_chunk_size,
+        "format": request.format,
+    })
+    response_gzip = GzipAssembler()
+    try:
+        if send_gzip:
+            yield GZIP_HEADER
+        async for segment in stream_segments(
+            schema, request.count, request.seed, request.format, chunk_size=settings.generate_chunk_size
+        ):
+            if writer is not None:
+                await asyncio.to_thread(writer.append, segment)
+            yield response_gzip.add(segment) if send_gzip else inflate_segment(segment.data)
+        if send_gzip:
+            yield response_gzip.trailer()
+    except BaseException:
+        # Includes the client disconnecting mid-stream; never publish a partial snapshot.
+        # Inline, because awaiting inside a cancelled scope would be cancelled again
+        if writer is not None:
+            writer.abort()
+        raise
+    if writer is not None:
+        await asyncio.to_thread(writer.commit)
+        logger.info(f"Saved snapshot {key} ({request.count} rows, {request.format})")
+
+
+@app.post("/generate", tags=["Generate"])
+async def generate(request: GenerateRequest, http_request: Request):
+    """
+    Stream `count` fake records for the declared schema as NDJSON or CSV.
+
+    Rows are generated in chunks across a process pool and written out as
+    they are ready, so large responses are never held in memory. Large
+    datasets are also saved as a snapshot keyed by (schema, seed, count);
+    repeating the request replays the snapshot instead of regenerating it,
+    sending the stored gzip file as-is when the client accepts gzip.
+    """
+    schema = _parse_schema(request.name, request.fields)
+
+    headers = {"Content-Disposition": f'attachment; filename="{_safe_filename(schema.name)}.{request.format}"'}
+    media_type = MEDIA_TYPES[request.format]
+
+    if not request.snapshot or request.count < settings.snapshot_min_rows:
+        headers["X-Snapshot"] = "off"
+        return StreamingResponse(
+            stream_encoded(schema, request.count, request.seed, request.format, chunk_size=settings.generate_chunk_size),
+            media_type=media_type,
+            headers=headers,
+        )
+
+    key = snapshot_key(schema, request.seed, request.count, settings.generate_chunk_size, request.format)
+    send_gzip = _accepts_gzip(http_request.headers.get("accept-encoding", ""))
+    if send_gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    if snapshots.exists(key):
+        headers["X-Snapshot"] = "hit"
+        # A sync iterator: Starlette reads it in a worker thread, off the event loop
+        body = snapshots.iter_gzip(key) if send_gzip else snapshots.iter_decompressed(key)
+        return StreamingResponse(body, media_type=media_type, headers=headers)
+
+    headers["X-Snapshot"] = "miss"
+    return StreamingResponse(
+        _generate_and_snapshot(schema, request, key, send_gzip),
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+async def _documents(schema: Schema, request: SaveDatasetRequest) -> AsyncIterator[Dict[str, Any]]:
+    async for chunk in stream_documents(schema, request.count, request.seed, chunk_size=settings.generate_chunk_size):
+        for document in chunk:
+            yield document
+
+
+@app.post("/datasets", tags=["Datasets"])
+async def save_dataset(request: SaveDatasetRequest):
+    """
+    Generate a dataset and store it in MongoDB under `name`.
+
+    Chunks are generated across the process pool as for `/generate` and
+    written with one unordered bulk write per batch, so the run is bounded
+    by batch throughput rather than per-document round trips.
+    """
+    schema = _parse_schema(request.name, request.fields)
+    reserved = sorted(set(schema.column_names) & set(db.RECORD_KEYS))
+    if reserved:
+        raise HTTPException(status_code=422, detail=f"Field names reserved for stored records: {', '.join(reserved)}")
+    meta = {"schema": schema.to_dict(), "seed": request.seed, "count": request.count}
+    try:
+        totals = await db.save_dataset(db.get_database(), schema.name, meta, _documents(schema, request))
+    except PyMongoError as e:
+        logger.error(f"Saving dataset {schema.name} failed: {e}")
+        raise HTTPException(status_code=503, detail="The dataset store is unavailable")
+    logger.info(f"Saved dataset {schema.name} ({request.count} rows): {totals}")
+    return {"name": schema.name, "count": request.count, **totals}
+
+
+async def _ndjson(documents: AsyncIterator[Dict[str, Any]], lines_per_chunk: int = 1000) -> AsyncIterator[bytes]:
+    lines = []
+    async for document in documents:
+        lines.append(json.dumps(document, ensure_ascii=False, separators=(",", ":")))
+        if len(lines) >= lines_per_chunk:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+@app.get("/datasets/{name}/records", tags=["Datasets"])
+async def read_dataset(
+    name: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (default: all)"),
+    limit: int = Query(0, ge=0, description="Maximum records to return (0 for all)"),
+):
+    """Stream a saved dataset's records in row order as NDJSON, reading only the requested fields."""
+    database = db.get_database()
+    try:
+        dataset = await db.get_dataset(database, name)
+    except PyMongoError as e:
+        logger.error(f"Reading dataset {name} failed: {e}")
+        raise HTTPException(status_code=503, detail="The dataset store is unavailable")
+    if dataset is None:
+        raise HTTPException(status_code=404, detail=f"No dataset named '{name}'")
+
+    columns = [spec["name"] for spec in dataset["schema"]["fields"]]
+    if fields is not None:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = sorted(set(selected) - set(columns))
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+        columns = selected
+    documents = db.stream(
+        database[db.RECORDS], {"dataset": name}, fields=columns, sort=[("seq", 1)], limit=limit
+    )
+    return StreamingResponse(_ndjson(documents), media_type=MEDIA_TYPES["ndjson"])
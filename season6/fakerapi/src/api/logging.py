@@ -0,0 +1,11 @@
+import logging
+import sys
+
+
+def setup_logging(level: str = "INFO") -> None:
+    """Configure root logging for the API process."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
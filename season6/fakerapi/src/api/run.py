@@ -0,0 +1,13 @@
+"""Run the API locally with `python -m api.run` from the src directory."""
+
+import uvicorn
+
+from api.settings import settings
+
+
+def main() -> None:
+    uvicorn.run("api.base:app", host="0.0.0.0", port=8000, log_level=settings.log_level.lower())
+
+
+if __name__ == "__main__":
+    main()
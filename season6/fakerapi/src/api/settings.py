@@ -0,0 +1,44 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Service configuration, read from environment variables."""
+
+    mongo_uri: str
+    mongo_db: str
+    mongo_max_pool_size: int
+    mongo_min_pool_size: int
+    mongo_max_idle_time_ms: int
+    insert_batch_size: int
+    read_batch_size: int
+    generator_workers: int
+    generate_chunk_size: int
+    generate_max_rows: int
+    snapshot_dir: str
+    snapshot_min_rows: int
+    snapshot_max_bytes: int
+    log_level: str
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            mongo_uri=os.getenv("MONGO_URI", "mongodb://localhost:27017"),
+            mongo_db=os.getenv("MONGO_DB", "fakerapi"),
+            mongo_max_pool_size=int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+            mongo_min_pool_size=int(os.getenv("MONGO_MIN_POOL_SIZE", "5")),
+            mongo_max_idle_time_ms=int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000")),
+            insert_batch_size=int(os.getenv("INSERT_BATCH_SIZE", "5000")),
+            read_batch_size=int(os.getenv("READ_BATCH_SIZE", "2000")),
+            generator_workers=int(os.getenv("GENERATOR_WORKERS", str(os.cpu_count() or 1))),
+            generate_chunk_size=int(os.getenv("GENERATE_CHUNK_SIZE", "10000")),
+            generate_max_rows=int(os.getenv("GENERATE_MAX_ROWS", "10000000")),
+            snapshot_dir=os.getenv("SNAPSHOT_DIR", "snapshots"),
+            snapshot_min_rows=int(os.getenv("SNAPSHOT_MIN_ROWS", "10000")),
+            snapshot_max_bytes=int(os.getenv("SNAPSHOT_MAX_BYTES", str(10 * 1024**3))),
+            log_level=os.getenv("LOG_LEVEL", "INFO"),
+        )
+
+
+settings = Settings.from_env()
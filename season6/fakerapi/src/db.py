@@ -1,5 +1,252 @@
-from pymongo import MongoClient
-import os 
+import inspect
+import logging
+import time
+from itertools import islice
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Union
 
+from pymongo import ASCENDING, IndexModel, MongoClient, ReplaceOne
+from pymongo.errors import BulkWriteError
 
- 
\ No newline at end of file
+from api.settings import Settings, settings as default_settings
+
+logger = logging.getLogger(__name__)
+
+RECORDS = "records"
+DATASETS = "datasets"
+DUPLICATE_KEY = 11000
+# Keys every stored record carries; schema fields may not use them
+RECORD_KEYS = ("_id", "dataset", "seq")
+
+# Created on first use; `dataset` + `seq` is how generated records are addressed
+INDEXES: Dict[str, List[IndexModel]] = {
+    RECORDS: [
+        IndexModel([("dataset", ASCENDING), ("seq", ASCENDING)], unique=True, name="dataset_seq"),
+    ],
+    DATASETS: [
+        IndexModel([("name", ASCENDING)], unique=True, name="name"),
+    ],
+}
+
+_client = None
+_indexes_ensured = False
+
+
+def get_client(config: Optional[Settings] = None):
+    """
+    Return the process-wide Motor client, creating it on first use.
+
+    One client owns one connection pool; creating a client per request would
+    throw that pool away every time.
+    """
+    global _client
+    if _client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        config = config or default_settings
+        _client = AsyncIOMotorClient(
+            config.mongo_uri,
+            maxPoolSize=config.mongo_max_pool_size,
+            minPoolSize=config.mongo_min_pool_size,
+            maxIdleTimeMS=config.mongo_max_idle_time_ms,
+        )
+    return _client
+
+
+def get_database(config: Optional[Settings] = None):
+    config = config or default_settings
+    return get_client(config)[config.mongo_db]
+
+
+def close_client() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+_indexes_ensured = False
+
+
+def get_sync_client(config: Optional[Settings] = None) -> MongoClient:
+    """Blocking client for scripts and CLI tools that don't run an event loop."""
+    config = config or default_settings
+    return MongoClient(config.mongo_uri, maxPoolSize=config.mongo_max_pool_size)
+
+
+async def _resolve(result: Any) -> Any:
+    # Motor returns awaitables, pymongo/mongomock return results directly
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+async def ensure_indexes(db) -> None:
+    """Create the indexes in `INDEXES`; existing ones are left as they are."""
+    for collection, indexes in INDEXES.items():
+        await _resolve(db[collection].create_indexes(indexes))
+    logger.info(f"Indexes ensured on {', '.join(INDEXES)}")
+
+
+async def ensure_indexes_once(db) -> None:
+    """
+    `ensure_indexes` on the first call in this process.
+
+    Called by the operations that need the indexes rather than at startup, so
+    the service starts, and generates data, without MongoDB.
+    """
+    global _indexes_ensured
+    if not _indexes_ensured:
+        await ensure_indexes(db)
+        _indexes_ensured = True
+
+
+async def _batches(documents: Union[Iterable[Dict], AsyncIterable[Dict]], batch_size: int) -> AsyncIterator[List[Dict]]:
+    if hasattr(documents, "__aiter__"):
+        batch: List[Dict] = []
+        async for document in documents:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        return
+    iterator = iter(documents)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+async def insert_batched(
+    collection,
+    documents: Union[Iterable[Dict], AsyncIterable[Dict]],
+    batch_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Insert documents with one unordered `insert_many` per batch.
+
+    Documents whose key already exists are skipped and counted; the rest of
+    their batch and every later batch are still inserted.
+
+    Args:
+        collection: Motor, pymongo or mongomock collection
+        documents: Documents to insert; consumed lazily, one batch at a time
+        batch_size: Documents per round trip
+
+    Returns:
+        Counts of inserted and duplicate documents
+
+    Raises:
+        BulkWriteError: A write failed for a reason other than a duplicate key
+    """
+    batch_size = batch_size or default_settings.insert_batch_size
+    totals = {"inserted": 0, "duplicates": 0}
+    async for batch in _batches(documents, batch_size):
+        try:
+            # Unordered lets the server apply the rest of the batch past a duplicate
+            result = await _resolve(collection.insert_many(batch, ordered=False))
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != DUPLICATE_KEY for error in errors):
+                raise
+            totals["inserted"] += e.details.get("nInserted", 0)
+            totals["duplicates"] += len(errors)
+        else:
+            totals["inserted"] += len(result.inserted_ids)
+    if totals["duplicates"]:
+        logger.warning(f"Skipped {totals['duplicates']} duplicate documents in {collection.name}")
+    return totals
+
+
+async def upsert_batched(
+    collection,
+    documents: Union[Iterable[Dict], AsyncIterable[Dict]],
+    key_fields: Sequence[str],
+    batch_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Replace-or-insert documents matched on `key_fields`, one `bulk_write` per batch.
+
+    Returns:
+        Counts of matched, modified and upserted documents
+    """
+    batch_size = batch_size or default_settings.insert_batch_size
+    totals = {"matched": 0, "modified": 0, "upserted": 0}
+    async for batch in _batches(documents, batch_size):
+        operations = [
+            ReplaceOne({field: document[field] for field in key_fields}, document, upsert=True)
+            for document in batch
+        ]
+        result = await _resolve(collection.bulk_write(operations, ordered=False))
+        totals["matched"] += result.matched_count
+        totals["modified"] += result.modified_count
+        totals["upserted"] += result.upserted_count
+    return totals
+
+
+async def stream(
+    collection,
+    query: Optional[Dict] = None,
+    fields: Optional[Sequence[str]] = None,
+    batch_size: Optional[int] = None,
+    sort: Optional[List] = None,
+    limit: int = 0,
+) -> AsyncIterator[Dict]:
+    """
+    Yield matching documents without loading the result set into memory.
+
+    Only `fields` are sent over the wire (`_id` is excluded unless listed),
+    and the cursor fetches `batch_size` documents per round trip.
+    """
+    projection = None
+    if fields is not None:
+        projection = {field: 1 for field in fields}
+        if "_id" not in projection:
+            projection["_id"] = 0
+    cursor = collection.find(query or {}, projection).batch_size(batch_size or default_settings.read_batch_size)
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+    if hasattr(cursor, "__aiter__"):
+        async for document in cursor:
+            yield document
+    else:
+        for document in cursor:
+            yield document
+
+
+async def save_dataset(
+    db,
+    name: str,
+    meta: Dict[str, Any],
+    documents: Union[Iterable[Dict], AsyncIterable[Dict]],
+) -> Dict[str, int]:
+    """
+    Store a generated dataset's records and its entry in `DATASETS`.
+
+    A new dataset is bulk-inserted. Saving an existing name replaces its
+    records in place, matched on (dataset, seq), and deletes rows beyond
+    the new count, so readers never see the dataset empty.
+
+    Args:
+        db: Database
+        name: Dataset name; every document's `dataset`
+        meta: Stored with the dataset entry; must include `count`
+        documents: Records with `dataset` and `seq` set
+
+    Returns:
+        Counts of the writes made
+    """
+    await ensure_indexes_once(db)
+    existing = await _resolve(db[DATASETS].find_one({"name": name}, {"_id": 1}))
+    if existing is None:
+        totals = await insert_batched(db[RECORDS], documents)
+    else:
+        totals = await upsert_batched(db[RECORDS], documents, key_fields=("dataset", "seq"))
+        result = await _resolve(db[RECORDS].delete_many({"dataset": name, "seq": {"$gte": meta["count"]}}))
+        totals["deleted"] = result.deleted_count
+    await _resolve(db[DATASETS].replace_one({"name": name}, {"name": name, **meta, "saved_at": time.time()}, upsert=True))
+    return totals
+
+
+async def get_dataset(db, name: str) -> Optional[Dict[str, Any]]:
+    """A dataset's entry in `DATASETS`, or None."""
+    return await _resolve(db[DATASETS].find_one({"name": name}, {"_id": 0}))
@@ -0,0 +1,89 @@
+"""
+Gzip output assembled from independently compressed chunks.
+
+Each chunk is compressed on its own into a raw deflate segment ending in a
+full flush, which resets the compressor state. Segments can therefore be
+produced in parallel, concatenated into one deflate stream, and still be
+decompressed one at a time. Wrapping that stream in a single gzip header
+and trailer gives a one-member gzip file that every HTTP client can decode;
+concatenated gzip members would be cut off after the first by many of them.
+"""
+import struct
+import zlib
+from typing import NamedTuple
+
+COMPRESS_LEVEL = 6
+# Magic, deflate, no flags, mtime 0, no extra flags, unknown OS
+GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+# An empty deflate block with the final bit set
+FINAL_BLOCK = b"\x03\x00"
+
+
+class Segment(NamedTuple):
+    data: bytes  # Raw deflate, byte-aligned, independent of other segments
+    crc: int  # CRC-32 of the uncompressed chunk
+    size: int  # Uncompressed length
+
+
+def deflate_segment(data: bytes, level: int = COMPRESS_LEVEL) -> Segment:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    body = compressor.compress(data) + compressor.flush(zlib.Z_FULL_FLUSH)
+    return Segment(body, zlib.crc32(data), len(data))
+
+
+def inflate_segment(segment: bytes) -> bytes:
+    return zlib.decompressobj(-zlib.MAX_WBITS).decompress(segment)
+
+
+def _gf2_times(matrix, vector: int) -> int:
+    total = 0
+    index = 0
+    while vector:
+        if vector & 1:
+            total ^= matrix[index]
+        vector >>= 1
+        index += 1
+    return total
+
+
+def _gf2_square(matrix):
+    return [_gf2_times(matrix, row) for row in matrix]
+
+
+def crc32_combine(crc1: int, crc2: int, length2: int) -> int:
+    """CRC-32 of A + B from crc(A), crc(B) and len(B); a port of zlib's crc32_combine."""
+    if length2 <= 0:
+        return crc1
+    odd = [0xEDB88320] + [1 << n for n in range(31)]  # Operator for one zero bit
+    even = _gf2_square(odd)  # Two zero bits
+    odd = _gf2_square(even)  # Four zero bits
+    while True:
+        even = _gf2_square(odd)
+        if length2 & 1:
+            crc1 = _gf2_times(even, crc1)
+        length2 >>= 1
+        if not length2:
+            break
+        odd = _gf2_square(even)
+        if length2 & 1:
+            crc1 = _gf2_times(odd, crc1)
+        length2 >>= 1
+        if not length2:
+            break
+    return crc1 ^ crc2
+
+
+class GzipAssembler:
+    """Tracks the checksum of appended segments and produces the gzip trailer."""
+
+    def __init__(self):
+        self.crc = 0
+        self.size = 0
+
+    def add(self, segment: Segment) -> bytes:
+        self.crc = crc32_combine(self.crc, segment.crc, segment.size)
+        self.size += segment.size
+        return segment.data
+
+    def trailer(self) -> bytes:
+        return FINAL_BLOCK + struct.pack("<II", self.crc, self.size & 0xFFFFFFFF)
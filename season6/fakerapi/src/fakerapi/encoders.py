@@ -0,0 +1,27 @@
+from typing import Dict
+
+import pandas as pd
+
+MEDIA_TYPES: Dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def encode_frame(frame: pd.DataFrame, fmt: str, header: bool = False) -> bytes:
+    """
+    Serialise a chunk in one vectorised call.
+
+    Args:
+        frame: Chunk to encode
+        fmt: "ndjson" or "csv"
+        header: Include the CSV header row (only wanted for the first chunk)
+    """
+    if fmt == "ndjson":
+        text = frame.to_json(orient="records", lines=True, force_ascii=False)
+        if text and not text.endswith("\n"):
+            text += "\n"
+        return text.encode("utf-8")
+    if fmt == "csv":
+        return frame.to_csv(index=False, header=header).encode("utf-8")
+    raise ValueError(f"Unsupported format '{fmt}'")
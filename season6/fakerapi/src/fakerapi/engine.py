@@ -0,0 +1,178 @@
+"""
+Chunked generation pipeline.
+
+A dataset of `count` rows is split into fixed-size chunks. Each chunk is
+generated and encoded independently, either inline or in a worker process,
+and chunks are emitted in order. At most `prefetch` chunks are in flight,
+so memory use is bounded by the window rather than by `count`.
+"""
+import asyncio
+import json
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from fakerapi.compression import Segment, deflate_segment
+
+from fakerapi.encoders import encode_frame
+from fakerapi.generator import generate_frame
+from fakerapi.schema import Schema
+
+DEFAULT_CHUNK_SIZE = 10_000
+# Requests this small are cheaper to generate inline than to ship to workers
+INLINE_MAX_ROWS = 20_000
+
+Chunk = Tuple[int, int, int]  # (chunk index, first row, row count)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def plan_chunks(count: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Chunk]:
+    return [
+        (index, start, min(chunk_size, count - start))
+        for index, start in enumerate(range(0, count, chunk_size))
+    ]
+
+
+@lru_cache(maxsize=64)
+def _schema_from_json(schema_json: str) -> Schema:
+    # Workers receive the schema as JSON and parse it once per process
+    return Schema.from_dict(json.loads(schema_json))
+
+
+def render_chunk(schema_json: str, seed: int, chunk: Chunk, fmt: str) -> bytes:
+    """Generate and encode one chunk; the entry point run in worker processes."""
+    index, start, size = chunk
+    frame = generate_frame(_schema_from_json(schema_json), seed, index, start, size)
+    return encode_frame(frame, fmt, header=(fmt == "csv" and index == 0))
+
+
+def render_segment(schema_json: str, seed: int, chunk: Chunk, fmt: str) -> Segment:
+    """Like `render_chunk`, but compressed in the worker so less data crosses the pipe."""
+    return deflate_segment(render_chunk(schema_json, seed, chunk, fmt))
+
+
+def render_documents(schema_json: str, seed: int, chunk: Chunk, fmt: str) -> List[Dict[str, Any]]:
+    """
+    Generate one chunk as database documents: the fields plus `dataset` (the schema name) and `seq` (the row number).
+
+    `fmt` is ignored; it keeps the signature of the other renderers.
+    """
+    index, start, size = chunk
+    schema = _schema_from_json(schema_json)
+    records = generate_frame(schema, seed, index, start, size).to_dict("records")  # Native Python values
+    return [{"dataset": schema.name, "seq": seq, **record} for seq, record in enumerate(records, start)]
+
+
+def iter_encoded(schema: Schema, count: int, seed: int, fmt: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Generate a dataset chunk by chunk in the current process."""
+    schema_json = schema.canonical_json()
+    for chunk in plan_chunks(count, chunk_size):
+        yield render_chunk(schema_json, seed, chunk, fmt)
+
+
+def get_executor(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Return the shared generation process pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count())
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+async def _stream_ordered(
+    render: Callable[..., Any],
+    schema: Schema,
+    count: int,
+    seed: int,
+    fmt: str,
+    chunk_size: int,
+    executor: Optional[Executor],
+    prefetch: Optional[int],
+) -> AsyncIterator[Any]:
+    schema_json = schema.canonical_json()
+    chunks = plan_chunks(count, chunk_size)
+
+    if count <= INLINE_MAX_ROWS:
+        for chunk in chunks:
+            yield render(schema_json, seed, chunk, fmt)
+        return
+
+    loop = asyncio.get_running_loop()
+    executor = executor or get_executor()
+    prefetch = prefetch or 2 * (getattr(executor, "_max_workers", None) or os.cpu_count() or 1)
+    pending: Deque[asyncio.Future] = deque()
+    remaining = iter(chunks)
+    try:
+        for chunk in remaining:
+            pending.append(loop.run_in_executor(executor, render, schema_json, seed, chunk, fmt))
+            if len(pending) >= prefetch:
+                break
+        while pending:
+            data = await pending.popleft()
+            # Keep the window full while the consumer writes this chunk out
+            next_chunk = next(remaining, None)
+            if next_chunk is not None:
+                pending.append(loop.run_in_executor(executor, render, schema_json, seed, next_chunk, fmt))
+            yield data
+    finally:
+        # Client went away or an error occurred: drop work that hasn't started
+        for future in pending:
+            future.cancel()
+
+
+def stream_encoded(
+    schema: Schema,
+    count: int,
+    seed: int,
+    fmt: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    executor: Optional[Executor] = None,
+    prefetch: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Yield encoded chunks in order, generating ahead in a process pool.
+
+    Args:
+        schema: Record layout
+        count: Total rows
+        seed: Dataset seed; the same seed always yields the same bytes
+        fmt: "ndjson" or "csv"
+        chunk_size: Rows per chunk
+        executor: Pool to generate in (defaults to the shared process pool)
+        prefetch: Chunks generated ahead of the consumer (defaults to 2 per worker)
+    """
+    return _stream_ordered(render_chunk, schema, count, seed, fmt, chunk_size, executor, prefetch)
+
+
+def stream_segments(
+    schema: Schema,
+    count: int,
+    seed: int,
+    fmt: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    executor: Optional[Executor] = None,
+    prefetch: Optional[int] = None,
+) -> AsyncIterator[Segment]:
+    """Like `stream_encoded`, but yields each chunk as a compressed deflate segment."""
+    return _stream_ordered(render_segment, schema, count, seed, fmt, chunk_size, executor, prefetch)
+
+
+def stream_documents(
+    schema: Schema,
+    count: int,
+    seed: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    executor: Optional[Executor] = None,
+    prefetch: Optional[int] = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Like `stream_encoded`, but yields each chunk as a list of documents for the database."""
+    return _stream_ordered(render_documents, schema, count, seed, "documents", chunk_size, executor, prefetch)
@@ -0,0 +1,154 @@
+"""
+Vectorised record generation.
+
+Records are produced in chunks, one column at a time, with NumPy doing the
+per-row work. Each chunk gets its own RNG seeded from (seed, chunk index),
+so the output for a given seed is identical no matter how chunks are spread
+across worker processes.
+"""
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+from fakerapi import pools
+from fakerapi.schema import DEFAULT_RANGES, DEFAULT_SENTENCE_WORDS, DEFAULT_SEQUENCE_START, FieldSpec, Schema
+
+ColumnGenerator = Callable[[np.random.Generator, FieldSpec, int, int], np.ndarray]
+
+_EPOCH = np.datetime64("1970-01-01T00:00:00", "s")
+
+
+def chunk_rng(seed: int, chunk_index: int) -> np.random.Generator:
+    """RNG for one chunk; independent of which process generates it."""
+    return np.random.default_rng([seed, chunk_index])
+
+
+def _pick(rng: np.random.Generator, pool: np.ndarray, size: int) -> np.ndarray:
+    return pool[rng.integers(0, len(pool), size)]
+
+
+def _sequence(rng, spec, start, size):
+    return np.arange(start, start + size, dtype=np.int64) + spec.params.get("start", DEFAULT_SEQUENCE_START)
+
+
+def _bounds(spec, low_key, high_key):
+    low, high = DEFAULT_RANGES[spec.type]
+    return spec.params.get(low_key, low), spec.params.get(high_key, high)
+
+
+def _integer(rng, spec, start, size):
+    return rng.integers(*_bounds(spec, "min", "max"), size, endpoint=True)
+
+
+def _float(rng, spec, start, size):
+    values = rng.uniform(*_bounds(spec, "min", "max"), size)
+    return values.round(spec.params.get("decimals", 2))
+
+
+def _boolean(rng, spec, start, size):
+    return rng.random(size) < spec.params.get("probability", 0.5)
+
+
+def _choice(rng, spec, start, size):
+    values = np.asarray(spec.params["values"])
+    weights = spec.params.get("weights")
+    if weights is None:
+        return _pick(rng, values, size)
+    probabilities = np.asarray(weights, dtype=float)
+    return values[rng.choice(len(values), size, p=probabilities / probabilities.sum())]
+
+
+def _name(rng, spec, start, size):
+    return np.char.add(np.char.add(_pick(rng, pools.FIRST_NAMES, size), " "), _pick(rng, pools.LAST_NAMES, size))
+
+
+def _email(rng, spec, start, size):
+    local = np.char.add(np.char.add(_pick(rng, pools.EMAIL_FIRST_NAMES, size), "."), _pick(rng, pools.EMAIL_LAST_NAMES, size))
+    # The row number keeps addresses unique within a dataset
+    local = np.char.add(local, np.arange(start, start + size).astype(str))
+    return np.char.add(np.char.add(local, "@"), _pick(rng, pools.DOMAINS, size))
+
+
+def _sentence(rng, spec, start, size):
+    word_count = spec.params.get("words", DEFAULT_SENTENCE_WORDS)
+    indices = rng.integers(0, len(pools.WORDS), (size, word_count))
+    sentence = pools.WORDS[indices[:, 0]]
+    for column in range(1, word_count):
+        sentence = np.char.add(np.char.add(sentence, " "), pools.WORDS[indices[:, column]])
+    return sentence
+
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_UUID_LAYOUT = [(0, 8), (8, 12), (12, 16), (16, 20), (20, 32)]
+
+
+def _uuid(rng, spec, start, size):
+    nibbles = rng.integers(0, 16, (size, 32), dtype=np.uint8)
+    nibbles[:, 12] = 4  # version 4
+    nibbles[:, 16] = 8 + (nibbles[:, 16] & 3)  # RFC 4122 variant
+    digits = _HEX_DIGITS[nibbles]
+    dash = np.full((size, 1), ord("-"), dtype=np.uint8)
+    parts = []
+    for begin, end in _UUID_LAYOUT:
+        parts.extend([digits[:, begin:end], dash])
+    text = np.ascontiguousarray(np.hstack(parts[:-1]))
+    return text.view("S36").ravel().astype("U36")
+
+
+def _seconds_between(rng, spec, size):
+    start, end = (np.datetime64(bound, "s") for bound in _bounds(spec, "start", "end"))
+    offsets = rng.integers(0, int((end - start) / np.timedelta64(1, "s")), size, endpoint=True)
+    return start + offsets.astype("timedelta64[s]")
+
+
+# Dates are rendered to ISO strings here so every output format agrees on them
+def _date(rng, spec, start, size):
+    return np.datetime_as_string(_seconds_between(rng, spec, size), unit="D")
+
+
+def _datetime(rng, spec, start, size):
+    return np.datetime_as_string(_seconds_between(rng, spec, size), unit="s")
+
+
+GENERATORS: Dict[str, ColumnGenerator] = {
+    "sequence": _sequence,
+    "integer": _integer,
+    "float": _float,
+    "boolean": _boolean,
+    "choice": _choice,
+    "first_name": lambda rng, spec, start, size: _pick(rng, pools.FIRST_NAMES, size),
+    "last_name": lambda rng, spec, start, size: _pick(rng, pools.LAST_NAMES, size),
+    "name": _name,
+    "email": _email,
+    "city": lambda rng, spec, start, size: _pick(rng, pools.CITIES, size),
+    "country": lambda rng, spec, start, size: _pick(rng, pools.COUNTRIES, size),
+    "word": lambda rng, spec, start, size: _pick(rng, pools.WORDS, size),
+    "sentence": _sentence,
+    "uuid": _uuid,
+    "date": _date,
+    "datetime": _datetime,
+}
+
+
+def generate_columns(schema: Schema, seed: int, chunk_index: int, start: int, size: int) -> Dict[str, np.ndarray]:
+    """
+    Generate one chunk as a dict of column arrays.
+
+    Args:
+        schema: Record layout
+        seed: Dataset seed
+        chunk_index: Position of the chunk in the dataset
+        start: Row number of the first row in the chunk
+        size: Number of rows
+
+    Returns:
+        Column name -> NumPy array of `size` values
+    """
+    rng = chunk_rng(seed, chunk_index)
+    return {spec.name: GENERATORS[spec.type](rng, spec, start, size) for spec in schema.fields}
+
+
+def generate_frame(schema: Schema, seed: int, chunk_index: int, start: int, size: int) -> pd.DataFrame:
+    """Generate one chunk as a DataFrame with columns in schema order."""
+    return pd.DataFrame(generate_columns(schema, seed, chunk_index, start, size), columns=schema.column_names)
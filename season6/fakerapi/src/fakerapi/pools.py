@@ -0,0 +1,53 @@
+"""
+Value pools sampled by the generator.
+
+They are built once per process as NumPy arrays, so picking a value is an
+index into a preallocated array rather than a Python-level lookup.
+"""
+import numpy as np
+
+FIRST_NAMES = np.array([
+    "Ana", "Bruno", "Carla", "Daniel", "Eva", "Felipe", "Gabriela", "Hugo", "Inês", "João",
+    "Karina", "Lucas", "Mariana", "Nuno", "Olívia", "Pedro", "Quitéria", "Rafael", "Sofia", "Tiago",
+    "Alice", "Bob", "Charlie", "Diana", "Ethan", "Fiona", "George", "Hannah", "Isaac", "Julia",
+    "Kevin", "Laura", "Michael", "Nina", "Oscar", "Paula", "Quentin", "Rita", "Samuel", "Teresa",
+])
+
+LAST_NAMES = np.array([
+    "Silva", "Santos", "Ferreira", "Pereira", "Oliveira", "Costa", "Rodrigues", "Martins", "Jesus", "Sousa",
+    "Fernandes", "Gonçalves", "Gomes", "Lopes", "Marques", "Alves", "Almeida", "Ribeiro", "Pinto", "Carvalho",
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Wilson", "Taylor",
+])
+
+# ASCII-only versions used to build e-mail addresses
+EMAIL_FIRST_NAMES = np.array([
+    "ana", "bruno", "carla", "daniel", "eva", "felipe", "gabriela", "hugo", "ines", "joao",
+    "karina", "lucas", "mariana", "nuno", "olivia", "pedro", "quiteria", "rafael", "sofia", "tiago",
+    "alice", "bob", "charlie", "diana", "ethan", "fiona", "george", "hannah", "isaac", "julia",
+    "kevin", "laura", "michael", "nina", "oscar", "paula", "quentin", "rita", "samuel", "teresa",
+])
+
+EMAIL_LAST_NAMES = np.array([
+    "silva", "santos", "ferreira", "pereira", "oliveira", "costa", "rodrigues", "martins", "jesus", "sousa",
+    "fernandes", "goncalves", "gomes", "lopes", "marques", "alves", "almeida", "ribeiro", "pinto", "carvalho",
+    "smith", "johnson", "williams", "brown", "jones", "garcia", "miller", "davis", "wilson", "taylor",
+])
+
+DOMAINS = np.array(["example.com", "example.org", "example.net", "mail.test", "inbox.test"])
+
+CITIES = np.array([
+    "Lisboa", "Porto", "Braga", "Coimbra", "Faro", "Madrid", "Barcelona", "Paris", "Lyon", "Berlin",
+    "Munich", "London", "Manchester", "Dublin", "Amsterdam", "Rome", "Milan", "New York", "Toronto", "São Paulo",
+])
+
+COUNTRIES = np.array([
+    "Portugal", "Spain", "France", "Germany", "United Kingdom", "Ireland", "Netherlands", "Italy",
+    "United States", "Canada", "Brazil", "Mexico", "Japan", "Australia", "India",
+])
+
+WORDS = np.array(
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+    "et dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip "
+    "ex ea commodo consequat duis aute irure in reprehenderit voluptate velit esse cillum fugiat nulla "
+    "pariatur excepteur sint occaecat cupidatat non proident sunt culpa qui officia deserunt mollit anim".split()
+)
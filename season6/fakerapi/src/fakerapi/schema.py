@@ -0,0 +1,182 @@
+import json
+import math
+from dataclasses import dataclass, field
+from numbers import Real
+from typing import Any, Dict, List
+
+import numpy as np
+
+FIELD_TYPES = {
+    "sequence",
+    "integer",
+    "float",
+    "boolean",
+    "choice",
+    "first_name",
+    "last_name",
+    "name",
+    "email",
+    "city",
+    "country",
+    "word",
+    "sentence",
+    "uuid",
+    "date",
+    "datetime",
+}
+
+
+# Options left out of a declaration take these values; the generator reads them from here too
+DEFAULT_RANGES = {
+    "integer": (0, 1000),
+    "float": (0.0, 1.0),
+    "date": ("2000-01-01", "2030-12-31"),
+    "datetime": ("2000-01-01T00:00:00", "2030-12-31T23:59:59"),
+}
+DEFAULT_SEQUENCE_START = 1
+DEFAULT_SENTENCE_WORDS = 8
+MAX_SENTENCE_WORDS = 100
+MAX_DECIMALS = 15
+
+# Columns are int64; sequences keep 2**62 of headroom for the row numbers added to their start
+INT64_MIN, INT64_MAX = -(2**63), 2**63 - 1
+SEQUENCE_START_LIMIT = 2**62
+
+
+class SchemaError(ValueError):
+    """Raised when a schema declaration is invalid."""
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and INT64_MIN <= value <= INT64_MAX
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, Real) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, str) or isinstance(value, bool) or _is_int(value) or _is_number(value)
+
+
+def _check_range(name: str, field_type: str, params: Dict[str, Any], is_valid, kind: str) -> None:
+    for key in ("min", "max"):
+        if key in params and not is_valid(params[key]):
+            raise SchemaError(f"Field '{name}': '{key}' must be {kind}")
+    # A single bound is compared with the default of the other
+    low, high = DEFAULT_RANGES[field_type]
+    low, high = params.get("min", low), params.get("max", high)
+    if low > high:
+        raise SchemaError(f"Field '{name}': 'min' ({low}) is greater than 'max' ({high})")
+    if not math.isfinite(high - low):
+        raise SchemaError(f"Field '{name}': the range from 'min' to 'max' is too wide")
+
+
+def _check_dates(name: str, field_type: str, params: Dict[str, Any]) -> None:
+    bounds = {}
+    for key, default in zip(("start", "end"), DEFAULT_RANGES[field_type]):
+        value = params.get(key, default)
+        try:
+            if not isinstance(value, str):
+                raise ValueError
+            bounds[key] = np.datetime64(value, "s")
+        except ValueError:
+            raise SchemaError(f"Field '{name}': '{key}' must be an ISO date or datetime, got {value!r}") from None
+    if bounds["start"] > bounds["end"]:
+        raise SchemaError(f"Field '{name}': 'start' ({bounds['start']}) is after 'end' ({bounds['end']})")
+
+
+def _check_params(name: str, field_type: str, params: Dict[str, Any]) -> None:
+    """Reject options the generator would fail on, so a bad schema fails before any rows are sent."""
+    if field_type == "sequence":
+        start = params.get("start", DEFAULT_SEQUENCE_START)
+        if not (_is_int(start) and abs(start) <= SEQUENCE_START_LIMIT):
+            raise SchemaError(f"Field '{name}': 'start' must be an integer between -2**62 and 2**62")
+    elif field_type == "integer":
+        _check_range(name, field_type, params, _is_int, "an integer between -2**63 and 2**63 - 1")
+    elif field_type == "float":
+        _check_range(name, field_type, params, _is_number, "a finite number")
+        decimals = params.get("decimals", 2)
+        if not (_is_int(decimals) and 0 <= decimals <= MAX_DECIMALS):
+            raise SchemaError(f"Field '{name}': 'decimals' must be an integer from 0 to {MAX_DECIMALS}")
+    elif field_type == "boolean":
+        probability = params.get("probability", 0.5)
+        if not (_is_number(probability) and 0 <= probability <= 1):
+            raise SchemaError(f"Field '{name}': 'probability' must be a number between 0 and 1")
+    elif field_type == "choice":
+        values = params.get("values")
+        if not isinstance(values, list) or not values:
+            raise SchemaError(f"Choice field '{name}' needs a non-empty 'values' list")
+        if not all(_is_scalar(value) for value in values):
+            raise SchemaError(f"Field '{name}': 'values' must be strings, numbers or booleans")
+        weights = params.get("weights")
+        if weights is not None:
+            if not isinstance(weights, list) or len(weights) != len(values):
+                raise SchemaError(f"Field '{name}': 'weights' needs one weight per value")
+            if not all(_is_number(weight) and weight >= 0 for weight in weights) or not sum(weights) > 0:
+                raise SchemaError(f"Field '{name}': 'weights' must be non-negative numbers with a positive sum")
+    elif field_type == "sentence":
+        words = params.get("words", DEFAULT_SENTENCE_WORDS)
+        if not (_is_int(words) and 1 <= words <= MAX_SENTENCE_WORDS):
+            raise SchemaError(f"Field '{name}': 'words' must be an integer from 1 to {MAX_SENTENCE_WORDS}")
+    elif field_type in ("date", "datetime"):
+        _check_dates(name, field_type, params)
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    name: str
+    type: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Schema:
+    """A declared record layout: an ordered list of typed fields."""
+
+    name: str
+    fields: List[FieldSpec]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Schema":
+        """
+        Build a schema from its JSON declaration.
+
+        Example:
+            {"name": "people", "fields": [
+                {"name": "id", "type": "sequence"},
+                {"name": "age", "type": "integer", "min": 18, "max": 90}
+            ]}
+        """
+        fields = []
+        seen = set()
+        for raw in data.get("fields", []):
+            raw = dict(raw)
+            name = raw.pop("name", None)
+            field_type = raw.pop("type", None)
+            if not name or not isinstance(name, str):
+                raise SchemaError("Every field needs a name")
+            if name in seen:
+                raise SchemaError(f"Duplicate field '{name}'")
+            if field_type not in FIELD_TYPES:
+                raise SchemaError(f"Field '{name}' has unknown type '{field_type}'")
+            _check_params(name, field_type, raw)
+            seen.add(name)
+            fields.append(FieldSpec(name=name, type=field_type, params=raw))
+        if not fields:
+            raise SchemaError("A schema needs at least one field")
+        return cls(name=data.get("name", "dataset"), fields=fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "fields": [{"name": f.name, "type": f.type, **f.params} for f in self.fields],
+        }
+
+    def canonical_json(self) -> str:
+        """Stable serialisation, so equal schemas hash equally."""
+        return json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":"))
+
+    @property
+    def column_names(self) -> List[str]:
+        return [f.name for f in self.fields]
@@ -0,0 +1,234 @@
+"""
+Seed-addressed dataset snapshots.
+
+A dataset is fully determined by (schema, seed, count, chunk size), so its
+encoded output can be generated once and replayed. A snapshot is one gzip
+file whose deflate stream is made of per-chunk segments, plus a JSON index
+of segment offsets. Clients that accept gzip get the file bytes as they
+are; other clients get each segment inflated on its own. Either way the
+file is read through mmap, so replaying it costs page-cache I/O rather than
+generation.
+
+The store holds at most `max_bytes` of snapshots and evicts the least
+recently replayed ones to make room for new ones.
+"""
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from fakerapi.compression import GZIP_HEADER, GzipAssembler, Segment, inflate_segment
+from fakerapi.schema import Schema
+
+SNAPSHOT_VERSION = 1
+DATA_FILE = "data.gz"
+INDEX_FILE = "index.json"
+
+
+def snapshot_key(schema: Schema, seed: int, count: int, chunk_size: int, fmt: str) -> str:
+    """Content address of a dataset: equal inputs always map to the same key."""
+    identity = json.dumps(
+        {
+            "version": SNAPSHOT_VERSION,
+            "schema": schema.canonical_json(),
+            "seed": seed,
+            "count": count,
+            "chunk_size": chunk_size,
+            "format": fmt,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+
+
+class SnapshotWriter:
+    """
+    Appends segments to a temporary snapshot and publishes it atomically.
+
+    Every method does blocking file I/O; call them from a worker thread.
+    """
+
+    def __init__(self, store: "SnapshotStore", key: str, meta: Dict[str, Any]):
+        self.store = store
+        self.key = key
+        self.meta = meta
+        self.segments: List[List[int]] = []  # [offset, length]
+        self._gzip = GzipAssembler()
+        self._temp_dir = tempfile.mkdtemp(prefix=f".{key}-", dir=store.root)
+        self._file = open(os.path.join(self._temp_dir, DATA_FILE), "wb")
+        self._file.write(GZIP_HEADER)
+        self._offset = len(GZIP_HEADER)
+
+    def append(self, segment: Segment) -> None:
+        data = self._gzip.add(segment)
+        self._file.write(data)
+        self.segments.append([self._offset, len(data)])
+        self._offset += len(data)
+
+    def commit(self) -> None:
+        """Finish the gzip stream, write the index and move the snapshot into place."""
+        trailer = self._gzip.trailer()
+        self._file.write(trailer)
+        self._file.close()
+        index = {
+            **self.meta,
+            "segments": self.segments,
+            "compressed_bytes": self._offset + len(trailer),
+            "uncompressed_bytes": self._gzip.size,
+            "created_at": time.time(),
+        }
+        index_path = os.path.join(self._temp_dir, INDEX_FILE)
+        with open(index_path, "w") as f:
+            json.dump(index, f)
+        size = index["compressed_bytes"] + os.path.getsize(index_path)
+        final_dir = self.store.path(self.key)
+        os.makedirs(os.path.dirname(final_dir), exist_ok=True)
+        try:
+            os.rename(self._temp_dir, final_dir)
+        except OSError:
+            # Another process published the same snapshot first; it is identical
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+        finally:
+            self.store._building.discard(self.key)
+        self.store._added(self.key, size)
+
+    def abort(self) -> None:
+        self._file.close()
+        shutil.rmtree(self._temp_dir, ignore_errors=True)
+        self.store._building.discard(self.key)
+
+
+class SnapshotStore:
+    """
+    Directory of snapshots laid out as `<root>/<key[:2]>/<key>/`.
+
+    Snapshots are kept in least-recently-used order, recorded as the mtime
+    of their index file so the order survives restarts. Publishing a
+    snapshot evicts the oldest ones until the store fits in `max_bytes`
+    (None for no limit); the newest snapshot is always kept. Each process
+    enforces the budget over the snapshots it has seen.
+    """
+
+    def __init__(self, root: str, max_bytes: Optional[int] = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._building: Set[str] = set()
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()  # Bytes on disk per key, least recently used first
+        self._scan()
+
+    def _scan(self) -> None:
+        found = []
+        if os.path.isdir(self.root):
+            # Temporary and evicted directories start with "." and are skipped
+            for prefix in os.scandir(self.root):
+                if not prefix.is_dir() or prefix.name.startswith("."):
+                    continue
+                for entry in os.scandir(prefix.path):
+                    size = self._size_on_disk(entry.name)
+                    if size is not None:
+                        found.append((os.path.getmtime(os.path.join(entry.path, INDEX_FILE)), entry.name, size))
+        for _, key, size in sorted(found):
+            self._sizes[key] = size
+
+    def _size_on_disk(self, key: str) -> Optional[int]:
+        directory = self.path(key)
+        try:
+            return os.path.getsize(os.path.join(directory, INDEX_FILE)) + os.path.getsize(os.path.join(directory, DATA_FILE))
+        except OSError:
+            return None
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def _touch(self, key: str) -> None:
+        """Mark a snapshot as just used."""
+        try:
+            os.utime(os.path.join(self.path(key), INDEX_FILE))
+        except OSError:
+            return
+        with self._lock:
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+                return
+        # Published by another process sharing the directory
+        size = self._size_on_disk(key)
+        if size is not None:
+            self._added(key, size)
+
+    def _added(self, key: str, size: int) -> None:
+        evicted = []
+        with self._lock:
+            self._sizes[key] = size
+            self._sizes.move_to_end(key)
+            total = sum(self._sizes.values())
+            while self.max_bytes is not None and total > self.max_bytes and len(self._sizes) > 1:
+                old_key, old_size = self._sizes.popitem(last=False)
+                total -= old_size
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._remove(old_key)
+
+    def _remove(self, key: str) -> None:
+        # Moved aside first, so exists() turns false at once; replays that already opened the file finish normally
+        trash = tempfile.mkdtemp(prefix=".evicted-", dir=self.root)
+        try:
+            os.rename(self.path(key), os.path.join(trash, key))
+        except OSError:
+            pass  # Already gone
+        shutil.rmtree(trash, ignore_errors=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self.path(key), INDEX_FILE))
+
+    def index(self, key: str) -> Dict[str, Any]:
+        with open(os.path.join(self.path(key), INDEX_FILE)) as f:
+            return json.load(f)
+
+    def begin(self, key: str, meta: Dict[str, Any]) -> Optional[SnapshotWriter]:
+        """
+        Start writing a snapshot, unless it exists or is already being written.
+
+        Creates the temporary files, so call it from a worker thread.
+
+        Returns:
+            A writer, or None if this caller should not write the snapshot
+        """
+        with self._lock:
+            if key in self._building or self.exists(key):
+                return None
+            self._building.add(key)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            return SnapshotWriter(self, key, meta)
+        except BaseException:
+            self._building.discard(key)
+            raise
+
+    def iter_gzip(self, key: str, block_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """Yield the snapshot file, a complete gzip stream, in blocks read through mmap."""
+        self._touch(key)
+        with open(os.path.join(self.path(key), DATA_FILE), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(0, len(mapped), block_size):
+                    yield mapped[offset:offset + block_size]
+
+    def iter_decompressed(self, key: str) -> Iterator[bytes]:
+        """Yield the snapshot's chunks as plain encoded bytes, one segment at a time."""
+        self._touch(key)
+        index = self.index(key)
+        with open(os.path.join(self.path(key), DATA_FILE), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset, length in index["segments"]:
+                    yield inflate_segment(mapped[offset:offset + length])
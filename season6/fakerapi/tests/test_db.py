@@ -0,0 +1,143 @@
+import asyncio
+import json
+
+import mongomock
+import pytest
+from fastapi.testclient import TestClient
+
+import db
+from api import base
+from fakerapi import engine
+from fakerapi.schema import Schema
+
+
+@pytest.fixture
+def database():
+    return mongomock.MongoClient()["fakerapi_test"]
+
+
+def records(count, dataset="people"):
+    return ({"dataset": dataset, "seq": i, "name": f"user-{i}", "age": 20 + i % 50} for i in range(count))
+
+
+def test_insert_batched_uses_one_round_trip_per_batch(database, monkeypatch):
+    calls = []
+    insert_many = database.records.insert_many
+
+    def counting_insert_many(batch, **kwargs):
+        calls.append(len(batch))
+        return insert_many(batch, **kwargs)
+
+    monkeypatch.setattr(database.records, "insert_many", counting_insert_many)
+
+    inserted = asyncio.run(db.insert_batched(database.records, records(2500), batch_size=1000))
+
+    assert inserted == {"inserted": 2500, "duplicates": 0}
+    assert calls == [1000, 1000, 500]
+    assert database.records.count_documents({}) == 2500
+
+
+def test_insert_batched_accepts_async_iterables(database):
+    async def generate():
+        for document in records(10):
+            yield document
+
+    assert asyncio.run(db.insert_batched(database.records, generate(), batch_size=3))["inserted"] == 10
+
+
+def test_insert_batched_skips_duplicates_and_keeps_going(database):
+    asyncio.run(db.ensure_indexes(database))
+    database.records.insert_many([{"dataset": "people", "seq": 1}, {"dataset": "people", "seq": 12}])
+
+    totals = asyncio.run(db.insert_batched(database.records, records(20), batch_size=5))
+
+    assert totals == {"inserted": 18, "duplicates": 2}
+    assert database.records.count_documents({}) == 20
+
+
+def test_upsert_batched_sends_one_bulk_write_per_batch():
+    # mongomock's bulk_write lags behind pymongo's ReplaceOne, so record the calls instead
+    class Collection:
+        def __init__(self):
+            self.calls = []
+
+        def bulk_write(self, operations, ordered):
+            self.calls.append(operations)
+            return type("Result", (), {"matched_count": 0, "modified_count": 0, "upserted_count": len(operations)})
+
+    collection = Collection()
+    documents = [{"dataset": "people", "seq": i, "name": "renamed"} for i in range(5)]
+
+    totals = asyncio.run(db.upsert_batched(collection, documents, key_fields=["dataset", "seq"], batch_size=2))
+
+    assert totals["upserted"] == 5
+    assert [len(batch) for batch in collection.calls] == [2, 2, 1]
+    assert collection.calls[0][1]._filter == {"dataset": "people", "seq": 1}
+
+
+def test_stream_projects_fields_and_filters(database):
+    asyncio.run(db.insert_batched(database.records, records(20), batch_size=10))
+
+    async def collect():
+        return [document async for document in db.stream(
+            database.records, {"age": {"$lt": 25}}, fields=["seq", "name"], batch_size=2, sort=[("seq", 1)]
+        )]
+
+    documents = asyncio.run(collect())
+    assert documents == [{"seq": i, "name": f"user-{i}"} for i in range(5)]
+
+
+def test_ensure_indexes_creates_unique_dataset_seq_index(database):
+    asyncio.run(db.ensure_indexes(database))
+
+    assert "dataset_seq" in database.records.index_information()
+    with pytest.raises(Exception):
+        database.records.insert_many([{"dataset": "a", "seq": 1}, {"dataset": "a", "seq": 1}])
+
+
+@pytest.fixture
+def api_database(database, monkeypatch):
+    monkeypatch.setattr(db, "_indexes_ensured", False)
+    monkeypatch.setattr(db, "get_database", lambda config=None: database)
+    return database
+
+
+PEOPLE = [{"name": "name", "type": "name"}, {"name": "age", "type": "integer", "min": 18, "max": 90}]
+
+
+def test_saved_datasets_are_read_back_in_order(api_database):
+    client = TestClient(base.app)
+
+    saved = client.post("/datasets", json={"name": "people", "fields": PEOPLE, "count": 25, "seed": 4})
+    response = client.get("/datasets/people/records", params={"fields": "age", "limit": 10})
+
+    assert saved.json() == {"name": "people", "count": 25, "inserted": 25, "duplicates": 0}
+    assert "dataset_seq" in api_database.records.index_information()
+    rows = [json.loads(line) for line in response.content.splitlines()]
+    generated = [json.loads(line) for line in b"".join(engine.iter_encoded(
+        Schema.from_dict({"name": "people", "fields": PEOPLE}), 25, 4, "ndjson")).splitlines()]
+    assert rows == [{"age": row["age"]} for row in generated[:10]]
+    assert client.get("/datasets/missing/records").status_code == 404
+    assert client.get("/datasets/people/records", params={"fields": "secret"}).status_code == 422
+    reserved = client.post("/datasets", json={"name": "x", "fields": [{"name": "seq", "type": "sequence"}]})
+    assert reserved.status_code == 422
+
+
+def test_saving_an_existing_dataset_replaces_it_in_place(api_database, monkeypatch):
+    async def upsert_batched(collection, documents, key_fields, batch_size=None):
+        # mongomock can't run ReplaceOne bulk writes; replace one document at a time instead
+        upserted = 0
+        async for document in documents:
+            collection.replace_one({key: document[key] for key in key_fields}, document, upsert=True)
+            upserted += 1
+        return {"matched": 0, "modified": 0, "upserted": upserted}
+
+    monkeypatch.setattr(db, "upsert_batched", upsert_batched)
+    client = TestClient(base.app)
+    client.post("/datasets", json={"name": "people", "fields": PEOPLE, "count": 20})
+
+    resaved = client.post("/datasets", json={"name": "people", "fields": PEOPLE, "count": 5, "seed": 1})
+
+    assert resaved.json()["deleted"] == 15
+    assert api_database.records.count_documents({"dataset": "people"}) == 5
+    assert api_database.datasets.find_one({"name": "people"})["seed"] == 1
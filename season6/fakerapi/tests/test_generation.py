@@ -0,0 +1,114 @@
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import base
+from fakerapi import engine
+from fakerapi.schema import Schema, SchemaError
+
+SCHEMA = Schema.from_dict({
+    "name": "people",
+    "fields": [
+        {"name": "id", "type": "sequence"},
+        {"name": "name", "type": "name"},
+        {"name": "email", "type": "email"},
+        {"name": "age", "type": "integer", "min": 18, "max": 90},
+        {"name": "plan", "type": "choice", "values": ["free", "pro"], "weights": [3, 1]},
+        {"name": "id_token", "type": "uuid"},
+        {"name": "signup", "type": "date", "start": "2020-01-01", "end": "2020-12-31"},
+    ],
+})
+
+
+def collect(count, fmt="ndjson", **kwargs):
+    async def run():
+        return [chunk async for chunk in engine.stream_encoded(SCHEMA, count, 42, fmt, **kwargs)]
+    return asyncio.run(run())
+
+
+def test_rows_follow_the_schema():
+    rows = [json.loads(line) for line in b"".join(engine.iter_encoded(SCHEMA, 50, 1, "ndjson")).splitlines()]
+
+    assert len(rows) == 50
+    assert [row["id"] for row in rows] == list(range(1, 51))
+    assert all(18 <= row["age"] <= 90 for row in rows)
+    assert {row["plan"] for row in rows} <= {"free", "pro"}
+    assert all(len(row["id_token"]) == 36 and row["id_token"][14] == "4" for row in rows)
+    assert all(row["signup"].startswith("2020-") for row in rows)
+    assert len({row["email"] for row in rows}) == 50
+
+
+def test_same_seed_gives_same_bytes_inline_and_in_a_process_pool(monkeypatch):
+    inline = b"".join(engine.iter_encoded(SCHEMA, 2500, 42, "ndjson", chunk_size=1000))
+
+    monkeypatch.setattr(engine, "INLINE_MAX_ROWS", 0)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        pooled = b"".join(collect(2500, chunk_size=1000, executor=executor))
+
+    assert pooled == inline
+    assert b"".join(engine.iter_encoded(SCHEMA, 2500, 43, "ndjson", chunk_size=1000)) != inline
+
+
+def test_csv_header_is_written_once():
+    lines = b"".join(collect(25, fmt="csv", chunk_size=10)).decode().splitlines()
+
+    assert lines[0] == ",".join(SCHEMA.column_names)
+    assert len(lines) == 26
+
+
+@pytest.mark.parametrize("fields", [
+    [],
+    [{"name": "a", "type": "unknown"}],
+    [{"name": "a", "type": "choice"}],
+    [{"name": "a", "type": "word"}, {"name": "a", "type": "word"}],
+    [{"name": "a", "type": "integer", "min": 10, "max": 1}],
+    [{"name": "a", "type": "integer", "max": "ten"}],
+    [{"name": "a", "type": "float", "decimals": 1.5}],
+    [{"name": "a", "type": "choice", "values": ["x", "y"], "weights": [1]}],
+    [{"name": "a", "type": "choice", "values": ["x", "y"], "weights": [0, 0]}],
+    [{"name": "a", "type": "sentence", "words": 0}],
+    [{"name": "a", "type": "boolean", "probability": 2}],
+    [{"name": "a", "type": "date", "start": "not a date"}],
+    [{"name": "a", "type": "date", "start": "2021-01-01", "end": "2020-01-01"}],
+    [{"name": "a", "type": "sentence", "words": 1_000_000}],
+])
+def test_invalid_schemas_are_rejected(fields):
+    with pytest.raises(SchemaError):
+        Schema.from_dict({"fields": fields})
+
+
+@pytest.mark.parametrize("field, message", [
+    ({"type": "integer", "min": 10, "max": 1}, "'min' (10) is greater than 'max' (1)"),
+    # A single bound is checked against the default of the other
+    ({"type": "integer", "min": 2000}, "'min' (2000) is greater than 'max' (1000)"),
+    ({"type": "float", "max": -1}, "'min' (0.0) is greater than 'max' (-1)"),
+    ({"type": "date", "start": "2040-01-01"}, "'start' (2040-01-01T00:00:00) is after 'end'"),
+    ({"type": "datetime", "end": "1990-01-01T00:00:00"}, "is after 'end' (1990-01-01T00:00:00)"),
+    ({"type": "integer", "max": 2**70}, "'max' must be an integer between -2**63 and 2**63 - 1"),
+    ({"type": "float", "min": -1e308, "max": 1e308}, "range from 'min' to 'max' is too wide"),
+    ({"type": "sequence", "start": 2**63}, "'start' must be an integer between -2**62 and 2**62"),
+    ({"type": "choice", "values": [["a"], ["b"]]}, "'values' must be strings, numbers or booleans"),
+    ({"type": "sentence", "words": 1_000_000}, "'words' must be an integer from 1 to 100"),
+    ({"type": "float", "decimals": 1000}, "'decimals' must be an integer from 0 to 15"),
+])
+def test_generate_rejects_bad_options_before_streaming(field, message):
+    response = TestClient(base.app).post("/generate", json={"fields": [{"name": "a", **field}], "count": 10})
+
+    assert response.status_code == 422
+    assert message in response.json()["detail"]
+
+
+def test_boundary_options_generate_rows():
+    schema = Schema.from_dict({"fields": [
+        {"name": "big", "type": "integer", "min": -(2**63), "max": 2**63 - 1},
+        {"name": "seq", "type": "sequence", "start": 2**62},
+        {"name": "when", "type": "date", "start": "2030-12-31"},
+        {"name": "pick", "type": "choice", "values": [1, 2.5, True]},
+    ]})
+    rows = [json.loads(line) for line in b"".join(engine.iter_encoded(schema, 5, 1, "ndjson")).splitlines()]
+
+    assert [row["seq"] for row in rows] == [2**62 + i for i in range(5)]
+    assert {row["when"] for row in rows} == {"2030-12-31"}
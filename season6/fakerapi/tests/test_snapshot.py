@@ -0,0 +1,116 @@
+import asyncio
+import dataclasses
+import gzip
+import os
+import zlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import base
+from fakerapi import engine
+from fakerapi.compression import crc32_combine
+from fakerapi.schema import Schema
+from fakerapi.snapshot import SnapshotStore, snapshot_key
+
+SCHEMA = Schema.from_dict({"fields": [{"name": "id", "type": "sequence"}, {"name": "name", "type": "name"}]})
+
+
+def write_snapshot(store, count=250, chunk_size=100, seed=3):
+    key = snapshot_key(SCHEMA, seed, count, chunk_size, "ndjson")
+    writer = store.begin(key, {"count": count})
+
+    async def run():
+        async for segment in engine.stream_segments(SCHEMA, count, seed, "ndjson", chunk_size=chunk_size):
+            writer.append(segment)
+
+    asyncio.run(run())
+    writer.commit()
+    return key
+
+
+def test_crc32_combine_matches_zlib():
+    first, second = b"first part " * 100, b"second part " * 333
+    combined = crc32_combine(zlib.crc32(first), zlib.crc32(second), len(second))
+    assert combined == zlib.crc32(first + second)
+
+
+def test_snapshot_replays_the_generated_bytes(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    key = write_snapshot(store)
+    expected = b"".join(engine.iter_encoded(SCHEMA, 250, 3, "ndjson", chunk_size=100))
+
+    assert store.exists(key)
+    assert gzip.decompress(b"".join(store.iter_gzip(key, block_size=64))) == expected
+    assert b"".join(store.iter_decompressed(key)) == expected
+    assert store.index(key)["uncompressed_bytes"] == len(expected)
+
+
+def test_key_depends_on_every_input():
+    keys = {
+        snapshot_key(SCHEMA, 1, 100, 10, "ndjson"),
+        snapshot_key(SCHEMA, 2, 100, 10, "ndjson"),
+        snapshot_key(SCHEMA, 1, 101, 10, "ndjson"),
+        snapshot_key(SCHEMA, 1, 100, 20, "ndjson"),
+        snapshot_key(SCHEMA, 1, 100, 10, "csv"),
+    }
+    assert len(keys) == 5
+
+
+def test_aborted_snapshot_leaves_nothing_behind(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    writer = store.begin("abc123", {})
+    assert store.begin("abc123", {}) is None  # Already being written
+    writer.abort()
+
+    assert os.listdir(tmp_path) == []
+    assert not store.exists("abc123")
+    assert store.begin("abc123", {}) is not None
+
+
+def test_store_evicts_least_recently_used_snapshots(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    first, second = write_snapshot(store, seed=1), write_snapshot(store, seed=2)
+    store.max_bytes = store.total_bytes  # Room for exactly these two
+    b"".join(store.iter_gzip(first))  # Replaying makes `second` the oldest
+
+    third = write_snapshot(store, seed=3)
+
+    assert store.exists(first) and store.exists(third)
+    assert not store.exists(second)
+    assert store.total_bytes <= store.max_bytes
+    # The order is kept on disk, so a new store evicts the same way
+    reopened = SnapshotStore(str(tmp_path), max_bytes=store.max_bytes)
+    assert list(reopened._sizes) == [first, third]
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", True),
+    ("deflate;q=1.0, gzip;q=0.5", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.0, *", False),
+    ("*;q=0.1", True),
+    ("identity", False),
+    ("", False),
+])
+def test_accept_encoding_q_values(header, expected):
+    assert base._accepts_gzip(header) is expected
+
+
+def test_generate_endpoint_serves_repeat_requests_from_the_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(base, "snapshots", SnapshotStore(str(tmp_path)))
+    monkeypatch.setattr(base, "settings", dataclasses.replace(base.settings, snapshot_min_rows=0))
+    client = TestClient(base.app)
+    body = {"fields": SCHEMA.to_dict()["fields"], "count": 500, "seed": 9}
+
+    first = client.post("/generate", json=body)
+    second = client.post("/generate", json=body)
+    plain = client.post("/generate", json=body, headers={"Accept-Encoding": "identity"})
+    refused = client.post("/generate", json=body, headers={"Accept-Encoding": "gzip;q=0, identity"})
+
+    assert first.headers["x-snapshot"] == "miss"
+    assert second.headers["x-snapshot"] == "hit"
+    assert second.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in refused.headers
+    assert first.content == second.content == plain.content == refused.content
+    assert len(second.content.splitlines()) == 500
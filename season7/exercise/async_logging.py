@@ -0,0 +1,184 @@
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler
+from typing import List, Optional
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves all formatting to the listener thread.
+
+    The stock QueueHandler formats every record on the calling thread so it
+    can be pickled for a multiprocessing queue. With an in-process queue that
+    isn't needed, so the caller only pays for creating the record and putting
+    it on the queue. Arguments are interpolated later, so don't mutate objects
+    after passing them as log arguments.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info and not record.exc_text:
+            # Tracebacks reference live frames; render them while they still exist
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class BufferedRotatingFileHandler(logging.FileHandler):
+    """
+    File handler that writes through a large buffer and rotates by size or age.
+
+    Records are written to a buffered file object and only flushed when
+    `flush()` is called (the listener does so after each batch and on a
+    timer), instead of once per record. Rotation is checked per record
+    against byte counts kept in memory, never by stat-ing the file.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        rotate_interval: Optional[float] = None,
+        buffer_size: int = 256 * 1024,
+        encoding: str = "utf-8",
+    ):
+        """
+        Args:
+            filename: Path of the active log file
+            max_bytes: Rotate once the file reaches this size (0 disables)
+            backup_count: Rotated files kept as filename.1 ... filename.N
+            rotate_interval: Also rotate after this many seconds (None disables)
+            buffer_size: Size of the write buffer in bytes
+        """
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rotate_interval = rotate_interval
+        self.buffer_size = buffer_size
+        super().__init__(filename, mode="a", encoding=encoding, delay=True)
+        self._bytes_written = os.path.getsize(self.baseFilename) if os.path.exists(self.baseFilename) else 0
+        self._rotate_at = time.time() + rotate_interval if rotate_interval else None
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, encoding=self.encoding, buffering=self.buffer_size)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record) + self.terminator
+            # Sizes are in bytes, as on disk; non-ASCII characters take more than one
+            size = len(line.encode(self.encoding or "utf-8"))
+            if self._should_rollover(size):
+                self.do_rollover()
+            if self.stream is None:
+                self.stream = self._open()
+            # No flush here; that is what makes the writes batched
+            self.stream.write(line)
+            self._bytes_written += size
+        except Exception:
+            self.handleError(record)
+
+    def _should_rollover(self, incoming: int) -> bool:
+        if self.max_bytes and self._bytes_written and self._bytes_written + incoming > self.max_bytes:
+            return True
+        return self._rotate_at is not None and time.time() >= self._rotate_at
+
+    def do_rollover(self) -> None:
+        """Close the active file and shift filename -> filename.1 -> ... -> filename.N."""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.baseFilename}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.baseFilename}.{index + 1}")
+            if os.path.exists(self.baseFilename):
+                os.replace(self.baseFilename, f"{self.baseFilename}.1")
+        elif os.path.exists(self.baseFilename):
+            os.remove(self.baseFilename)
+        self._bytes_written = 0
+        if self.rotate_interval:
+            self._rotate_at = time.time() + self.rotate_interval
+
+
+class BatchingQueueListener:
+    """
+    Background thread that drains a log queue in batches.
+
+    It blocks until a record arrives, then takes everything else already
+    queued (up to `batch_size`), hands the batch to the handlers and flushes
+    them once. If the queue stays quiet, handlers are still flushed every
+    `flush_interval` seconds so buffered lines don't sit unwritten.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        handlers: List[logging.Handler],
+        batch_size: int = 512,
+        flush_interval: float = 1.0,
+    ):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write out everything queued so far, flush and stop the thread."""
+        if self._thread is None:
+            return
+        self.queue.put(self._STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _handle(self, record: logging.LogRecord) -> None:
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _flush(self) -> None:
+        for handler in self.handlers:
+            handler.flush()
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        dirty = False
+        while True:
+            try:
+                record = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if dirty:
+                    self._flush()
+                    dirty = False
+                last_flush = time.monotonic()
+                continue
+
+            stopping = record is self._STOP
+            batch = 0
+            while not stopping:
+                self._handle(record)
+                dirty = True
+                batch += 1
+                if batch >= self.batch_size:
+                    break
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                stopping = record is self._STOP
+
+            if stopping or time.monotonic() - last_flush >= self.flush_interval or batch >= self.batch_size:
+                self._flush()
+                dirty = False
+                last_flush = time.monotonic()
+            if stopping:
+                return
@@ -0,0 +1,92 @@
+"""
+Per-call logging overhead on the calling thread: synchronous vs production mode,
+the cost of disabled calls, and text vs JSON formatting throughput.
+
+Usage: python benchmark_logging.py [--calls 50000]
+
+The console handler is set to CRITICAL so only file logging is measured.
+For production mode the time the listener needs to drain the queue is
+reported separately; it is spent off the caller's thread.
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from logging_best_practices import setup_logging, shutdown_logging
+from structured_logging import JsonFormatter, KeyValueFormatter, get_logger
+
+
+def run(production: bool, calls: int, log_dir: str) -> None:
+    log_file = os.path.join(log_dir, f"{'production' if production else 'sync'}.log")
+    setup_logging(log_file=log_file, console_level=logging.CRITICAL, file_level=logging.DEBUG, production=production)
+    log = logging.getLogger("benchmark")
+
+    start = time.perf_counter()
+    for i in range(calls):
+        log.info("Processed record %d for user %s", i, "sebastian")
+    caller = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shutdown_logging()
+    for handler in logging.getLogger().handlers:
+        handler.close()  # Synchronous mode: close the file handler
+    drain = time.perf_counter() - start
+
+    with open(log_file) as f:
+        lines = sum(1 for _ in f)
+    label = "production" if production else "synchronous"
+    print(
+        f"{label:<12} {caller / calls * 1e6:7.2f} us/call on caller  "
+        f"{caller:6.3f}s total  drain {drain:6.3f}s  lines {lines}"
+    )
+
+
+def _time_per_call(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def run_disabled(calls: int, log_dir: str) -> None:
+    """Cost of a DEBUG call when only INFO and above are enabled."""
+    setup_logging(os.path.join(log_dir, "disabled.log"), console_level=logging.CRITICAL, file_level=logging.INFO)
+    std = logging.getLogger("benchmark")
+    structured = get_logger("benchmark")
+    user = "sebastian"
+    variants = {
+        "stdlib f-string": lambda i: std.debug(f"Processed record {i} for user {user}"),
+        "stdlib %-args": lambda i: std.debug("Processed record %d for user %s", i, user),
+        "structured": lambda i: structured.debug("Processed record", record=i, user=user),
+    }
+    for label, fn in variants.items():
+        print(f"disabled {label:<16} {_time_per_call(fn, calls):7.1f} ns/call")
+    for handler in logging.getLogger().handlers:
+        handler.close()
+
+
+def run_formatters(calls: int) -> None:
+    """Formatting cost alone, for a record carrying a few fields."""
+    record = logging.LogRecord("benchmark", logging.INFO, __file__, 1, "Processed record %d", (7,), None, "run")
+    record.fields = {"user": "sebastian", "ip": "192.168.1.5", "attempts": 3}
+    text = KeyValueFormatter("%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(funcName)s - %(message)s")
+    for label, formatter in (("text", text), ("json", JsonFormatter())):
+        print(f"format {label:<18} {_time_per_call(lambda i: formatter.format(record), calls):7.1f} ns/call")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        run(False, args.calls, log_dir)
+        run(True, args.calls, log_dir)
+        run_disabled(args.calls * 10, log_dir)
+    run_formatters(args.calls)
+
+
+if __name__ == "__main__":
+    main()
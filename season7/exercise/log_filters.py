@@ -0,0 +1,209 @@
+"""
+Filters that keep log volume bounded during incident storms.
+
+    setup_logging(..., filters=[
+        DeduplicationFilter(window=10),
+        RateLimitFilter(rate=5, burst=20),
+        SamplingFilter({logging.DEBUG: 0.01, logging.INFO: 0.1}),
+    ])
+
+All three decide on the unformatted template (`record.msg`), so a dropped
+record is never interpolated or formatted. Kept records that stand in for
+dropped ones say so in their fields (`suppressed=N`, `sample_rate=0.1`).
+The same filter instance may sit on several handlers; it decides once per
+record, so shared state is only updated once.
+"""
+import logging
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def _add_field(record: logging.LogRecord, key: str, value: Any) -> None:
+    record.fields = {**(getattr(record, "fields", None) or {}), key: value}
+
+
+class _OncePerRecordFilter(logging.Filter, ABC):
+    """Caches its decision on the record, so stateful filters can be shared by handlers."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.__dict__.get("log_summary"):
+            return True
+        decisions = record.__dict__.setdefault("_filter_decisions", {})
+        decision = decisions.get(id(self))
+        if decision is None:
+            decision = decisions[id(self)] = self.decide(record)
+        return decision
+
+    @abstractmethod
+    def decide(self, record: logging.LogRecord) -> bool:
+        """Whether to keep `record`; called at most once per record."""
+
+
+class RateLimitFilter(_OncePerRecordFilter):
+    """
+    Token bucket per (logger, message template).
+
+    Each template may log `burst` records at once and `rate` per second
+    after that. The first record let through after drops carries
+    `suppressed=N`. Records at `exempt_level` (CRITICAL by default) and
+    above are never limited. Idle buckets are evicted once more than
+    `max_templates` are tracked.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        exempt_level: int = logging.CRITICAL,
+        max_templates: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.exempt_level = exempt_level
+        self.max_templates = max_templates
+        self.clock = clock
+        # key -> [tokens, last refill, dropped since last kept]
+        self._buckets: Dict[Tuple[str, Any], list] = {}
+        self._lock = threading.Lock()
+
+    def decide(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.exempt_level:
+            return True
+        key = (record.name, record.msg)
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_templates:
+                    self._evict_idle(now)
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            dropped, bucket[2] = bucket[2], 0
+        if dropped:
+            _add_field(record, "suppressed", dropped)
+        return True
+
+    def _evict_idle(self, now: float) -> None:
+        # Buckets that have refilled completely carry no state worth keeping
+        refill = self.burst / self.rate if self.rate else float("inf")
+        idle = [key for key, (_, last, dropped) in self._buckets.items() if not dropped and now - last >= refill]
+        for key in idle:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_templates:
+            self._buckets.clear()
+
+
+class SamplingFilter(_OncePerRecordFilter):
+    """
+    Keep a random fraction of records per level.
+
+    Levels missing from `rates` are always kept. Kept records carry
+    `sample_rate`, so counts can be scaled back up when analysing logs.
+    """
+
+    def __init__(self, rates: Dict[int, float], seed: Optional[int] = None):
+        super().__init__()
+        self.rates = rates
+        self._random = random.Random(seed).random
+
+    def decide(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno)
+        if rate is None or rate >= 1:
+            return True
+        if self._random() >= rate:
+            return False
+        _add_field(record, "sample_rate", rate)
+        return True
+
+
+class DeduplicationFilter(_OncePerRecordFilter):
+    """
+    Collapse bursts of identical records into one line plus a summary.
+
+    Records are identical if logger, level, template and arguments match.
+    The first one opens a run lasting `window` seconds and is kept; repeats
+    during the run are dropped. When a run ends with repeats, the filter
+    logs "Message repeated N times: ...". Runs are closed as later records
+    come in (at most once a second) and by `flush()`; at most `max_runs`
+    are open at once. Records below `min_level` are never deduplicated.
+    """
+
+    def __init__(
+        self,
+        window: float = 10.0,
+        min_level: int = logging.NOTSET,
+        max_runs: int = 1_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self.window = window
+        self.min_level = min_level
+        self.max_runs = max_runs
+        self.clock = clock
+        # key -> [run start, repeats, first record]
+        self._runs: Dict[Tuple[Any, ...], list] = {}
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def decide(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level:
+            return True
+        key = (record.name, record.levelno, record.msg, record.args)
+        try:
+            hash(key)
+        except TypeError:
+            return True  # Unhashable arguments: can't compare cheaply, keep it
+        now = self.clock()
+        with self._lock:
+            summaries = self._sweep(now) if now >= self._next_sweep or len(self._runs) >= self.max_runs else []
+            run = self._runs.get(key)
+            if run is not None and now - run[0] < self.window:
+                run[1] += 1
+                keep = False
+            else:
+                if run is not None and run[1]:
+                    summaries.append(self._summary(run))
+                self._runs[key] = [now, 0, record]
+                keep = True
+        for summary in summaries:
+            logging.getLogger(summary.name).handle(summary)
+        return keep
+
+    def _sweep(self, now: float) -> list:
+        self._next_sweep = now + 1.0
+        expired = [key for key, run in self._runs.items() if now - run[0] >= self.window]
+        if len(self._runs) - len(expired) >= self.max_runs:
+            # Still full: runs without repeats carry nothing to report, close those first
+            expired = [key for key, run in self._runs.items() if not run[1] or now - run[0] >= self.window]
+            if len(self._runs) - len(expired) >= self.max_runs:
+                expired = list(self._runs)
+        return [self._summary(run) for run in map(self._runs.pop, expired) if run[1]]
+
+    @staticmethod
+    def _summary(run: list) -> logging.LogRecord:
+        _, repeats, first = run
+        summary = logging.LogRecord(
+            first.name, first.levelno, first.pathname, first.lineno,
+            "Message repeated %d times: %s", (repeats, first.getMessage()), None, first.funcName,
+        )
+        summary.log_summary = True
+        return summary
+
+    def flush(self) -> None:
+        """Close all open runs, logging their summaries."""
+        with self._lock:
+            summaries = [self._summary(run) for run in self._runs.values() if run[1]]
+            self._runs.clear()
+        for summary in summaries:
+            logging.getLogger(summary.name).handle(summary)
@@ -0,0 +1,332 @@
+"""
+Incremental index and query tool for the files written by setup_logging.
+
+    python log_index.py logs/application.log --level ERROR --func process_data \\
+        --since 10:00 --until 10:05
+
+Each log file (the active one and its rotated .1 ... .N backups) is cut
+into blocks of at most BLOCK_SIZE bytes that never span a minute. For
+every block the index keeps its byte range, its minute, a bitmask of the
+levels in it and the loggers and functions that wrote to it. A query
+picks the matching blocks and reads only those through mmap, so a rare
+ERROR in a large file costs a few blocks of I/O, not a full scan.
+
+The index lives next to the logs in `.<name>.index.json`. Files are keyed
+by device and inode, so entries survive rotation renames. Each run only
+parses bytes appended since the previous run. Both the text format and
+the JSON format (json_format=True) are understood.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+BLOCK_SIZE = 64 * 1024
+INDEX_VERSION = 1
+SIGNATURE_BYTES = 256
+
+LEVEL_BITS = {"DEBUG": 1, "INFO": 2, "WARNING": 4, "ERROR": 8, "CRITICAL": 16}
+OTHER_LEVEL = 32
+LEVEL_ORDER = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+# 2026-10-19 09:40:52,533 - WARNING - [logging_best_practices.py:174] - simulate_login_storm - ...
+TEXT_ENTRY = re.compile(rb"(\d{4}-\d\d-\d\d \d\d:\d\d):\d\d,\d{3} - (\w+) - \[([^\]]+?):\d+\] - (\S+) - ")
+# {"ts":"2026-10-19T09:40:52.533","level":"WARNING","logger":"app","event":...,"func":"main",...
+JSON_ENTRY = re.compile(rb'\{"ts":"(\d{4}-\d\d-\d\d)T(\d\d:\d\d)[^"]*","level":"(\w+)","logger":"((?:[^"\\]|\\.)*)"')
+JSON_FUNC = re.compile(rb',"func":"((?:[^"\\]|\\.)*)"')
+
+Entry = Tuple[str, str, str, str]  # (minute "YYYY-MM-DD HH:MM", level, logger, func)
+
+
+def parse_entry(line: bytes) -> Optional[Entry]:
+    """Parse the header of a line that starts an entry; None for continuation lines."""
+    match = TEXT_ENTRY.match(line)
+    if match:
+        minute, level, source, func = match.groups()
+        return minute.decode(), level.decode(), source.decode(), func.decode()
+    match = JSON_ENTRY.match(line)
+    if match:
+        day, time_of_day, level, logger = match.groups()
+        func = JSON_FUNC.search(line, match.end())
+        return (
+            f"{day.decode()} {time_of_day.decode()}",
+            level.decode(),
+            logger.decode(),
+            func.group(1).decode() if func else "",
+        )
+    return None
+
+
+def level_mask(min_level: Optional[str]) -> int:
+    if min_level is None:
+        return ~0
+    names = LEVEL_ORDER[LEVEL_ORDER.index(min_level.upper()):]
+    return sum(LEVEL_BITS[name] for name in names)
+
+
+def _file_id(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_dev}:{stat.st_ino}"
+
+
+def _signature(path: str, length: int = SIGNATURE_BYTES) -> str:
+    """Hash of the first bytes, to tell a reused inode from the file we indexed."""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+
+class _BlockBuilder:
+    """Accumulates one file's blocks while lines are fed in order."""
+
+    def __init__(self, state: dict):
+        self.state = state
+        self.names: List[str] = state["names"]
+        self.name_ids = {name: index for index, name in enumerate(self.names)}
+        self.current: Optional[list] = None  # [start, end, minute, mask, loggers, funcs]
+
+    def _name_id(self, name: str) -> int:
+        index = self.name_ids.get(name)
+        if index is None:
+            index = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def add(self, offset: int, line: bytes) -> None:
+        entry = parse_entry(line)
+        block = self.current
+        if entry is None:
+            # Continuation (e.g. a traceback) belongs to the entry before it
+            if block is not None:
+                block[1] = offset + len(line)
+            elif self.state["blocks"] and self.state["blocks"][-1][1] == offset:
+                self.state["blocks"][-1][1] = offset + len(line)
+            return
+        minute, level, logger, func = entry
+        if block is None or block[2] != minute or offset - block[0] >= BLOCK_SIZE:
+            self.close()
+            block = self.current = [offset, offset, minute, 0, set(), set()]
+        block[1] = offset + len(line)
+        block[3] |= LEVEL_BITS.get(level, OTHER_LEVEL)
+        block[4].add(self._name_id(logger))
+        block[5].add(self._name_id(func))
+
+    def close(self) -> None:
+        block = self.current
+        if block is not None:
+            self.state["blocks"].append(block[:4] + [sorted(block[4]), sorted(block[5])])
+            self.current = None
+
+
+class LogIndex:
+    """Block index over a log file and its rotated backups."""
+
+    def __init__(self, log_file: str):
+        self.log_file = os.path.abspath(log_file)
+        directory, name = os.path.split(self.log_file)
+        self.index_path = os.path.join(directory, f".{name}.index.json")
+        self.files: Dict[str, dict] = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.files = data["files"]
+
+    def log_files(self) -> List[str]:
+        """The active file and its existing backups, oldest first."""
+        backups = []
+        index = 1
+        while os.path.exists(f"{self.log_file}.{index}"):
+            backups.append(f"{self.log_file}.{index}")
+            index += 1
+        files = backups[::-1]
+        if os.path.exists(self.log_file):
+            files.append(self.log_file)
+        return files
+
+    def update(self) -> int:
+        """
+        Index bytes appended since the last update and drop files that are gone.
+
+        Returns:
+            Number of bytes parsed
+        """
+        parsed = 0
+        live = {}
+        for path in self.log_files():
+            file_id = _file_id(path)
+            state = self.files.get(file_id)
+            size = os.path.getsize(path)
+            if (
+                state is None
+                or size < state["indexed"]
+                or _signature(path, state["signature_length"]) != state["signature"]
+            ):
+                # New file, or the inode was reused for different content
+                state = {"signature": "", "signature_length": 0, "indexed": 0, "blocks": [], "names": []}
+            state["path"] = path
+            parsed += self._index_file(path, state, size)
+            live[file_id] = state
+        self.files = live
+        self._save()
+        return parsed
+
+    def _index_file(self, path: str, state: dict, size: int) -> int:
+        start = state["indexed"]
+        if size <= start:
+            return 0
+        builder = _BlockBuilder(state)
+        offset = start
+        with open(path, "rb") as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Partial last line; pick it up next time
+                builder.add(offset, line)
+                offset += len(line)
+        builder.close()
+        state["indexed"] = offset
+        if state["signature_length"] < SIGNATURE_BYTES:
+            state["signature_length"] = min(offset, SIGNATURE_BYTES)
+            state["signature"] = _signature(path, state["signature_length"])
+        return offset - start
+
+    def _save(self) -> None:
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, "files": self.files}, f, separators=(",", ":"))
+        os.replace(temp_path, self.index_path)
+
+    def query(
+        self,
+        min_level: Optional[str] = None,
+        logger: Optional[str] = None,
+        func: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        """
+        Yield matching entries (including continuation lines), oldest first.
+
+        Args:
+            min_level: Lowest level to include, e.g. "ERROR"
+            logger: Logger name (JSON logs) or source file name (text logs)
+            func: Function name
+            since: First minute to include, "YYYY-MM-DD HH:MM"
+            until: First minute to exclude, "YYYY-MM-DD HH:MM"
+        """
+        mask = level_mask(min_level)
+        files = sorted(self.files.values(), key=lambda state: state["blocks"][0][2] if state["blocks"] else "")
+        for state in files:
+            names = {name: index for index, name in enumerate(state["names"])}
+            logger_id = names.get(logger, -1) if logger is not None else None
+            func_id = names.get(func, -1) if func is not None else None
+            ranges = []
+            for start, end, minute, levels, loggers, funcs in state["blocks"]:
+                if (since and minute < since) or (until and minute >= until) or not levels & mask:
+                    continue
+                if logger_id is not None and logger_id not in loggers:
+                    continue
+                if func_id is not None and func_id not in funcs:
+                    continue
+                if ranges and ranges[-1][1] == start:
+                    ranges[-1][1] = end  # Adjacent blocks are read as one range
+                else:
+                    ranges.append([start, end])
+            if ranges:
+                yield from self._scan(state["path"], ranges, mask, logger, func, since, until)
+
+    @staticmethod
+    def _scan(path, ranges, mask, logger, func, since, until) -> Iterator[bytes]:
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for start, end in ranges:
+                    entry: List[bytes] = []
+                    keep = False
+                    for line in _lines(mapped, start, end):
+                        header = parse_entry(line)
+                        if header is None:
+                            if keep:
+                                entry.append(line)
+                            continue
+                        if keep:
+                            yield b"".join(entry)
+                        minute, level, entry_logger, entry_func = header
+                        keep = (
+                            bool(LEVEL_BITS.get(level, OTHER_LEVEL) & mask)
+                            and (logger is None or entry_logger == logger)
+                            and (func is None or entry_func == func)
+                            and not (since and minute < since)
+                            and not (until and minute >= until)
+                        )
+                        entry = [line]
+                    if keep:
+                        yield b"".join(entry)
+
+    def latest_day(self) -> Optional[str]:
+        minutes = [state["blocks"][-1][2] for state in self.files.values() if state["blocks"]]
+        return max(minutes)[:10] if minutes else None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "files": len(self.files),
+            "blocks": sum(len(state["blocks"]) for state in self.files.values()),
+            "indexed_bytes": sum(state["indexed"] for state in self.files.values()),
+        }
+
+
+def _lines(mapped: mmap.mmap, start: int, end: int) -> Iterator[bytes]:
+    """Yield the lines in mapped[start:end] one at a time, so a long run of matching blocks is never copied whole."""
+    pos = start
+    while pos < end:
+        newline = mapped.find(b"\n", pos, end)
+        stop = end if newline == -1 else newline + 1
+        yield mapped[pos:stop]
+        pos = stop
+
+
+def _minute(value: Optional[str], default_day: Optional[str]) -> Optional[str]:
+    """Accept "HH:MM" (on the newest day in the logs) or "YYYY-MM-DD HH:MM"."""
+    if value is None:
+        return None
+    if re.fullmatch(r"\d\d:\d\d", value):
+        if default_day is None:
+            return None
+        return f"{default_day} {value}"
+    if not re.fullmatch(r"\d{4}-\d\d-\d\d \d\d:\d\d", value):
+        raise argparse.ArgumentTypeError(f"Expected HH:MM or 'YYYY-MM-DD HH:MM', got {value!r}")
+    return value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Index and query application logs")
+    parser.add_argument("log_file", nargs="?", default="logs/application.log")
+    parser.add_argument("--level", choices=LEVEL_ORDER, help="Lowest level to show")
+    parser.add_argument("--logger", help="Logger name (JSON logs) or source file (text logs)")
+    parser.add_argument("--func", help="Function name")
+    parser.add_argument("--since", help="First minute to include: HH:MM or 'YYYY-MM-DD HH:MM'")
+    parser.add_argument("--until", help="First minute to exclude: HH:MM or 'YYYY-MM-DD HH:MM'")
+    parser.add_argument("--stats", action="store_true", help="Print index statistics and exit")
+    args = parser.parse_args()
+
+    index = LogIndex(args.log_file)
+    parsed = index.update()
+    if args.stats:
+        print(json.dumps({**index.stats(), "parsed_bytes": parsed}))
+        return
+
+    day = index.latest_day()
+    try:
+        since, until = _minute(args.since, day), _minute(args.until, day)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    out = sys.stdout.buffer
+    for entry in index.query(args.level, args.logger, args.func, since, until):
+        out.write(entry)
+
+
+if __name__ == "__main__":
+    main()
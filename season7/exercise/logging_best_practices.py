@@ -1,17 +1,48 @@
+import atexit
 import logging
+import queue
 import sys
 import os
 from datetime import datetime
 
-def setup_logging(log_file='application.log', console_level=logging.INFO, file_level=logging.DEBUG):
+from log_filters import DeduplicationFilter, RateLimitFilter
+from async_logging import BatchingQueueListener, BufferedRotatingFileHandler, LazyQueueHandler
+from structured_logging import JsonFormatter, KeyValueFormatter, get_logger, refresh_levels
+
+# Listener started by production mode, stopped by shutdown_logging()
+_listener = None
+
+# Structured logger: key/value fields, arguments interpolated only if the record is emitted
+log = get_logger(__name__)
+
+def setup_logging(log_file='application.log', console_level=logging.INFO, file_level=logging.DEBUG,
+                  production=False, max_bytes=10 * 1024 * 1024, backup_count=5, rotate_interval=None,
+                  flush_interval=1.0, batch_size=512, json_format=False,
+                  filters=None):
     """
     Set up logging configuration with both file and console handlers.
     
+    In production mode the root logger only gets a queue handler. Formatting,
+    rotation and writes happen on a background listener thread that writes
+    the file in batches and flushes it at least every `flush_interval` seconds.
+    
     Args:
         log_file (str): Path to the log file
         console_level: Minimum level for console output
         file_level: Minimum level for file output
+        production (bool): Log through a queue and a background listener
+        max_bytes (int): Production mode: rotate the file at this size (0 disables)
+        backup_count (int): Production mode: rotated files to keep
+        rotate_interval (float): Production mode: also rotate every N seconds
+        flush_interval (float): Production mode: longest time a line stays buffered
+        batch_size (int): Production mode: records written per batch at most
+        json_format (bool): Write the file as one JSON object per line
+        filters (list): logging.Filter objects applied to every record before it
+            is formatted or queued, e.g. those in log_filters
     """
+    global _listener
+    shutdown_logging()
+    
     # Create logs directory if it doesn't exist
     log_dir = os.path.dirname(log_file)
     if log_dir and not os.path.exists(log_dir):
@@ -19,23 +50,37 @@ def setup_logging(log_file='application.log', console_level=logging.INFO, file_l
     
     # Create logger
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)  # Capture all levels
+    # Capture everything either handler wants; lower levels are dropped before a record exists
+    logger.setLevel(min(file_level, console_level))
     
     # Clear any existing handlers
     if logger.hasHandlers():
+        for handler in logger.handlers:
+            handler.close()
         logger.handlers.clear()
     
-    # Create formatters
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(funcName)s - %(message)s'
-    )
+    # Thread and process names are in neither format; production mode skips collecting them
+    logging.logThreads = logging.logProcesses = logging.logMultiprocessing = not production
     
-    console_formatter = logging.Formatter(
+    # Create formatters; structured fields are appended as key=value pairs
+    if json_format:
+        file_formatter = JsonFormatter()
+    else:
+        file_formatter = KeyValueFormatter(
+            '%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(funcName)s - %(message)s'
+        )
+    
+    console_formatter = KeyValueFormatter(
         '%(asctime)s - %(levelname)s - %(message)s'
     )
     
     # Create file handler
-    file_handler = logging.FileHandler(log_file)
+    if production:
+        file_handler = BufferedRotatingFileHandler(
+            log_file, max_bytes=max_bytes, backup_count=backup_count, rotate_interval=rotate_interval
+        )
+    else:
+        file_handler = logging.FileHandler(log_file)
     file_handler.setLevel(file_level)
     file_handler.setFormatter(file_formatter)
     
@@ -44,12 +89,47 @@ def setup_logging(log_file='application.log', console_level=logging.INFO, file_l
     console_handler.setLevel(console_level)
     console_handler.setFormatter(console_formatter)
     
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    if production:
+        # The caller only enqueues; records below both handler levels are never queued
+        log_queue = queue.SimpleQueue()
+        queue_handler = LazyQueueHandler(log_queue)
+        queue_handler.setLevel(min(file_level, console_level))
+        for log_filter in filters or ():
+            queue_handler.addFilter(log_filter)
+        logger.addHandler(queue_handler)
+        _listener = BatchingQueueListener(
+            log_queue, [file_handler, console_handler], batch_size=batch_size, flush_interval=flush_interval
+        )
+        _listener.start()
+    else:
+        # Add handlers to logger; log_filters decide once per record even when shared
+        for log_filter in filters or ():
+            file_handler.addFilter(log_filter)
+            console_handler.addFilter(log_filter)
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+    
+    # Structured loggers cache enabled levels; pick up the new configuration
+    refresh_levels()
     
     return logger
 
+def shutdown_logging():
+    """Flush filters, then drain and stop the production-mode listener, writing out buffered lines."""
+    global _listener
+    # Write out pending "message repeated" summaries while handlers are still open
+    for handler in logging.getLogger().handlers:
+        for log_filter in handler.filters:
+            if hasattr(log_filter, 'flush'):
+                log_filter.flush()
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+atexit.register(shutdown_logging)
+
 def simulate_application_flow():
     """Simulate various application scenarios that generate different log levels."""
     
@@ -65,11 +145,14 @@ def simulate_application_flow():
     try:
         # Simulate user authentication
         username = "sebastian"
-        logging.info(f"User {username} logged in")
+        log.info("User logged in", user=username)
         
         # Simulate potential security concern - WARNING level
         logging.warning("Multiple failed login attempts detected from IP 192.168.1.5")
         
+        # Simulate an incident storm: the filters collapse and rate-limit these
+        simulate_login_storm()
+        
         # Simulate processing some data
         process_data()
         
@@ -84,18 +167,25 @@ def simulate_application_flow():
         # Simulate application shutdown - INFO level
         logging.info("Application shutting down")
 
+def simulate_login_storm(attempts=5000):
+    """Simulate a brute-force burst that would otherwise write thousands of lines."""
+    for attempt in range(attempts):
+        # Identical lines are deduplicated; varying ones are rate-limited per template
+        logging.warning("Multiple failed login attempts detected from IP %s", "192.168.1.5")
+        logging.warning("Failed login attempt %d for user %s", attempt, "admin")
+
 def process_data():
     """Simulate data processing with various log levels."""
     logging.debug("Starting data processing routine")
     
     # Simulate processing steps
     records_processed = 1000
-    logging.info(f"Successfully processed {records_processed} records")
+    log.info("Successfully processed %d records", records_processed)
     
     # Simulate a warning condition
     duplicate_records = 5
     if duplicate_records > 0:
-        logging.warning(f"Found {duplicate_records} duplicate records in the dataset")
+        log.warning("Found duplicate records in the dataset", duplicates=duplicate_records)
     
     logging.debug("Data processing completed")
 
@@ -109,11 +199,14 @@ def division_by_zero():
 
 def main():
     """Main function to demonstrate logging."""
-    # Set up logging
+    # Set up logging; LOG_MODE=production logs through the background listener
     setup_logging(
         log_file='logs/application.log',
         console_level=logging.INFO,  # Console shows INFO and above
-        file_level=logging.DEBUG     # File captures all levels including DEBUG
+        file_level=logging.DEBUG,    # File captures all levels including DEBUG
+        production=os.getenv('LOG_MODE') == 'production',
+        # Keep incident storms from flooding the console and disk
+        filters=[DeduplicationFilter(window=10, min_level=logging.WARNING), RateLimitFilter(rate=5, burst=20)]
     )
     
     logging.info("=" * 50)
@@ -0,0 +1,106 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+from async_logging import BatchingQueueListener, BufferedRotatingFileHandler, LazyQueueHandler
+from logging_best_practices import setup_logging, shutdown_logging
+
+
+def read_lines(path):
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def test_buffered_handler_writes_only_on_flush(tmp_path):
+    path = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(str(path))
+    handler.emit(logging.makeLogRecord({"msg": "hello"}))
+    assert not path.exists() or path.read_text() == ""
+    handler.flush()
+    assert read_lines(path) == ["hello"]
+    handler.close()
+
+
+def test_size_rotation_keeps_backups(tmp_path):
+    path = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(str(path), max_bytes=20, backup_count=2)
+    for i in range(5):
+        handler.emit(logging.makeLogRecord({"msg": f"line {i} xxxxxxxx"}))
+    handler.close()
+    assert read_lines(path) == ["line 4 xxxxxxxx"]
+    assert read_lines(f"{path}.1") == ["line 3 xxxxxxxx"]
+    assert read_lines(f"{path}.2") == ["line 2 xxxxxxxx"]
+    assert not os.path.exists(f"{path}.3")
+
+
+def test_size_rotation_counts_bytes_not_characters(tmp_path):
+    path = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(str(path), max_bytes=15, backup_count=2)
+    # 6 characters but 11 bytes each, so two don't fit in one file
+    for _ in range(2):
+        handler.emit(logging.makeLogRecord({"msg": "\u00e9" * 5}))
+    handler.close()
+    assert os.path.getsize(path) == os.path.getsize(f"{path}.1") == 11
+
+
+def test_time_rotation(tmp_path):
+    path = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(str(path), max_bytes=0, rotate_interval=0.01)
+    handler.emit(logging.makeLogRecord({"msg": "first"}))
+    time.sleep(0.02)
+    handler.emit(logging.makeLogRecord({"msg": "second"}))
+    handler.close()
+    assert read_lines(f"{path}.1") == ["first"]
+    assert read_lines(path) == ["second"]
+
+
+def test_listener_formats_off_the_caller_thread(tmp_path):
+    path = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(str(path))
+    formatted_on = []
+
+    class RecordingFormatter(logging.Formatter):
+        def format(self, record):
+            formatted_on.append(threading.current_thread().name)
+            return super().format(record)
+
+    handler.setFormatter(RecordingFormatter())
+    log_queue = queue.SimpleQueue()
+    listener = BatchingQueueListener(log_queue, [handler], flush_interval=0.05)
+    listener.start()
+
+    logger = logging.getLogger("test_async_logging")
+    logger.propagate = False
+    queue_handler = LazyQueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+    try:
+        logger.warning("value %s", 42)
+        time.sleep(0.2)
+        # Flushed by the timer, before the listener stops
+        assert read_lines(path) == ["value 42"]
+        assert formatted_on == ["log-listener"]
+    finally:
+        logger.removeHandler(queue_handler)
+        listener.stop()
+        handler.close()
+
+
+def test_production_setup_writes_everything_on_shutdown(tmp_path):
+    path = tmp_path / "logs" / "app.log"
+    setup_logging(str(path), console_level=logging.CRITICAL, production=True, flush_interval=60)
+    try:
+        for i in range(1000):
+            logging.debug("record %d", i)
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logging.error("failed", exc_info=True)
+    finally:
+        shutdown_logging()
+        logging.getLogger().handlers.clear()
+    lines = read_lines(path)
+    assert lines[0].endswith("record 0")
+    assert lines[999].endswith("record 999")
+    assert "ZeroDivisionError" in lines[-1]
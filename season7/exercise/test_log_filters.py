@@ -0,0 +1,87 @@
+import logging
+
+from log_filters import DeduplicationFilter, RateLimitFilter, SamplingFilter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_record(msg, *args, level=logging.WARNING, name="test_filters"):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_rate_limit_per_template_and_suppressed_count():
+    clock = FakeClock()
+    limiter = RateLimitFilter(rate=1, burst=2, clock=clock)
+    kept = [limiter.filter(make_record("attempt %d", i)) for i in range(5)]
+    assert kept == [True, True, False, False, False]
+    # Another template has its own bucket
+    assert limiter.filter(make_record("other"))
+
+    clock.now = 1.0
+    record = make_record("attempt %d", 5)
+    assert limiter.filter(record)
+    assert record.fields == {"suppressed": 3}
+
+
+def test_rate_limit_exempts_critical():
+    limiter = RateLimitFilter(rate=0, burst=0)
+    assert limiter.filter(make_record("down", level=logging.CRITICAL))
+    assert not limiter.filter(make_record("down", level=logging.ERROR))
+
+
+def test_shared_filter_decides_once_per_record():
+    limiter = RateLimitFilter(rate=0, burst=1)
+    record = make_record("once")
+    # The same filter on two handlers must not spend two tokens on one record
+    assert limiter.filter(record) and limiter.filter(record)
+    assert not limiter.filter(make_record("once"))
+
+
+def test_sampling_by_level():
+    sampler = SamplingFilter({logging.DEBUG: 0.1}, seed=1)
+    kept = [r for r in (make_record("x", level=logging.DEBUG) for _ in range(2000)) if sampler.filter(r)]
+    assert 120 < len(kept) < 280
+    assert kept[0].fields == {"sample_rate": 0.1}
+    assert sampler.filter(make_record("x", level=logging.INFO))
+
+
+def test_deduplication_summarises_bursts():
+    clock = FakeClock()
+    dedup = DeduplicationFilter(window=10, clock=clock)
+    logger = logging.getLogger("test_filters")
+    logger.propagate = False
+    handler = ListHandler()
+    handler.addFilter(dedup)
+    logger.addHandler(handler)
+    try:
+        for i in range(100):
+            logger.warning("login failed from %s", "10.0.0.1")
+            logger.warning("attempt %d", i)
+        assert sum(r.getMessage() == "login failed from 10.0.0.1" for r in handler.records) == 1
+        assert sum(r.msg == "attempt %d" for r in handler.records) == 100
+
+        clock.now = 11.0
+        logger.warning("login failed from %s", "10.0.0.1")
+        messages = [r.getMessage() for r in handler.records[-2:]]
+        assert messages == ["Message repeated 99 times: login failed from 10.0.0.1", "login failed from 10.0.0.1"]
+
+        logger.warning("login failed from %s", "10.0.0.1")
+        dedup.flush()
+        assert handler.records[-1].getMessage() == "Message repeated 1 times: login failed from 10.0.0.1"
+    finally:
+        logger.removeHandler(handler)
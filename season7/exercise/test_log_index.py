@@ -0,0 +1,75 @@
+import mmap
+import os
+
+from log_index import LogIndex, _lines, parse_entry
+
+
+def text_line(minute, level, func, message, second="00"):
+    return f"2026-10-19 {minute}:{second},123 - {level} - [app.py:10] - {func} - {message}\n"
+
+
+def write(path, *lines, mode="a"):
+    with open(path, mode) as f:
+        f.writelines(lines)
+
+
+def test_parse_text_and_json_headers():
+    assert parse_entry(text_line("10:01", "ERROR", "process_data", "boom").encode()) == (
+        "2026-10-19 10:01", "ERROR", "app.py", "process_data",
+    )
+    line = b'{"ts":"2026-10-19T10:02:03.004","level":"INFO","logger":"app","event":"x","func":"main","line":3}\n'
+    assert parse_entry(line) == ("2026-10-19 10:02", "INFO", "app", "main")
+    assert parse_entry(b"Traceback (most recent call last):\n") is None
+
+
+def test_query_by_level_function_and_time(tmp_path):
+    log_file = tmp_path / "application.log"
+    write(
+        log_file,
+        text_line("09:59", "ERROR", "process_data", "too early"),
+        text_line("10:00", "INFO", "process_data", "fine"),
+        text_line("10:01", "ERROR", "process_data", "boom"),
+        "Traceback (most recent call last):\n",
+        "ZeroDivisionError: division by zero\n",
+        text_line("10:02", "ERROR", "other", "not this function"),
+        text_line("10:04", "CRITICAL", "process_data", "worse"),
+        text_line("10:05", "ERROR", "process_data", "too late"),
+    )
+    index = LogIndex(str(log_file))
+    index.update()
+    entries = list(index.query("ERROR", func="process_data", since="2026-10-19 10:00", until="2026-10-19 10:05"))
+    assert entries == [
+        text_line("10:01", "ERROR", "process_data", "boom").encode()
+        + b"Traceback (most recent call last):\nZeroDivisionError: division by zero\n",
+        text_line("10:04", "CRITICAL", "process_data", "worse").encode(),
+    ]
+
+
+def test_update_is_incremental_and_survives_rotation(tmp_path):
+    log_file = tmp_path / "application.log"
+    write(log_file, text_line("10:00", "INFO", "main", "first"))
+    index = LogIndex(str(log_file))
+    first = index.update()
+    assert first == os.path.getsize(log_file)
+
+    # A partial line is left for the next update
+    write(log_file, text_line("10:01", "ERROR", "main", "second"), "2026-10-19 10:02:00,000 - INF")
+    reloaded = LogIndex(str(log_file))
+    assert reloaded.update() == len(text_line("10:01", "ERROR", "main", "second"))
+
+    os.replace(log_file, f"{log_file}.1")
+    write(log_file, text_line("10:03", "ERROR", "main", "after rotation"))
+    rotated = LogIndex(str(log_file))
+    # Only the new active file is parsed; the backup keeps its entry by inode
+    assert rotated.update() == os.path.getsize(log_file)
+    messages = [entry.decode().rsplit(" - ", 1)[1] for entry in rotated.query("ERROR")]
+    assert messages == ["second\n", "after rotation\n"]
+
+
+def test_lines_walks_a_range_without_copying_it(tmp_path):
+    log_file = tmp_path / "application.log"
+    write(log_file, "one\n", "two\n", "three")
+    with open(log_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        assert list(_lines(mapped, 0, len(mapped))) == [b"one\n", b"two\n", b"three"]
+        # A range ending mid-line stops at the range end
+        assert list(_lines(mapped, 4, 10)) == [b"two\n", b"th"]
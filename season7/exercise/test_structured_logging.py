@@ -0,0 +1,82 @@
+import json
+import logging
+
+import pytest
+
+from structured_logging import JsonFormatter, KeyValueFormatter, _noop, get_logger, refresh_levels
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, formatter):
+        super().__init__()
+        self.lines = []
+        self.setFormatter(formatter)
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+@pytest.fixture
+def captured():
+    std = logging.getLogger("test_structured")
+    std.propagate = False
+    handler = ListHandler(JsonFormatter())
+    std.addHandler(handler)
+    std.setLevel(logging.INFO)
+    refresh_levels()
+    yield get_logger("test_structured"), handler
+    std.removeHandler(handler)
+
+
+def test_disabled_levels_are_noops(captured):
+    log, handler = captured
+    assert log.debug is _noop
+    assert log.info is not _noop
+    log.debug("ignored %s", object())
+    assert handler.lines == []
+
+
+def test_refresh_picks_up_level_changes(captured):
+    log, handler = captured
+    logging.getLogger("test_structured").setLevel(logging.DEBUG)
+    refresh_levels()
+    log.debug("now enabled")
+    assert json.loads(handler.lines[0])["event"] == "now enabled"
+
+
+def test_json_line_has_fields_and_caller(captured):
+    log, handler = captured
+    log.info("user %s logged in", "sebastian", ip="192.168.1.5", attempts=3, tags=["a"])
+    event = json.loads(handler.lines[0])
+    assert event["level"] == "INFO"
+    assert event["logger"] == "test_structured"
+    assert event["event"] == "user sebastian logged in"
+    assert event["func"] == "test_json_line_has_fields_and_caller"
+    assert (event["ip"], event["attempts"], event["tags"]) == ("192.168.1.5", 3, ["a"])
+
+
+def test_reserved_field_names_are_namespaced(captured):
+    log, handler = captured
+    log.info("shutdown", level="disk", event="eviction", line=7)
+    pairs = json.loads(handler.lines[0], object_pairs_hook=lambda items: items)
+    keys = [key for key, _ in pairs]
+    assert len(keys) == len(set(keys))
+    event = dict(pairs)
+    assert (event["level"], event["event"]) == ("INFO", "shutdown")
+    assert (event["fields.level"], event["fields.event"], event["fields.line"]) == ("disk", "eviction", 7)
+
+
+def test_exception_is_encoded(captured):
+    log, handler = captured
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        log.exception("calculation failed", step="divide")
+    event = json.loads(handler.lines[0])
+    assert event["step"] == "divide"
+    assert "ZeroDivisionError" in event["exc"]
+
+
+def test_key_value_formatter_appends_fields():
+    record = logging.makeLogRecord({"msg": "login", "fields": {"user": "sebastian", "attempts": 3}})
+    assert KeyValueFormatter("%(message)s").format(record) == "login user='sebastian' attempts=3"